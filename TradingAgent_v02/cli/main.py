@@ -1,5 +1,6 @@
 from typing import Optional
 import datetime
+import uuid
 import typer
 from pathlib import Path
 from functools import wraps
@@ -25,6 +26,8 @@ from rich.align import Align
 from rich.rule import Rule
 
 from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.profiler import GraphProfiler
+from tradingagents.graph.checkpointing import thread_id_for, touch_thread, delete_thread
 from tradingagents.default_config import DEFAULT_CONFIG
 from cli.models import AnalystType
 from cli.utils import *
@@ -709,6 +712,41 @@ def display_complete_report(final_state):
                 )
             )
 
+    # VI. Run Profile
+    run_profile = final_state.get("run_profile")
+    if run_profile and run_profile.get("nodes"):
+        profile_table = Table(box=box.SIMPLE_HEAD, expand=False)
+        profile_table.add_column("Node", style="cyan")
+        profile_table.add_column("Wall (s)", justify="right")
+        profile_table.add_column("Queue (s)", justify="right")
+        profile_table.add_column("Prompt Tok", justify="right")
+        profile_table.add_column("Compl. Tok", justify="right")
+        profile_table.add_column("Cost ($)", justify="right")
+        profile_table.add_column("Retries", justify="right")
+        nodes = run_profile["nodes"]
+        for name in sorted(nodes, key=lambda n: nodes[n]["wall_time"], reverse=True):
+            stats = nodes[name]
+            profile_table.add_row(
+                name,
+                f"{stats['wall_time']:.1f}",
+                f"{stats['queue_time']:.1f}",
+                str(stats["prompt_tokens"]),
+                str(stats["completion_tokens"]),
+                f"{stats['cost']:.4f}",
+                str(stats["retries"]),
+            )
+        console.print(
+            Panel(
+                profile_table,
+                title=(
+                    f"VI. Run Profile ({run_profile['total_wall_time']:.1f}s, "
+                    f"${run_profile['cost']:.4f})"
+                ),
+                border_style="magenta",
+                padding=(1, 2),
+            )
+        )
+
 
 def update_research_team_status(status):
     """Update status for all research team members and trader."""
@@ -843,7 +881,13 @@ def run_analysis():
         init_agent_state = graph.propagator.create_initial_state(
             selections["ticker"], selections["analysis_date"]
         )
-        args = graph.propagator.get_graph_args()
+        profiler = GraphProfiler()
+        # A checkpointed graph needs a thread; the CLI never resumes, so it is dropped afterwards
+        thread_id = None
+        if graph.checkpointer:
+            thread_id = thread_id_for(selections["ticker"], selections["analysis_date"], uuid.uuid4().hex)
+            touch_thread(graph.checkpointer, thread_id)
+        args = graph.propagator.get_graph_args(callbacks=[profiler], thread_id=thread_id)
 
         # Stream the analysis
         trace = []
@@ -1077,8 +1121,12 @@ def run_analysis():
 
             trace.append(chunk)
 
+        if thread_id:
+            delete_thread(graph.checkpointer, thread_id)
+
         # Get final state and decision
         final_state = trace[-1]
+        final_state["run_profile"] = profiler.summary()
         decision = graph.process_signal(final_state["final_trade_decision"])
 
         # Update all agent statuses to completed
@@ -0,0 +1,121 @@
+"""KIS client token handling against a local stub of the KIS REST API.
+
+Run with `python -m unittest tests.test_kis_util` from the project root.
+"""
+
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from tradingagents.agents.utils.kis_util import KisUSClient
+
+BALANCE_PATH = "/uapi/overseas-stock/v1/trading/inquire-present-balance"
+
+
+class StubKisServer(ThreadingHTTPServer):
+    """Issues tok1, tok2, ... and rejects requests carrying a token in `rejected`."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubKisHandler)
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.rejected = set()
+
+
+class StubKisHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/oauth2/tokenP":
+            return self._reply(404, {})
+        with self.server.lock:
+            self.server.issued += 1
+            token = f"tok{self.server.issued}"
+        self._reply(200, {"access_token": token, "expires_in": 86400})
+
+    def do_GET(self):
+        if not self.path.startswith(BALANCE_PATH):
+            return self._reply(404, {})
+        token = self.headers.get("authorization", "").replace("Bearer ", "")
+        if token in self.server.rejected:
+            return self._reply(401, {"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "expired token"})
+        self._reply(200, {"rt_cd": "0", "output2": {"ovrs_ord_psbl_amt": "123.5"}})
+
+
+class KisTokenTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubKisServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.data_dir = tempfile.mkdtemp()
+        env = {
+            "KIS_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}",
+            "KIS_MODE": "VIRTUAL",
+            "KIS_APP_KEY": "key",
+            "KIS_APP_SECRET": "secret",
+            "KIS_RATE_LIMIT": "1000",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self):
+        return KisUSClient(data_dir=self.data_dir)
+
+    def test_token_is_persisted_and_reused_across_instances(self):
+        first = self.client()
+        self.assertEqual(first.get_access_token(), "tok1")
+        self.assertEqual(stat.S_IMODE(os.stat(first.token_path).st_mode), 0o600)
+
+        self.assertEqual(self.client().get_access_token(), "tok1")
+        self.assertEqual(self.server.issued, 1)
+
+    def test_token_near_expiry_is_reissued(self):
+        client = self.client()
+        with open(client.token_path, "w") as f:
+            json.dump({"access_token": "old", "expires_at": time.time() + 60}, f)
+
+        self.assertEqual(client.get_access_token(), "tok1")
+        self.assertEqual(self.server.issued, 1)
+        with open(client.token_path) as f:
+            self.assertEqual(json.load(f)["access_token"], "tok1")
+
+    def test_rejected_token_is_reissued_once_and_retried(self):
+        client = self.client()
+        self.assertEqual(client.get_access_token(), "tok1")
+        self.server.rejected.add("tok1")
+
+        balances = []
+        threads = [threading.Thread(target=lambda: balances.append(client.get_balance())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(balances, [123.5] * 4)
+        # Every caller was rejected with tok1, but only one of them reissued
+        self.assertEqual(self.server.issued, 2)
+        self.assertEqual(client.access_token, "tok2")
+
+
+if __name__ == "__main__":
+    unittest.main()
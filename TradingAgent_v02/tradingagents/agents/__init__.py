@@ -1,4 +1,5 @@
 from .utils.agent_utils import create_msg_delete
+from .utils.compaction import create_report_compactor
 from .utils.agent_states import AgentState, InvestDebateState, RiskDebateState
 from .utils.memory import FinancialSituationMemory
 
@@ -13,6 +14,7 @@ from .researchers.bull_researcher import create_bull_researcher
 from .risk_mgmt.aggresive_debator import create_risky_debator
 from .risk_mgmt.conservative_debator import create_safe_debator
 from .risk_mgmt.neutral_debator import create_neutral_debator
+from .risk_mgmt.parallel_round import create_parallel_risk_round
 
 from .managers.research_manager import create_research_manager
 from .managers.risk_manager import create_risk_manager
@@ -23,6 +25,7 @@ __all__ = [
     "FinancialSituationMemory",
     "AgentState",
     "create_msg_delete",
+    "create_report_compactor",
     "InvestDebateState",
     "RiskDebateState",
     "create_bear_researcher",
@@ -32,6 +35,7 @@ __all__ = [
     "create_market_analyst",
     "create_neutral_debator",
     "create_news_analyst",
+    "create_parallel_risk_round",
     "create_risky_debator",
     "create_risk_manager",
     "create_safe_debator",
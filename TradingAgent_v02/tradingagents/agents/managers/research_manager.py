@@ -1,5 +1,6 @@
 import time
 import json
+from tradingagents.agents.utils.compaction import get_debate_history
 
 
 def create_research_manager(llm, memory):
@@ -21,6 +22,8 @@ def create_research_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        debate_context = get_debate_history(investment_debate_state)
+
         prompt = f"""As the portfolio manager and debate facilitator, your role is to critically evaluate this round of debate and make a definitive decision: align with the bear analyst, the bull analyst, or choose Hold only if it is strongly justified based on the arguments presented.
 
 Summarize the key points from both sides concisely, focusing on the most compelling evidence or reasoning. Your recommendation—Buy, Sell, or Hold—must be clear and actionable. Avoid defaulting to Hold simply because both sides have valid points; commit to a stance grounded in the debate's strongest arguments.
@@ -43,7 +46,7 @@ If the user's "Risk Tolerance" is Low/Conservative, prioritize capital preservat
 
 Here is the debate:
 Debate History:
-{history}"""
+{debate_context}"""
         response = llm.invoke(prompt)
 
         new_investment_debate_state = {
@@ -53,6 +56,8 @@ Debate History:
             "bull_history": investment_debate_state.get("bull_history", ""),
             "current_response": response.content,
             "count": investment_debate_state["count"],
+            "history_summary": investment_debate_state.get("history_summary", ""),
+            "recent_turns": investment_debate_state.get("recent_turns", []),
         }
 
         return {
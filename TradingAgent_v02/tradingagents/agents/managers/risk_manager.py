@@ -1,5 +1,6 @@
 import time
 import json
+from tradingagents.agents.utils.compaction import get_debate_history
 
 
 def create_risk_manager(llm, memory):
@@ -22,6 +23,8 @@ def create_risk_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        debate_context = get_debate_history(risk_debate_state)
+
         prompt = f"""As the Risk Management Judge and Debate Facilitator, your goal is to evaluate the debate between three risk analysts—Risky, Neutral, and Safe/Conservative—and determine the best course of action for the trader. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific arguments, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
 
 Guidelines for Decision-Making:
@@ -37,7 +40,7 @@ Deliverables:
 ---
 
 **Analysts Debate History:**  
-{history}
+{debate_context}
 
 ---
 
@@ -56,6 +59,8 @@ Focus on actionable insights and continuous improvement. Build on past lessons,
             "current_safe_response": risk_debate_state["current_safe_response"],
             "current_neutral_response": risk_debate_state["current_neutral_response"],
             "count": risk_debate_state["count"],
+            "history_summary": risk_debate_state.get("history_summary", ""),
+            "recent_turns": risk_debate_state.get("recent_turns", []),
         }
 
         return {
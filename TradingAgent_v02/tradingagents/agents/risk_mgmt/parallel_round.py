@@ -0,0 +1,54 @@
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from tradingagents.agents.utils.compaction import update_debate_history
+
+from .aggresive_debator import create_risky_debator
+from .conservative_debator import create_safe_debator
+from .neutral_debator import create_neutral_debator
+
+
+def create_parallel_risk_round(llm):
+    risky_node = create_risky_debator(llm)
+    safe_node = create_safe_debator(llm)
+    neutral_node = create_neutral_debator(llm)
+
+    def risk_round_node(state) -> dict:
+        """Run one risk debate round with all three debaters concurrently.
+
+        Each debater answers the previous round's responses, so the three calls
+        are independent; their updates are merged into a single state update.
+        """
+        risk_debate_state = state["risk_debate_state"]
+        round_state = {
+            **state,
+            "risk_debate_state": {**risk_debate_state, "fold_deferred": True},
+        }
+
+        # Copies contextvars into the workers so the debaters' LLM calls keep the
+        # graph's runnable config and callbacks (profiling, progress, streaming)
+        with ContextThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(node, round_state) for node in (risky_node, safe_node, neutral_node)]
+            risky, safe, neutral = [future.result()["risk_debate_state"] for future in futures]
+
+        arguments = [
+            risky["current_risky_response"],
+            safe["current_safe_response"],
+            neutral["current_neutral_response"],
+        ]
+
+        new_risk_debate_state = {
+            "history": risk_debate_state.get("history", "") + "".join("\n" + a for a in arguments),
+            "risky_history": risky["risky_history"],
+            "safe_history": safe["safe_history"],
+            "neutral_history": neutral["neutral_history"],
+            "latest_speaker": "Neutral",
+            "current_risky_response": risky["current_risky_response"],
+            "current_safe_response": safe["current_safe_response"],
+            "current_neutral_response": neutral["current_neutral_response"],
+            "count": risk_debate_state["count"] + 3,
+            **update_debate_history(risk_debate_state, arguments, llm),
+        }
+
+        return {"risk_debate_state": new_risk_debate_state}
+
+    return risk_round_node
@@ -19,6 +19,8 @@ class InvestDebateState(TypedDict):
     current_response: Annotated[str, "Latest response"]  # Last response
     judge_decision: Annotated[str, "Final judge decision"]  # Last response
     count: Annotated[int, "Length of the current conversation"]  # Conversation length
+    history_summary: Annotated[str, "Rolling summary of turns older than the recent window"]
+    recent_turns: Annotated[list, "Most recent turns kept verbatim"]
 
 
 # Risk management team state
@@ -45,6 +47,8 @@ class RiskDebateState(TypedDict):
     ]  # Last response
     judge_decision: Annotated[str, "Judge's decision"]
     count: Annotated[int, "Length of the current conversation"]  # Conversation length
+    history_summary: Annotated[str, "Rolling summary of turns older than the recent window"]
+    recent_turns: Annotated[list, "Most recent turns kept verbatim"]
 
 
 class AgentState(MessagesState):
@@ -61,6 +65,7 @@ class AgentState(MessagesState):
         str, "Report from the News Researcher of current world affairs"
     ]
     fundamentals_report: Annotated[str, "Report from the Fundamentals Researcher"]
+    report_digests: Annotated[dict, "Bounded digests of the analyst reports for the debate stages"]
 
     # researcher team discussion step
     investment_debate_state: Annotated[
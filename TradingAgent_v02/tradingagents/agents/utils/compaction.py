@@ -0,0 +1,140 @@
+import logging
+
+from tradingagents.dataflows.config import get_config
+
+logger = logging.getLogger(__name__)
+
+REPORT_SECTIONS = {
+    "market_report": "Market Research Report",
+    "sentiment_report": "Social Media Sentiment Report",
+    "news_report": "World Affairs News Report",
+    "fundamentals_report": "Company Fundamentals Report",
+}
+
+
+def _clip(text: str, max_chars: int) -> str:
+    """Hard cap on text length, cutting at a line boundary when possible."""
+    if len(text) <= max_chars:
+        return text
+    clipped = text[:max_chars]
+    cut = clipped.rfind("\n")
+    if cut > max_chars // 2:
+        clipped = clipped[:cut]
+    return clipped + "\n[...truncated]"
+
+
+def _digest_prompt(title: str, report: str, max_words: int) -> str:
+    return f"""Condense the following {title} into a structured digest of at most {max_words} words for other analysts in a trading debate. Use exactly these sections:
+
+Stance: bullish, bearish or neutral, with a one-line justification.
+Key Facts: up to 5 bullets with the concrete numbers, levels and dates that matter.
+Risks: up to 3 bullets.
+Catalysts: up to 3 bullets.
+
+Keep figures exact and do not add anything that is not in the report.
+
+{title}:
+{report}"""
+
+
+def create_report_compactor(llm):
+    def report_compactor_node(state) -> dict:
+        """Produce bounded digests of each analyst report before the debate."""
+        config = get_config()
+        max_chars = config.get("report_digest_max_chars", 2500)
+        max_words = max_chars // 6
+
+        digests = {}
+        pending = []
+        for key, title in REPORT_SECTIONS.items():
+            report = state.get(key, "") or ""
+            if len(report) <= max_chars:
+                digests[key] = report
+            else:
+                pending.append((key, title, report))
+
+        if pending:
+            prompts = [_digest_prompt(title, report, max_words) for _, title, report in pending]
+            try:
+                # One concurrent batch instead of a call per report
+                responses = llm.batch(prompts)
+                contents = [response.content for response in responses]
+            except Exception as e:
+                print(f"Report compaction failed, truncating reports instead: {e}")
+                contents = [report for _, _, report in pending]
+
+            for (key, _, _), content in zip(pending, contents):
+                digests[key] = _clip(content, max_chars)
+
+        return {"report_digests": digests}
+
+    return report_compactor_node
+
+
+def get_report_context(state) -> tuple:
+    """Return (market, sentiment, news, fundamentals) reports for debate prompts.
+
+    Uses the compacted digests when the compaction stage has run, otherwise the
+    full analyst reports.
+    """
+    digests = state.get("report_digests") or {}
+    return tuple(digests.get(key) or state.get(key, "") for key in REPORT_SECTIONS)
+
+
+def get_debate_history(debate_state) -> str:
+    """Return the debate history as rolling summary plus the last turns.
+
+    Falls back to the full history string when compaction is disabled or the
+    debate state predates it.
+    """
+    config = get_config()
+    turns = debate_state.get("recent_turns")
+    if not config.get("compact_reports", True) or turns is None:
+        return debate_state.get("history", "")
+
+    summary = debate_state.get("history_summary", "")
+    recent = "\n".join(turns)
+    if summary:
+        return f"Summary of earlier turns: {summary}\n\nMost recent turns:\n{recent}"
+    return recent
+
+
+def update_debate_history(debate_state, argument, llm) -> dict:
+    """Append a turn and fold turns beyond the window into the rolling summary.
+
+    Turns past the window are folded in batches of `debate_summary_batch_turns`
+    (about one round), so the summary call is made once per batch rather than
+    on every turn. `argument` may also be a list of turns (a whole parallel
+    round). Returns the `history_summary` and `recent_turns` fields for the
+    new debate state.
+    """
+    config = get_config()
+    keep_turns = max(1, config.get("debate_history_turns", 3))
+    batch_turns = max(1, config.get("debate_summary_batch_turns", 3))
+    max_chars = config.get("debate_summary_max_chars", 2000)
+
+    summary = debate_state.get("history_summary", "")
+    new_turns = argument if isinstance(argument, list) else [argument]
+    turns = list(debate_state.get("recent_turns") or []) + new_turns
+
+    # A parallel round folds once after merging, not in each debater
+    if debate_state.get("fold_deferred"):
+        return {"history_summary": summary, "recent_turns": turns}
+
+    if config.get("compact_reports", True) and len(turns) >= keep_turns + batch_turns:
+        dropped, turns = turns[:-keep_turns], turns[-keep_turns:]
+        prompt = (
+            f"Update the running summary of a trading debate with the new turns below. "
+            f"Keep each speaker's position, their strongest evidence and any concessions. "
+            f"Stay under {max_chars // 6} words.\n\n"
+            f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n" + "\n".join(dropped)
+        )
+        try:
+            summary = llm.invoke(prompt).content
+        except Exception:
+            logger.warning("Debate summary update failed, keeping extractive summary", exc_info=True)
+            clipped = [turn[: max_chars // len(dropped)] for turn in dropped]
+            summary = "\n".join([summary] + clipped if summary else clipped)
+        summary = _clip(summary, max_chars)
+
+    return {"history_summary": summary, "recent_turns": turns}
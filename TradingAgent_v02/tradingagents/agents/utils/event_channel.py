@@ -0,0 +1,134 @@
+import json
+import zlib
+import asyncio
+from typing import Any, Dict, List, Optional
+
+# Events that may be merged or dropped when the client falls behind; anything
+# else (progress, results, status, errors) is always delivered in order.
+MERGEABLE = {"stream_chunk"}
+DROPPABLE = {"log", "stream_chunk"}
+
+
+class EventChannel:
+    """Outbound event stream for one websocket session.
+
+    Events are buffered and flushed as one frame per `window` seconds (or as
+    soon as `max_frame_events` are waiting), instead of one socket write per
+    token. Consecutive `stream_chunk` events are merged. When a slow client
+    lets more than `max_pending` events pile up, the oldest log lines and
+    stream chunks are dropped and replaced by a single notice. With
+    `compress`, frames are sent as zlib-compressed binary JSON.
+
+    A frame with one event is sent as that event; larger frames are
+    `{"type": "batch", "events": [...]}`.
+    """
+
+    def __init__(
+        self,
+        websocket,
+        window: float = 0.05,
+        max_frame_events: int = 100,
+        max_pending: int = 500,
+        compress: bool = False,
+    ):
+        self.websocket = websocket
+        self.window = window
+        self.max_frame_events = max_frame_events
+        self.max_pending = max_pending
+        self.compress = compress
+
+        self._pending: List[Dict[str, Any]] = []
+        self._dropped = 0
+        self._wakeup = asyncio.Event()
+        self._flushed = asyncio.Event()
+        self._closed = False
+        self._writer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> "EventChannel":
+        self._writer = asyncio.create_task(self._write_loop())
+        return self
+
+    async def send(self, event: Dict[str, Any]):
+        """Queue an event; never waits on the socket."""
+        if self._error is not None:
+            raise self._error
+        last = self._pending[-1] if self._pending else None
+        if last is not None and event.get("type") in MERGEABLE and last.get("type") == event.get("type"):
+            merged = {**last, **event}
+            if "content" in last or "content" in event:
+                merged["content"] = last.get("content", "") + event.get("content", "")
+            self._pending[-1] = merged
+        else:
+            self._pending.append(event)
+
+        if len(self._pending) > self.max_pending:
+            self._shed()
+        if len(self._pending) >= self.max_frame_events:
+            self._wakeup.set()
+
+    # Compatibility with code written against WebSocket.send_json
+    send_json = send
+
+    async def drain(self):
+        """Wait until everything queued so far has been written.
+
+        Bulk senders (e.g. a reconnect replay) call this between chunks
+        smaller than `max_pending` so nothing they send is shed.
+        """
+        while self._pending and self._error is None and self._writer is not None and not self._writer.done():
+            self._flushed.clear()
+            self._wakeup.set()
+            await self._flushed.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _shed(self):
+        """Drop the oldest droppable events until the buffer is back under its limit."""
+        excess = len(self._pending) - self.max_pending
+        kept = []
+        for event in self._pending:
+            if excess > 0 and event.get("type") in DROPPABLE:
+                excess -= 1
+                self._dropped += 1
+                continue
+            kept.append(event)
+        self._pending = kept
+
+    async def _write_loop(self):
+        try:
+            while not (self._closed and not self._pending):
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self._flush()
+                self._flushed.set()
+                if len(self._pending) >= self.max_frame_events:
+                    self._wakeup.set()
+        except Exception as e:
+            # Client went away; later send() calls surface the error
+            self._error = e
+        finally:
+            self._flushed.set()
+
+    async def _flush(self):
+        if not self._pending and not self._dropped:
+            return
+        frame, self._pending = self._pending[: self.max_frame_events], self._pending[self.max_frame_events:]
+        if self._dropped:
+            frame.insert(0, {"type": "log", "message": f"[System] {self._dropped} updates skipped (slow connection)"})
+            self._dropped = 0
+        payload = frame[0] if len(frame) == 1 else {"type": "batch", "events": frame}
+        if self.compress:
+            await self.websocket.send_bytes(zlib.compress(json.dumps(payload).encode("utf-8")))
+        else:
+            await self.websocket.send_json(payload)
+
+    async def close(self):
+        """Flush what is left and stop the writer."""
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            await self._writer
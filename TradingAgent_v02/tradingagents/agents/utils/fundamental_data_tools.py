@@ -1,6 +1,8 @@
 from langchain_core.tools import tool
 from typing import Annotated
 from tradingagents.dataflows.interface import route_to_vendor
+from tradingagents.dataflows.results import render
+from tradingagents.agents.utils.tool_output import shape_tool_output
 
 
 @tool
@@ -17,7 +19,7 @@ def get_fundamentals(
     Returns:
         str: A formatted report containing comprehensive fundamental data
     """
-    return route_to_vendor("get_fundamentals", ticker, curr_date)
+    return shape_tool_output(render(route_to_vendor("get_fundamentals", ticker, curr_date)))
 
 
 @tool
@@ -36,7 +38,7 @@ def get_balance_sheet(
     Returns:
         str: A formatted report containing balance sheet data
     """
-    return route_to_vendor("get_balance_sheet", ticker, freq, curr_date)
+    return shape_tool_output(render(route_to_vendor("get_balance_sheet", ticker, freq, curr_date)))
 
 
 @tool
@@ -55,7 +57,7 @@ def get_cashflow(
     Returns:
         str: A formatted report containing cash flow statement data
     """
-    return route_to_vendor("get_cashflow", ticker, freq, curr_date)
+    return shape_tool_output(render(route_to_vendor("get_cashflow", ticker, freq, curr_date)))
 
 
 @tool
@@ -74,4 +76,4 @@ def get_income_statement(
     Returns:
         str: A formatted report containing income statement data
     """
-    return route_to_vendor("get_income_statement", ticker, freq, curr_date)
\ No newline at end of file
+    return shape_tool_output(render(route_to_vendor("get_income_statement", ticker, freq, curr_date)))
\ No newline at end of file
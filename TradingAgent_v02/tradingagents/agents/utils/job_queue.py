@@ -0,0 +1,361 @@
+import os
+import json
+import asyncio
+import heapq
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import hashlib
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from tradingagents.dataflows.config import get_config
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+EVENT_HISTORY = 1000  # events replayed to subscribers that attach mid-run
+COLUMNS = (
+    "id", "kind", "user", "payload", "priority", "status", "created_at",
+    "started_at", "finished_at", "result", "error", "dedupe_key",
+)
+
+
+class QueueFullError(Exception):
+    """The user already has the maximum number of pending jobs."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user: str
+    payload: Dict[str, Any]
+    priority: int = 5  # lower runs first
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    dedupe_key: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobQueue:
+    """Background analysis jobs with priorities and per-user fair queuing.
+
+    Jobs are persisted in SQLite so status and results survive restarts, and
+    run on a bounded pool of worker threads. The next job is taken from the
+    best pending priority; among users waiting at that priority, the one
+    served least recently goes first, so one user's batch cannot starve others.
+    Progress events are fanned out to subscribers per job.
+
+    Submissions with a `dedupe_key` are single-flight: an identical request
+    attaches to the queued or running job and shares its events, and with a
+    `cache_ttl` a recent successful result is returned without running again.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, workers: int = 2, max_pending_per_user: int = 20):
+        self._data_dir = data_dir
+        self._db_path: Optional[str] = None
+        self._db_lock = threading.Lock()
+        self.workers = workers
+        self.max_pending_per_user = max_pending_per_user
+        self.handlers: Dict[str, Callable] = {}
+
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self._pending: Dict[str, list] = {}  # user -> heap of (priority, seq, job_id)
+        self._last_served: Dict[str, int] = {}
+        self._seq = 0
+        self._served = 0
+        self._subscribers: Dict[str, list] = {}  # job id -> [(queue, put)]
+        self._history: Dict[str, deque] = {}
+        self._inflight: Dict[str, str] = {}  # dedupe_key -> job id
+        self._threads: List[threading.Thread] = []
+
+    # Storage
+
+    @property
+    def db_path(self) -> str:
+        """`<data_cache_dir>/jobs.db`, created on first use rather than at import."""
+        with self._db_lock:
+            if self._db_path is None:
+                data_dir = self._data_dir or get_config()["data_cache_dir"]
+                os.makedirs(data_dir, exist_ok=True)
+                path = os.path.join(data_dir, "jobs.db")
+                self._init_db(path)
+                self._db_path = path
+            return self._db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _init_db(path: str):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT, user TEXT, payload TEXT, priority INTEGER,"
+                " status TEXT, created_at REAL, started_at REAL, finished_at REAL,"
+                " result TEXT, error TEXT)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "dedupe_key" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN dedupe_key TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, finished_at)")
+        conn.close()
+
+    def _save(self, job: Job):
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                (
+                    job.id, job.kind, job.user, json.dumps(job.payload), job.priority, job.status,
+                    job.created_at, job.started_at, job.finished_at,
+                    json.dumps(job.result) if job.result is not None else None, job.error,
+                    job.dedupe_key,
+                ),
+            )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"], kind=row["kind"], user=row["user"], payload=json.loads(row["payload"]),
+            priority=row["priority"], status=row["status"], created_at=row["created_at"],
+            started_at=row["started_at"], finished_at=row["finished_at"],
+            result=json.loads(row["result"]) if row["result"] else None, error=row["error"],
+            dedupe_key=row["dedupe_key"],
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, user: Optional[str] = None, limit: int = 50) -> List[Job]:
+        with self._connect() as conn:
+            if user:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE user = ? ORDER BY created_at DESC LIMIT ?", (user, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    # Scheduling
+
+    def register(self, kind: str, handler: Callable[[Job, Callable[[dict], None]], dict]):
+        """`handler(job, emit)` runs the job and returns its JSON result."""
+        self.handlers[kind] = handler
+
+    def _push(self, job: Job):
+        self._seq += 1
+        heapq.heappush(self._pending.setdefault(job.user, []), (job.priority, self._seq, job.id))
+
+    def _pop_next(self) -> Optional[str]:
+        heads = {user: heap[0] for user, heap in self._pending.items() if heap}
+        if not heads:
+            return None
+        best = min(head[0] for head in heads.values())
+        user = min(
+            (u for u, head in heads.items() if head[0] == best),
+            key=lambda u: (self._last_served.get(u, -1), heads[u][1]),
+        )
+        _, _, job_id = heapq.heappop(self._pending[user])
+        self._served += 1
+        self._last_served[user] = self._served
+        return job_id
+
+    def _cached(self, dedupe_key: str, ttl: float) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE dedupe_key = ? AND status = ? AND finished_at >= ?"
+                " ORDER BY finished_at DESC LIMIT 1",
+                (dedupe_key, SUCCEEDED, time.time() - ttl),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        user: str = "default",
+        priority: int = 5,
+        dedupe_key: Optional[str] = None,
+        cache_ttl: float = 0,
+    ) -> Job:
+        """Queue a job, or return an identical in-flight or cached one.
+
+        A returned job may belong to another submitter; its status tells
+        whether it is still running or already finished.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        with self.lock:
+            if dedupe_key:
+                inflight = self._inflight.get(dedupe_key)
+                if inflight is not None:
+                    return self.get(inflight)
+                if cache_ttl > 0:
+                    cached = self._cached(dedupe_key, cache_ttl)
+                    if cached is not None:
+                        return cached
+            pending = len(self._pending.get(user, []))
+            if pending >= self.max_pending_per_user:
+                raise QueueFullError(f"User '{user}' already has {pending} pending jobs")
+            job = Job(id=uuid.uuid4().hex, kind=kind, user=user, payload=payload, priority=priority,
+                      dedupe_key=dedupe_key)
+            self._save(job)
+            self._push(job)
+            if dedupe_key:
+                self._inflight[dedupe_key] = job.id
+            self.ready.notify()
+        self._publish(job.id, {"type": "status", "status": QUEUED})
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet."""
+        # Check-and-set under the lock, so a worker can't start it in between
+        with self.lock:
+            job = self.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            job.status, job.finished_at = CANCELLED, time.time()
+            self._save(job)
+            heap = self._pending.get(job.user, [])
+            if any(entry[2] == job_id for entry in heap):
+                heap[:] = [entry for entry in heap if entry[2] != job_id]
+                heapq.heapify(heap)
+            self._release(job)
+        self._publish(job_id, {"type": "status", "status": CANCELLED})
+        with self.lock:
+            self._history.pop(job_id, None)
+        return True
+
+    def _release(self, job: Job):
+        """Stop attaching new identical requests to `job`. Caller holds the lock."""
+        if job.dedupe_key and self._inflight.get(job.dedupe_key) == job.id:
+            del self._inflight[job.dedupe_key]
+
+    # Workers
+
+    def start(self):
+        """Start the worker threads and requeue jobs interrupted by a restart."""
+        with self.lock:
+            if self._threads:
+                return
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+                ).fetchall()
+            for row in rows:
+                job = self._row_to_job(row)
+                job.status, job.started_at = QUEUED, None
+                self._save(job)
+                self._push(job)
+                if job.dedupe_key:
+                    self._inflight[job.dedupe_key] = job.id
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            with self.lock:
+                job_id = self._pop_next()
+                while job_id is None:
+                    self.ready.wait()
+                    job_id = self._pop_next()
+            self._run(job_id)
+
+    def _run(self, job_id: str):
+        with self.lock:
+            job = self.get(job_id)
+            if job is None or job.status != QUEUED:
+                return  # cancelled after it was popped
+            job.status, job.started_at = RUNNING, time.time()
+            self._save(job)
+        self._publish(job_id, {"type": "status", "status": RUNNING})
+
+        try:
+            job.result = self.handlers[job.kind](job, lambda event: self._publish(job_id, event))
+            job.status = SUCCEEDED
+        except Exception as e:
+            print(f"Job {job_id} ({job.kind}) failed: {e}")
+            job.status, job.error = FAILED, str(e)
+        job.finished_at = time.time()
+        self._save(job)
+        with self.lock:
+            self._release(job)
+        self._publish(job_id, {"type": "status", "status": job.status, "error": job.error})
+        with self.lock:
+            self._history.pop(job_id, None)
+
+    # Events
+
+    def subscribe(self, job_id: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Queue receiving the job's events; the final status event ends the stream.
+
+        Events already published for a running job are replayed first, so a
+        request that attached mid-run sees the same stream as the first one.
+        With `loop` (called from that loop), an `asyncio.Queue` is returned and
+        fed via `call_soon_threadsafe`, so async consumers await events without
+        holding an executor thread.
+        """
+        if loop is None:
+            events = queue.Queue()
+            put = events.put
+        else:
+            events = asyncio.Queue()
+
+            def put(event):
+                try:
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+                except RuntimeError:
+                    pass  # loop already closed
+
+        with self.lock:
+            for event in self._history.get(job_id, ()):
+                events.put_nowait(event)
+            self._subscribers.setdefault(job_id, []).append((events, put))
+        return events
+
+    def unsubscribe(self, job_id: str, events):
+        with self.lock:
+            subscribers = [s for s in self._subscribers.get(job_id, []) if s[0] is not events]
+            if subscribers:
+                self._subscribers[job_id] = subscribers
+            else:
+                self._subscribers.pop(job_id, None)
+
+    def _publish(self, job_id: str, event: dict):
+        event = {"job_id": job_id, **event}
+        with self.lock:
+            self._history.setdefault(job_id, deque(maxlen=EVENT_HISTORY)).append(event)
+            subscribers = list(self._subscribers.get(job_id, []))
+        for _, put in subscribers:
+            put(event)
+
+
+def dedupe_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Stable key for identical requests (same kind and payload)."""
+    return hashlib.sha1(f"{kind}|{json.dumps(payload, sort_keys=True)}".encode("utf-8")).hexdigest()
+
+
+job_queue = JobQueue()
@@ -1,11 +1,49 @@
-
 import os
 import requests
 import json
 import time
+import hashlib
+import threading
+from requests.adapters import HTTPAdapter
+
+# Tokens are reissued this long before they expire
+TOKEN_REFRESH_MARGIN = 600
+# KIS issues at most one token per minute; don't retry sooner after a failure
+TOKEN_RETRY_INTERVAL = 60
+# Gateway codes for an expired / invalid token
+TOKEN_ERROR_CODES = ("EGW00123", "EGW00121")
+# Requests per second allowed per app key
+RATE_LIMITS = {"REAL": 20, "VIRTUAL": 2}
+
+
+class RateLimiter:
+    """Spaces calls evenly so at most `rate` start in any second, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
 
 class KisUSClient:
-    def __init__(self):
+    """KIS overseas-stock REST client.
+
+    The OAuth token is persisted with its expiry under `data_dir`, so restarts
+    reuse it instead of spending the broker's issuance quota, and is
+    reissued behind a lock shortly before it expires (or when the gateway
+    rejects it). All calls share one keep-alive session and go through a
+    local rate limiter sized to the account's TR limit.
+    """
+
+    def __init__(self, data_dir: str = "./dataflows/data_cache"):
         self.app_key = os.getenv("KIS_APP_KEY")
         self.app_secret = os.getenv("KIS_APP_SECRET")
         self.ano = os.getenv("KIS_CANO") # Account No (Front 8)
@@ -16,13 +54,92 @@ class KisUSClient:
             self.base_url = "https://openapi.koreainvestment.com:9443"
         else:
             self.base_url = "https://openapivts.koreainvestment.com:29443"
+        self.base_url = os.getenv("KIS_BASE_URL", self.base_url)
 
+        key_id = hashlib.sha1((self.app_key or "").encode("utf-8")).hexdigest()[:12]
+        self.token_path = os.path.join(data_dir, f"kis_token_{self.mode.lower()}_{key_id}.json")
+        self.data_dir = data_dir
         self.access_token = None
-    
-    def _headers(self, tr_id=None):
+        self.token_expires_at = 0.0
+        self.token_lock = threading.Lock()
+        self._token_retry_at = 0.0
+        self._token_loaded = False
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+        self.limiter = RateLimiter(float(os.getenv("KIS_RATE_LIMIT", RATE_LIMITS.get(self.mode, 2))))
+        self.timeout = 10
+
+    # Token lifecycle
+
+    def _load_token(self):
+        """Adopt a persisted token for this key and mode. Caller holds the token lock."""
+        self._token_loaded = True
+        try:
+            with open(self.token_path, "r") as f:
+                data = json.load(f)
+            self.access_token, self.token_expires_at = data["access_token"], data["expires_at"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save_token(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_path = self.token_path + ".tmp"
+        # The token is a credential; keep it private to this user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"access_token": self.access_token, "expires_at": self.token_expires_at}, f)
+        os.replace(tmp_path, self.token_path)
+
+    def _token_valid(self) -> bool:
+        return bool(self.access_token) and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN
+
+    def get_access_token(self, rejected: str = None):
+        """Current token, reissued when near expiry or when it is `rejected` (the token the gateway refused)."""
+        if self._token_valid() and (rejected is None or self.access_token != rejected):
+            return self.access_token
+
+        with self.token_lock:
+            if not self._token_loaded:
+                self._load_token()
+            # Another thread may have refreshed (or already replaced the rejected token) while we waited
+            if self._token_valid() and self.access_token != rejected:
+                return self.access_token
+            if time.time() < self._token_retry_at:
+                # Still usable if not actually expired yet
+                return self.access_token if time.time() < self.token_expires_at else None
+
+            url = f"{self.base_url}/oauth2/tokenP"
+            headers = {"content-type": "application/json"}
+            body = {
+                "grant_type": "client_credentials",
+                "appkey": self.app_key,
+                "appsecret": self.app_secret
+            }
+
+            try:
+                self.limiter.acquire()
+                res = self.session.post(url, headers=headers, data=json.dumps(body), timeout=self.timeout)
+                if res.status_code == 200:
+                    data = res.json()
+                    self.access_token = data["access_token"]
+                    self.token_expires_at = time.time() + float(data.get("expires_in", 86400))
+                    self._save_token()
+                    return self.access_token
+                else:
+                    print(f"KIS Token Error: {res.text}")
+            except Exception as e:
+                print(f"KIS Token Exception: {e}")
+            self._token_retry_at = time.time() + TOKEN_RETRY_INTERVAL
+            return self.access_token if time.time() < self.token_expires_at else None
+
+    # Requests
+
+    def _headers(self, tr_id=None, token=None):
         headers = {
             "content-type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {self.get_access_token()}",
+            "authorization": f"Bearer {token or self.get_access_token()}",
             "appkey": self.app_key,
             "appsecret": self.app_secret
         }
@@ -30,30 +147,23 @@ class KisUSClient:
             headers["tr_id"] = tr_id
         return headers
 
-    def get_access_token(self):
-        # MVP: Simple token fetch (In prod, should cache/refresh)
-        if self.access_token:
-            return self.access_token
-        
-        url = f"{self.base_url}/oauth2/tokenP"
-        headers = {"content-type": "application/json"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret
-        }
-        
-        try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
-            if res.status_code == 200:
-                self.access_token = res.json()["access_token"]
-                return self.access_token
-            else:
-                print(f"KIS Token Error: {res.text}")
-                return None
-        except Exception as e:
-            print(f"KIS Token Exception: {e}")
-            return None
+    def _request(self, method: str, path: str, tr_id: str, params=None, body=None):
+        """Rate-limited call on the shared session; retried once with a new token if it was rejected."""
+        url = f"{self.base_url}{path}"
+        token = self.get_access_token()
+        for attempt in range(2):
+            self.limiter.acquire()
+            res = self.session.request(
+                method, url, headers=self._headers(tr_id=tr_id, token=token),
+                params=params, data=json.dumps(body) if body is not None else None, timeout=self.timeout,
+            )
+            data = res.json()
+            if attempt == 0 and (res.status_code == 401 or data.get("msg_cd") in TOKEN_ERROR_CODES):
+                # Concurrent rejections of the same token share a single reissue
+                token = self.get_access_token(rejected=token)
+                continue
+            return res, data
+        return res, data
 
     def get_balance(self):
         """
@@ -61,10 +171,8 @@ class KisUSClient:
         TR_ID: VTTT8804U (Virtual), TTTS3012R (Real - Check docs, usually different)
         For MVP, assuming Virtual US Stock Balance TR
         """
-        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/inquire-present-balance"
         tr_id = "VTTT8804U" if self.mode == "VIRTUAL" else "TTTS3012R" # Check real TR ID
 
-        headers = self._headers(tr_id=tr_id)
         params = {
             "CANO": self.ano,
             "ACNT_PRDT_CD": self.ano_prdt,
@@ -73,10 +181,9 @@ class KisUSClient:
             "TR_MK": "01",
             "INQR_DVS_CD": "00"
         }
-        
+
         try:
-            res = requests.get(url, headers=headers, params=params)
-            data = res.json()
+            res, data = self._request("GET", "/uapi/overseas-stock/v1/trading/inquire-present-balance", tr_id, params=params)
             if res.status_code == 200 and data['rt_cd'] == '0':
                 # Parse output2 for deposit
                 # Note: KIS API response structure varies. Assume 'output2' has 'ovrs_ord_psbl_amt' (Orderable Amount)
@@ -90,33 +197,22 @@ class KisUSClient:
             print(f"KIS Balance Exception: {e}")
             return 0.0
 
-    def buy_limit_order(self, ticker: str, qty: int, price: float, exchange_cd: str = "NASD"):
-        """
-        Buy US Stock (Limit Order)
-        TR_ID: VTTT1002U (Virtual Buy), TTTS1002U (Real Buy)
-        """
-        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order"
-        tr_id = "VTTT1002U" if self.mode == "VIRTUAL" else "TTTS1002U" 
-
-        headers = self._headers(tr_id=tr_id)
-        
-        # KIS requires strict formatting
+    def _order(self, tr_id: str, ticker: str, qty: int, price: float, exchange_cd: str):
         # KIS requires strict formatting
         # ORD_SVR_DVS_CD: Try empty string for overseas
         body = {
             "CANO": self.ano,
             "ACNT_PRDT_CD": self.ano_prdt,
-            "OVRS_EXCG_CD": exchange_cd, 
+            "OVRS_EXCG_CD": exchange_cd,
             "PDNO": ticker.upper(),
             "ORD_QTY": str(qty),
             "OVRS_ORD_UNPR": str(price),
             "ORD_SVR_DVS_CD": "0",
             "ORD_DVS": "00" # Limit
         }
-        
+
         try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
-            data = res.json()
+            res, data = self._request("POST", "/uapi/overseas-stock/v1/trading/order", tr_id, body=body)
             if res.status_code == 200 and data['rt_cd'] == '0':
                 return {"success": True, "msg": data['msg1'], "order_no": data['output']['ODNO']}
             else:
@@ -124,36 +220,21 @@ class KisUSClient:
         except Exception as e:
             return {"success": False, "msg": str(e)}
 
+    def buy_limit_order(self, ticker: str, qty: int, price: float, exchange_cd: str = "NASD"):
+        """
+        Buy US Stock (Limit Order)
+        TR_ID: VTTT1002U (Virtual Buy), TTTS1002U (Real Buy)
+        """
+        tr_id = "VTTT1002U" if self.mode == "VIRTUAL" else "TTTS1002U"
+        return self._order(tr_id, ticker, qty, price, exchange_cd)
+
     def sell_limit_order(self, ticker: str, qty: int, price: float, exchange_cd: str = "NASD"):
         """
         Sell US Stock (Limit Order)
         TR_ID: VTTT1001U (Virtual Sell), TTTS1001U (Real Sell)
         """
-        url = f"{self.base_url}/uapi/overseas-stock/v1/trading/order"
         tr_id = "VTTT1001U" if self.mode == "VIRTUAL" else "TTTS1001U"
-
-        headers = self._headers(tr_id=tr_id)
-        
-        body = {
-            "CANO": self.ano,
-            "ACNT_PRDT_CD": self.ano_prdt,
-            "OVRS_EXCG_CD": exchange_cd, 
-            "PDNO": ticker.upper(),
-            "ORD_QTY": str(qty),
-            "OVRS_ORD_UNPR": str(price),
-            "ORD_SVR_DVS_CD": "0", 
-            "ORD_DVS": "00" 
-        }
-        
-        try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
-            data = res.json()
-            if res.status_code == 200 and data['rt_cd'] == '0':
-                return {"success": True, "msg": data['msg1'], "order_no": data['output']['ODNO']}
-            else:
-                 return {"success": False, "msg": data.get('msg1', 'Unknown Error')}
-        except Exception as e:
-            return {"success": False, "msg": str(e)}
+        return self._order(tr_id, ticker, qty, price, exchange_cd)
 
     # Mock Mode for testing without API Keys
     def mock_order(self, ticker, qty, price, side="BUY", exchange_cd="NASD"):
@@ -21,13 +21,26 @@ class FinancialSituationMemory:
         )
         return response.data[0].embedding
 
-    def add_situations(self, situations_and_advice):
-        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
+    def get_embeddings(self, texts):
+        """Get OpenAI embeddings for several texts in one request, embedding duplicates once"""
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return []
+        response = self.client.embeddings.create(
+            model=self.embedding, input=unique_texts
+        )
+        by_text = {text: item.embedding for text, item in zip(unique_texts, response.data)}
+        return [by_text[text] for text in texts]
+
+    def add_situations(self, situations_and_advice, embeddings=None):
+        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)
+
+        Pass `embeddings` (one per tuple) to reuse situation embeddings that were already computed.
+        """
 
         situations = []
         advice = []
         ids = []
-        embeddings = []
 
         offset = self.situation_collection.count()
 
@@ -35,7 +48,11 @@ class FinancialSituationMemory:
             situations.append(situation)
             advice.append(recommendation)
             ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+
+        if not situations:
+            return
+        if embeddings is None:
+            embeddings = self.get_embeddings(situations)
 
         self.situation_collection.add(
             documents=situations,
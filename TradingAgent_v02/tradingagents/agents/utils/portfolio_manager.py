@@ -6,7 +6,7 @@ class PortfolioManager:
     def __init__(self):
         pass
 
-    def judge_and_execute(self, ticker: str, price: float, confidence: str, reason: str, action: str = "BUY", exchange_cd: str = "NASD"):
+    def judge_and_execute(self, ticker: str, price: float, confidence: str, reason: str, action: str = "BUY", exchange_cd: str = "NASD", user: str = "default"):
         """
         1. Validates Confidence (Must be High/Strong) - Relaxed for testing
         2. Calculates Position Size
@@ -18,7 +18,7 @@ class PortfolioManager:
         #    return {"success": False, "msg": f"Trade skipped: Confidence '{confidence}' is too low."}
 
         # 2. Get Profile & Balance
-        profile = profile_manager.load_profile()
+        profile = profile_manager.load_profile(user)
         risk_tol = profile.risk_tolerance.upper()
         
         # Determine Allocation % based on Risk Tolerance
@@ -1,20 +1,40 @@
-
-from typing import List
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from threading import Lock
 
+from tradingagents.dataflows.peer_index import peer_index
+
 class RecommendedTickers(BaseModel):
     tickers: List[str] = Field(description="List of 3 recommended stock tickers (e.g. ['AMD', 'TSM', 'INTC'])")
     reasoning: str = Field(description="Brief explanation of why these were chosen based on the profile")
 
 class TickerRecommender:
-    def __init__(self, llm_model: str = "gpt-4o"):
+    """Suggests related tickers for a target ticker and user profile.
+
+    Candidates come from the local peer index (return correlation plus
+    shared industry/sector, filtered by the profile's avoided and favourite
+    sectors); the LLM only reranks them against the profile,
+    and proposes its own picks when the graph knows no peers. LLM results are
+    memoized per (ticker, profile, ISO week of the analysis date), and
+    concurrent identical requests share one LLM call.
+    """
+
+    def __init__(self, llm_model: str = "gpt-4o", cache_size: int = 256, max_candidates: int = 12):
         self.llm = ChatOpenAI(model=llm_model, temperature=0.7)
         self.parser = JsonOutputParser(pydantic_object=RecommendedTickers)
-        
+        self.cache_size = cache_size
+        self.max_candidates = max_candidates
+        self.lock = Lock()
+        self._cache: "OrderedDict[Tuple[str, str, str], RecommendedTickers]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a Senior Portfolio Strategist. Your goal is to recommend 3 related or complementary stock tickers based on a Target Ticker and the User's Investment Profile.\n"
                        "1. Identify the sector/industry of the Target Ticker.\n"
@@ -22,27 +42,117 @@ class TickerRecommender:
                        "   - Competitors (if they like the sector)\n"
                        "   - Supply chain partners (upstream/downstream)\n"
                        "   - Similar growth/value plays in adjacent sectors\n"
+                       "   - Prefer the Candidate Peers when given; rank them for this user rather than inventing new names.\n"
                        "3. STRICTLY ADHERE to the User's Profile (Risk Tolerance, Favorites, Avoids).\n"
                        "   - If they avoid 'Semiconductors', do NOT recommend chips, even if the target is NVDA. Find a related tech play instead.\n"
                        "4. Return exactly 3 valid US Market Tickers.\n"
                        "{format_instructions}"),
-            ("user", "Target Ticker: {ticker}\nUser Profile: {profile_summary}")
+            ("user", "Target Ticker: {ticker}\nCandidate Peers: {candidates}\nUser Profile: {profile_summary}")
         ])
+        # Built once and reused; invoke/ainvoke are safe to call concurrently
+        self.chain = self.prompt | self.llm | self.parser
+
+    @staticmethod
+    def _cache_key(ticker: str, profile_summary: str, date_str: Optional[str],
+                   profile_key: Optional[str] = None) -> Tuple[str, str, str]:
+        # `profile_key` (e.g. UserProfile.fingerprint) avoids hashing the profile text
+        day = datetime.strptime(date_str, "%Y-%m-%d") if date_str else datetime.now()
+        year, week, _ = day.isocalendar()
+        profile_key = profile_key or hashlib.sha1(profile_summary.encode("utf-8")).hexdigest()
+        return ticker.upper(), profile_key, f"{year}-W{week:02d}"
+
+    def _cached(self, key) -> Optional[RecommendedTickers]:
+        with self.lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
 
-    def get_recommendations(self, ticker: str, profile_summary: str) -> RecommendedTickers:
+    def _remember(self, key, result: RecommendedTickers):
+        # Only reranker output is memoized; fallbacks are retried next time
+        if not result.tickers:
+            return
+        with self.lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def candidates(self, ticker: str, profile=None) -> List[str]:
+        """Peer tickers from the local index, each labelled with its industry."""
+        peers = peer_index.peers(
+            ticker,
+            k=self.max_candidates,
+            avoid_sectors=profile.avoid_sectors if profile else (),
+            favorite_sectors=profile.favorite_sectors if profile else (),
+        )
+        return [f"{p['ticker']} ({p['industry'] or p['sector'] or 'n/a'})" for p in peers]
+
+    def _inputs(self, ticker: str, profile_summary: str, candidates: List[str]) -> dict:
+        return {
+            "ticker": ticker,
+            "candidates": ", ".join(candidates) if candidates else "None known locally; use your own knowledge.",
+            "profile_summary": profile_summary,
+            "format_instructions": self.parser.get_format_instructions()
+        }
+
+    @staticmethod
+    def _fallback(candidates: List[str]) -> RecommendedTickers:
+        # Without the reranker, the closest peers are still useful
+        if candidates:
+            return RecommendedTickers(
+                tickers=[c.split(" ")[0] for c in candidates[:3]],
+                reasoning="Closest peers by industry and sector (profile ranking unavailable).",
+            )
+        return RecommendedTickers(tickers=[], reasoning="Error generating recommendations.")
+
+    def get_recommendations(self, ticker: str, profile_summary: str, date_str: Optional[str] = None,
+                            profile=None, profile_key: Optional[str] = None) -> RecommendedTickers:
+        key = self._cache_key(ticker, profile_summary, date_str, profile_key)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        candidates = self.candidates(ticker, profile)
         try:
             print(f"DEBUG: Generating recommendations for {ticker}...")
-            chain = self.prompt | self.llm | self.parser
-            result = chain.invoke({
-                "ticker": ticker,
-                "profile_summary": profile_summary,
-                "format_instructions": self.parser.get_format_instructions()
-            })
-            return RecommendedTickers(**result)
+            result = RecommendedTickers(**self.chain.invoke(self._inputs(ticker, profile_summary, candidates)))
         except Exception as e:
             print(f"ERROR in Recommender: {e}")
-            # Fallback
-            return RecommendedTickers(tickers=[], reasoning="Error generating recommendations.")
+            return self._fallback(candidates)  # not memoized, so the reranker is retried next time
+        self._remember(key, result)
+        return result
+
+    async def aget_recommendations(self, ticker: str, profile_summary: str, date_str: Optional[str] = None,
+                                   profile=None, profile_key: Optional[str] = None) -> RecommendedTickers:
+        """Async variant for the web app; never blocks the event loop."""
+        key = self._cache_key(ticker, profile_summary, date_str, profile_key)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # Index builds and first-time metadata lookups stay off the event loop
+            candidates = await asyncio.to_thread(self.candidates, ticker, profile)
+            try:
+                print(f"DEBUG: Generating recommendations for {ticker}...")
+                result = RecommendedTickers(**await self.chain.ainvoke(self._inputs(ticker, profile_summary, candidates)))
+                self._remember(key, result)
+            except Exception as e:
+                print(f"ERROR in Recommender: {e}")
+                # Shared with concurrent waiters but not memoized
+                result = self._fallback(candidates)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
 
 # Global instance
 recommender = TickerRecommender()
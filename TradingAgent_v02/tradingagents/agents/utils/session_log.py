@@ -0,0 +1,123 @@
+import time
+import uuid
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class AnalysisSession:
+    """One analysis session's events, kept independently of any websocket.
+
+    Events get increasing sequence numbers and are held in a bounded ring
+    log, so a client that reconnects with the next sequence it expects (its
+    cursor) can replay what it missed and keep following the live run.
+    Sessions live on the event loop; all methods must be called from it.
+    """
+
+    def __init__(self, session_id: str, user: str = "default", max_events: int = 2000):
+        self.id = session_id
+        self.user = user
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+        self._events: deque = deque(maxlen=max_events)  # (seq, event)
+        self._next_seq = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    async def append(self, event: Dict[str, Any]):
+        """Record an event; same signature as a websocket send so runs can write here directly."""
+        self._events.append((self._next_seq, event))
+        self._next_seq += 1
+        self._wake()
+
+    def finish(self):
+        self.finished_at = time.time()
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def since(self, cursor: int) -> Tuple[int, List[Tuple[int, Dict[str, Any]]]]:
+        """Events from `cursor` on, plus how many were already evicted from the ring."""
+        if not self._events:
+            return 0, []
+        oldest = self._events[0][0]
+        missed = max(0, oldest - cursor)
+        start = max(cursor, oldest) - oldest
+        return missed, [self._events[i] for i in range(start, len(self._events))]
+
+    async def wait(self, cursor: int, timeout: float = 30):
+        """Block until there are events at or after `cursor`, or the session ends."""
+        if self._next_seq > cursor or self.done:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def follow(self, cursor: int, send, drain=None, chunk: int = 100):
+        """Replay from `cursor`, then stream live events until the session ends.
+
+        Each event is sent with its `seq`, so the client knows where to resume.
+        With `drain` (e.g. EventChannel.drain), a long replay waits for it
+        after every `chunk` events so a backpressured channel never sheds them.
+        """
+        while True:
+            missed, events = self.since(cursor)
+            if missed:
+                await send({"type": "log", "message": f"[System] {missed} earlier updates expired; resuming from the latest."})
+            for i, (seq, event) in enumerate(events, 1):
+                await send({**event, "seq": seq})
+                if drain is not None and i % chunk == 0:
+                    await drain()
+            cursor = max(cursor, self._next_seq)
+            if self.done and cursor >= self._next_seq:
+                return
+            await self.wait(cursor)
+
+
+class SessionStore:
+    """Live and recently finished analysis sessions, addressable by id.
+
+    Finished sessions are kept for `ttl` seconds so a client that dropped
+    near the end can still collect the result.
+    """
+
+    def __init__(self, max_events: int = 2000, ttl: float = 3600, max_sessions: int = 200):
+        self.max_events = max_events
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, AnalysisSession] = {}
+
+    def create(self, user: str = "default") -> AnalysisSession:
+        self._evict()
+        session = AnalysisSession(uuid.uuid4().hex, user=user, max_events=self.max_events)
+        self.sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[AnalysisSession]:
+        self._evict()
+        return self.sessions.get(session_id)
+
+    def _evict(self):
+        now = time.time()
+        for session_id, session in list(self.sessions.items()):
+            if session.done and now - session.finished_at > self.ttl:
+                del self.sessions[session_id]
+        # Over the cap, drop the oldest finished sessions first; live runs are kept
+        finished = sorted((s for s in self.sessions.values() if s.done), key=lambda s: s.finished_at)
+        while len(self.sessions) > self.max_sessions and finished:
+            del self.sessions[finished.pop(0).id]
+
+
+session_store = SessionStore()
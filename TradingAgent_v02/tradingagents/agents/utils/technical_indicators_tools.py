@@ -1,6 +1,8 @@
 from langchain_core.tools import tool
 from typing import Annotated
 from tradingagents.dataflows.interface import route_to_vendor
+from tradingagents.dataflows.results import render
+from tradingagents.agents.utils.tool_output import shape_tool_output
 
 @tool
 def get_indicators(
@@ -20,4 +22,4 @@ def get_indicators(
     Returns:
         str: A formatted dataframe containing the technical indicators for the specified ticker symbol and indicator.
     """
-    return route_to_vendor("get_indicators", symbol, indicator, curr_date, look_back_days)
\ No newline at end of file
+    return shape_tool_output(render(route_to_vendor("get_indicators", symbol, indicator, curr_date, look_back_days)))
\ No newline at end of file
@@ -0,0 +1,121 @@
+import re
+
+from tradingagents.dataflows.config import get_config
+from tradingagents.dataflows.results import format_float
+from tradingagents.agents.utils.compaction import _clip
+
+NON_TRADING_DAY = "Not a trading day"
+DATE_ROW = re.compile(r"^\s*(\d{4}-\d{2}-\d{2})")
+LONG_FLOAT = re.compile(r"(?<![\w.])(-?\d+\.\d+)(?![\w.])")
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _round_floats(text: str, digits: int, significant: int = 4) -> str:
+    """Shorten floats to `digits` decimals, keeping `significant` figures of small values.
+
+    187.4399871826 -> 187.44, but 0.0045123 -> 0.004512 rather than 0.00.
+    """
+    def repl(match):
+        value = match.group(1)
+        shortened = format_float(float(value), digits, significant)
+        return shortened if len(shortened) < len(value) else value
+
+    return LONG_FLOAT.sub(repl, text)
+
+
+def _row_values(row: str) -> list:
+    """Split a dated row into [date, value, ...] for CSV and `date: value` rows."""
+    if "," in row:
+        return [cell.strip() for cell in row.split(",")]
+    return [cell.strip() for cell in row.split(":", 1)]
+
+
+def _summarize_rows(rows: list, header: str = None) -> list:
+    """One line per numeric column with first/last/min/max over the full window."""
+    table = [_row_values(row) for row in rows]
+    table.sort(key=lambda values: values[0])
+    names = [c.strip() for c in header.split(",")] if header else ["Date", "Value"]
+
+    lines = [f"# Summary of {len(rows)} rows ({table[0][0]} to {table[-1][0]}):"]
+    for col in range(1, max(len(values) for values in table)):
+        numbers = []
+        for values in table:
+            try:
+                numbers.append(float(values[col]))
+            except (IndexError, ValueError):
+                continue
+        if not numbers:
+            continue
+        name = names[col] if col < len(names) else f"col{col}"
+        lines.append(
+            f"#   {name}: first {numbers[0]:g}, last {numbers[-1]:g}, "
+            f"min {min(numbers):g}, max {max(numbers):g}"
+        )
+    return lines
+
+
+def _window_rows(rows: list, max_rows: int, header: str = None, summarize: bool = False) -> list:
+    """Keep the `max_rows` most recent rows of a dated table."""
+    if len(rows) <= max_rows:
+        return rows
+    descending = rows[0][:10] > rows[-1][:10]
+    omitted = len(rows) - max_rows
+    note = f"# ... {omitted} earlier rows omitted ..."
+    prefix = _summarize_rows(rows, header) if summarize else []
+    if descending:
+        return prefix + rows[:max_rows] + [note]
+    return prefix + [note] + rows[-max_rows:]
+
+
+def _window_tables(text: str, max_rows: int, summarize: bool = False) -> str:
+    """Cap every run of consecutive dated rows in the text."""
+    out = []
+    rows = []
+    header = None
+
+    def flush():
+        if rows:
+            out.extend(_window_rows(rows, max_rows, header, summarize))
+            rows.clear()
+
+    for line in text.split("\n"):
+        if DATE_ROW.match(line):
+            if not rows:
+                # A CSV header sits right above the first row
+                header = out[-1] if out and "," in out[-1] else None
+            rows.append(line)
+        else:
+            flush()
+            out.append(line)
+    flush()
+    return "\n".join(out)
+
+
+def shape_tool_output(text: str, config: dict = None) -> str:
+    """Shrink a tool result before it enters the analyst message history.
+
+    Drops non-trading-day rows, rounds long floats, keeps only the most recent
+    rows of dated tables and, when the result is still over the token budget,
+    replaces older rows with a per-column summary before a final hard clip.
+    """
+    config = config or get_config()
+    if not isinstance(text, str) or not config.get("shape_tool_outputs", True):
+        return text
+
+    digits = config.get("tool_output_float_digits", 2)
+    significant = config.get("tool_output_significant_digits", 4)
+    max_rows = config.get("tool_output_max_rows", 60)
+    max_tokens = config.get("tool_output_max_tokens", 2000)
+
+    lines = [line for line in text.split("\n") if NON_TRADING_DAY not in line]
+    rounded = _round_floats("\n".join(lines), digits, significant)
+    shaped = _window_tables(rounded, max_rows)
+
+    if _estimate_tokens(shaped) > max_tokens:
+        shaped = _window_tables(rounded, max(5, max_rows // 4), summarize=True)
+    if _estimate_tokens(shaped) > max_tokens:
+        shaped = _clip(shaped, max_tokens * 4)
+    return shaped
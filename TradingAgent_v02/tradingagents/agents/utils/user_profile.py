@@ -1,7 +1,10 @@
 
 import os
+import re
 import json
-from typing import List, Optional
+import time
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
@@ -27,6 +30,16 @@ class UserProfile(BaseModel):
             f"Instructions: {self.custom_instructions}"
         )
 
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the normalized profile; users with the same preferences share it."""
+        normalized = {
+            key: sorted({v.strip().lower() for v in value if v.strip()}) if isinstance(value, list)
+            else " ".join(str(value).split()).lower()
+            for key, value in self.model_dump().items()
+        }
+        return hashlib.sha1(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
 DEFAULT_PROFILE = UserProfile(
     risk_tolerance="Moderate",
     investment_horizon="Mid-term",
@@ -36,11 +49,185 @@ DEFAULT_PROFILE = UserProfile(
     custom_instructions="Focus on fundamental analysis and market trends."
 )
 
+# --- Profile patches ---
+# A patch is a list of (op, field, value): "set" a scalar field, or "add" /
+# "remove" one entry of a list field.
+
+RISK_TERMS = [
+    (r"\b(speculative|yolo|very high[- ]risk|max(imum)? risk)\b", "Speculative"),
+    (r"\b(aggressive|high[- ]risk)\b", "Aggressive"),
+    (r"\b(moderate|balanced|medium[- ]risk)\b", "Moderate"),
+    (r"\b(conservative|cautious|risk[- ]averse|low[- ]risk|safe)\b", "Conservative"),
+]
+HORIZON_TERMS = [
+    (r"\b(short[- ]term|day[- ]trad\w*|swing[- ]trad\w*)\b", "Short-term"),
+    (r"\b(mid[- ]term|medium[- ]term)\b", "Mid-term"),
+    (r"\b(long[- ]term|buy[- ]and[- ]hold)\b", "Long-term"),
+]
+SECTOR_ALIASES = {
+    "tech": "Technology", "technology": "Technology", "software": "Technology",
+    "semis": "Semiconductors", "semiconductor": "Semiconductors", "semiconductors": "Semiconductors", "chips": "Semiconductors",
+    "energy": "Energy", "oil": "Energy", "oil and gas": "Energy",
+    "healthcare": "Healthcare", "health care": "Healthcare", "pharma": "Healthcare",
+    "biotech": "Biotechnology", "biotechnology": "Biotechnology",
+    "financials": "Financials", "finance": "Financials", "banks": "Financials", "banking": "Financials",
+    "real estate": "Real Estate", "reits": "Real Estate", "reit": "Real Estate",
+    "utilities": "Utilities",
+    "consumer staples": "Consumer Staples", "staples": "Consumer Staples",
+    "consumer discretionary": "Consumer Discretionary", "retail": "Consumer Discretionary",
+    "industrials": "Industrials", "defense": "Aerospace & Defense", "aerospace": "Aerospace & Defense",
+    "materials": "Materials", "commodities": "Commodities", "mining": "Materials",
+    "communication services": "Communication Services", "media": "Communication Services", "telecom": "Communication Services",
+    "crypto": "Crypto", "cryptocurrency": "Crypto", "ev": "Electric Vehicles", "evs": "Electric Vehicles",
+    "ai": "Artificial Intelligence", "artificial intelligence": "Artificial Intelligence",
+}
+# (pattern before the sector list, field, op)
+SECTOR_VERBS = [
+    (r"(stop avoiding|no longer avoid|fine with|ok with|okay with)", "avoid_sectors", "remove"),
+    (r"(no longer (like|interested in)|not interested in( \w+)? anymore|remove \S+ from favou?rites)", "favorite_sectors", "remove"),
+    (r"(avoid|hate|dislike|don't like|do not like|don't want|do not want|stay away from|exclude|no more)", "avoid_sectors", "add"),
+    (r"(like|love|prefer|interested in|favou?r|into|add|focus on|bullish on)", "favorite_sectors", "add"),
+    (r"(remove|drop)", None, "remove"),
+]
+SCALAR_FILLER = (r"\b(a|an|and|i|i'm|am|my|is|be|to|now|more|very|pretty|quite|really|investor|trader|investing|"
+                 r"trading|risk|tolerance|horizon|appetite|profile|set|prefer|like|want|guy|person|please)\b|\s+")
+NEGATION = re.compile(r"\b(not|never|no longer|nor|neither)\b|n't\b")
+
+
+def _sectors(phrase: str) -> Optional[List[str]]:
+    """Known sector names in `phrase` ("tech, energy or banks"), or None if anything else is there."""
+    names = []
+    phrase = phrase.replace("oil and gas", "oil")
+    for part in re.split(r",|/|&|\bor\b|\band\b", phrase):
+        part = re.sub(r"\b(the|stocks?|sectors?|names|companies|space|industry|from favou?rites|from my \w+ list)\b", " ", part)
+        part = re.sub(r"\s+", " ", part).strip(" .!?")
+        if not part:
+            continue
+        if part not in SECTOR_ALIASES:
+            return None
+        names.append(SECTOR_ALIASES[part])
+    return names or None
+
+
+def _clause_patch(clause: str, previous_sector_verb) -> Tuple[Optional[list], Optional[tuple]]:
+    """Patch for one clause, plus the sector verb it used (carried to "... and energy")."""
+    for pattern, field, op in SECTOR_VERBS:
+        match = re.search(rf"\b{pattern}\b", clause)
+        if match:
+            # "not interested in tech", "don't avoid tech": negations ahead of the verb
+            # flip its meaning; only the "no longer ..." verbs carry theirs inside the match
+            if NEGATION.search(clause[:match.start()]):
+                return None, None
+            sectors = _sectors(clause[match.end():])
+            if sectors is not None:
+                fields = [field] if field else ["favorite_sectors", "avoid_sectors"]
+                return [(op, f, s) for s in sectors for f in fields], (field, op)
+            # "I prefer long-term" reads as a setting; "avoid high risk" does not
+            if (field, op) != ("favorite_sectors", "add"):
+                return None, None
+            break
+
+    # "I'm aggressive" / "long-term" / "energy" after "I like tech,"
+    candidates, rest = [], clause
+    for terms, field in ((RISK_TERMS, "risk_tolerance"), (HORIZON_TERMS, "investment_horizon")):
+        hits = {value for pattern, value in terms if re.search(pattern, clause)}
+        if len(hits) > 1:
+            return None, None
+        candidates += [("set", field, value) for value in hits]
+        for pattern, _ in terms:
+            rest = re.sub(pattern, " ", rest)
+    if candidates:
+        # Anything beyond filler ("aggressive growth", "not aggressive") needs the LLM
+        if NEGATION.search(clause) or re.sub(SCALAR_FILLER, " ", rest).strip(" .!?"):
+            return None, None
+        return candidates, None
+    if previous_sector_verb is not None and not NEGATION.search(clause):
+        sectors = _sectors(clause)
+        if sectors:
+            field, op = previous_sector_verb
+            fields = [field] if field else ["favorite_sectors", "avoid_sectors"]
+            return [(op, f, s) for s in sectors for f in fields], previous_sector_verb
+    return None, None
+
+
+def parse_profile_patch(text: str) -> Optional[list]:
+    """Patch for common, unambiguous requests ("I'm aggressive", "avoid semiconductors").
+
+    Returns None when any part of the text is not understood, so the caller
+    can hand the whole message to the LLM instead of applying half of it.
+    """
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"^\s*(please|pls|hey|hi)\b[,!]?\s*", "", text)
+    patch = []
+    for sentence in re.split(r"[.;!?\n]+", text):
+        sector_verb = None
+        for clause in re.split(r",|\bbut\b|\band (?=i\b|i'm\b|my\b|set\b|make\b)", sentence):
+            clause = re.sub(r"^\s*(and|also|now|then)\b", "", clause).strip()
+            clause = re.sub(r"^(i'm|i am|i'd say i'm|make me|set me to|set my risk to|my risk is|i want to be|be)\s+", "", clause)
+            if not clause:
+                continue
+            ops, sector_verb = _clause_patch(clause, sector_verb)
+            if ops is None:
+                return None
+            patch += ops
+    return patch or None
+
+
+def apply_patch(profile: UserProfile, patch: list) -> UserProfile:
+    """Copy of `profile` with the patch applied; list edits are idempotent and case-insensitive."""
+    data = profile.model_dump()
+    for op, field, value in patch:
+        if op == "set":
+            data[field] = value
+            continue
+        items = data[field]
+        present = [item for item in items if item.lower() == value.lower()]
+        if op == "add" and not present:
+            items.append(value)
+            # A sector can't be both a favourite and avoided
+            other = "avoid_sectors" if field == "favorite_sectors" else "favorite_sectors"
+            data[other] = [item for item in data[other] if item.lower() != value.lower()]
+        elif op == "remove":
+            data[field] = [item for item in items if item.lower() != value.lower()]
+    return UserProfile(**data)
+
+
+def diff_profiles(old: UserProfile, new: UserProfile) -> list:
+    """The minimal patch turning `old` into `new`."""
+    patch = []
+    old_data, new_data = old.model_dump(), new.model_dump()
+    for field, value in new_data.items():
+        before = old_data[field]
+        if isinstance(value, list):
+            before_keys = {item.lower() for item in before}
+            after_keys = {item.lower() for item in value}
+            patch += [("add", field, item) for item in value if item.lower() not in before_keys]
+            patch += [("remove", field, item) for item in before if item.lower() not in after_keys]
+        elif value != before:
+            patch.append(("set", field, value))
+    return patch
+
+
 class UserProfileManager:
+    """Investment profiles per user id, cached in memory.
+
+    Each user's profile lives in `<data_dir>/profiles/<user>.json` together
+    with a version stamp that increases on every save. Reads are served from
+    memory; a save writes a temp file, renames it over the old one, and
+    replaces the cached copy, then notifies listeners registered with
+    `on_change`. Downstream caches can key on (user, version) instead of
+    hashing the profile text. The legacy single `user_profile.json` seeds the
+    "default" user.
+    """
+
     def __init__(self, data_dir: str = "./dataflows/data_cache", llm_model: str = "gpt-4o-mini"):
         self.profile_path = os.path.join(data_dir, "user_profile.json")
-        os.makedirs(data_dir, exist_ok=True)
+        self.profiles_dir = os.path.join(data_dir, "profiles")
+        os.makedirs(self.profiles_dir, exist_ok=True)
         self.lock = Lock()
+        self.update_lock = Lock()  # serializes read-patch-save cycles
+        self._cache: Dict[str, Tuple[UserProfile, int]] = {}
+        self._listeners: List[Callable[[str, UserProfile, int], None]] = []
         
         # Initialize LLM for profile extraction
         self.llm = ChatOpenAI(model=llm_model, temperature=0)
@@ -56,47 +243,96 @@ class UserProfileManager:
                        "{format_instructions}"),
             ("user", "CURRENT PROFILE:\n{current_profile}\n\nUSER INPUT: {user_input}")
         ])
+        self.chain = self.prompt | self.llm | self.parser
 
-    def load_profile(self) -> UserProfile:
+    def _path(self, user: str) -> str:
+        return os.path.join(self.profiles_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", user) + ".json")
+
+    def _read(self, user: str) -> Tuple[UserProfile, int]:
+        """Profile and version from disk. Caller holds the lock."""
+        path = self._path(user)
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return UserProfile(**data["profile"]), data["version"]
+            if user == "default" and os.path.exists(self.profile_path):
+                with open(self.profile_path, "r", encoding="utf-8") as f:
+                    return UserProfile(**json.load(f)), 0
+        except Exception as e:
+            print(f"Error loading profile for {user}: {e}, returning default.")
+        return DEFAULT_PROFILE.model_copy(), 0
+
+    def load_versioned(self, user: str = "default") -> Tuple[UserProfile, int]:
+        """(profile, version) for `user`; the profile is a copy the caller may modify."""
+        with self.lock:
+            if user not in self._cache:
+                self._cache[user] = self._read(user)
+            profile, version = self._cache[user]
+        return profile.model_copy(deep=True), version
+
+    def load_profile(self, user: str = "default") -> UserProfile:
+        return self.load_versioned(user)[0]
+
+    def version(self, user: str = "default") -> int:
+        return self.load_versioned(user)[1]
+
+    def save_profile(self, profile: UserProfile, user: str = "default") -> int:
+        """Persist `profile` atomically and return its new version."""
         with self.lock:
-            if not os.path.exists(self.profile_path):
-                return DEFAULT_PROFILE.model_copy()
+            if user not in self._cache:
+                self._cache[user] = self._read(user)
+            version = self._cache[user][1] + 1
+            path = self._path(user)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": version, "updated_at": time.time(), "profile": profile.model_dump()},
+                          f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._cache[user] = (profile.model_copy(deep=True), version)
+            listeners = list(self._listeners)
+        for listener in listeners:
             try:
-                with open(self.profile_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return UserProfile(**data)
+                listener(user, profile, version)
             except Exception as e:
-                print(f"Error loading profile: {e}, returning default.")
-                return DEFAULT_PROFILE.model_copy()
+                print(f"Profile change listener failed: {e}")
+        return version
 
-    def save_profile(self, profile: UserProfile):
-        with self.lock:
-            with open(self.profile_path, "w", encoding="utf-8") as f:
-                json.dump(profile.model_dump(), f, indent=2, ensure_ascii=False)
+    def on_change(self, listener: Callable[[str, UserProfile, int], None]):
+        """Call `listener(user, profile, version)` after every save."""
+        self._listeners.append(listener)
 
-    def update_profile_from_text(self, user_input: str) -> UserProfile:
-        current_profile = self.load_profile()
-        
-        chain = self.prompt | self.llm | self.parser
-        
-        try:
-            print(f"DEBUG: Extracting profile from: {user_input}")
-            new_data = chain.invoke({
-                "current_profile": current_profile.model_dump_json(),
-                "user_input": user_input,
-                "format_instructions": self.parser.get_format_instructions()
-            })
-            
-            # Merge logic is handled by LLM effectively regenerating the whole object, 
-            # but we sanity check the result
-            updated_profile = UserProfile(**new_data)
-            self.save_profile(updated_profile)
-            print(f"DEBUG: Profile updated: {updated_profile.summary}")
-            return updated_profile
-            
-        except Exception as e:
-            print(f"ERROR updating profile: {e}")
+    def update_profile_from_text(self, user_input: str, user: str = "default") -> UserProfile:
+        """Apply a chat message to the user's profile.
+
+        Common requests are parsed by rules and patched directly; anything
+        else goes to the LLM, whose answer is reduced to a diff against the
+        profile it saw and applied to the latest saved profile.
+        """
+        current_profile = self.load_profile(user)
+
+        patch = parse_profile_patch(user_input)
+        if patch is None:
+            try:
+                print(f"DEBUG: Extracting profile from: {user_input}")
+                new_data = self.chain.invoke({
+                    "current_profile": current_profile.model_dump_json(),
+                    "user_input": user_input,
+                    "format_instructions": self.parser.get_format_instructions()
+                })
+                # Keep only what the LLM changed, so untouched fields are never rewritten
+                patch = diff_profiles(current_profile, UserProfile(**new_data))
+            except Exception as e:
+                print(f"ERROR updating profile: {e}")
+                return current_profile
+
+        if not patch:
             return current_profile
+        with self.update_lock:
+            updated_profile = apply_patch(self.load_profile(user), patch)
+            self.save_profile(updated_profile, user)
+        print(f"DEBUG: Profile patched with {patch}")
+        return updated_profile
 
 # Global instance for easy access
 profile_manager = UserProfileManager()
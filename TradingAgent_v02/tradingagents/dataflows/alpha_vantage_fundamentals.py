@@ -1,4 +1,39 @@
+import json
+
 from .alpha_vantage_common import _make_api_request
+from .fundamentals_cache import fundamentals_cache, is_public
+
+
+def _get_statement(function_name: str, statement: str, ticker: str, freq: str, curr_date: str = None) -> str:
+    """Statement JSON from the fundamentals cache, limited to reports filed by curr_date."""
+    def fetch():
+        response_text = _make_api_request(function_name, {"symbol": ticker})
+        try:
+            data = json.loads(response_text)
+        except json.JSONDecodeError:
+            return response_text, []
+        period_ends = [
+            report.get("fiscalDateEnding", "")
+            for report in data.get("quarterlyReports", []) + data.get("annualReports", [])
+        ]
+        return response_text, [p for p in period_ends if p]
+
+    response_text = fundamentals_cache.get(ticker, statement, freq, "alpha_vantage", fetch, curr_date)
+    if not curr_date:
+        return response_text
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError:
+        return response_text
+
+    # Point-in-time: drop reports that were not yet filed on curr_date
+    for key, report_freq in (("quarterlyReports", "quarterly"), ("annualReports", "annual")):
+        if key in data:
+            data[key] = [
+                report for report in data[key]
+                if is_public(report.get("fiscalDateEnding", ""), report_freq, curr_date)
+            ]
+    return json.dumps(data, indent=2)
 
 
 def get_fundamentals(ticker: str, curr_date: str = None) -> str:
@@ -26,16 +61,12 @@ def get_balance_sheet(ticker: str, freq: str = "quarterly", curr_date: str = Non
     Args:
         ticker (str): Ticker symbol of the company
         freq (str): Reporting frequency: annual/quarterly (default quarterly) - not used for Alpha Vantage
-        curr_date (str): Current date you are trading at, yyyy-mm-dd (not used for Alpha Vantage)
+        curr_date (str): Current date you are trading at, yyyy-mm-dd; reports filed after it are hidden
 
     Returns:
         str: Balance sheet data with normalized fields
     """
-    params = {
-        "symbol": ticker,
-    }
-
-    return _make_api_request("BALANCE_SHEET", params)
+    return _get_statement("BALANCE_SHEET", "balance_sheet", ticker, freq, curr_date)
 
 
 def get_cashflow(ticker: str, freq: str = "quarterly", curr_date: str = None) -> str:
@@ -45,16 +76,12 @@ def get_cashflow(ticker: str, freq: str = "quarterly", curr_date: str = None) ->
     Args:
         ticker (str): Ticker symbol of the company
         freq (str): Reporting frequency: annual/quarterly (default quarterly) - not used for Alpha Vantage
-        curr_date (str): Current date you are trading at, yyyy-mm-dd (not used for Alpha Vantage)
+        curr_date (str): Current date you are trading at, yyyy-mm-dd; reports filed after it are hidden
 
     Returns:
         str: Cash flow statement data with normalized fields
     """
-    params = {
-        "symbol": ticker,
-    }
-
-    return _make_api_request("CASH_FLOW", params)
+    return _get_statement("CASH_FLOW", "cashflow", ticker, freq, curr_date)
 
 
 def get_income_statement(ticker: str, freq: str = "quarterly", curr_date: str = None) -> str:
@@ -64,14 +91,10 @@ def get_income_statement(ticker: str, freq: str = "quarterly", curr_date: str =
     Args:
         ticker (str): Ticker symbol of the company
         freq (str): Reporting frequency: annual/quarterly (default quarterly) - not used for Alpha Vantage
-        curr_date (str): Current date you are trading at, yyyy-mm-dd (not used for Alpha Vantage)
+        curr_date (str): Current date you are trading at, yyyy-mm-dd; reports filed after it are hidden
 
     Returns:
         str: Income statement data with normalized fields
     """
-    params = {
-        "symbol": ticker,
-    }
-
-    return _make_api_request("INCOME_STATEMENT", params)
+    return _get_statement("INCOME_STATEMENT", "income_statement", ticker, freq, curr_date)
 
@@ -1,4 +1,6 @@
+import pandas as pd
 from .alpha_vantage_common import _make_api_request
+from .results import VendorResult
 
 def get_indicator(
     symbol: str,
@@ -8,7 +10,7 @@ def get_indicator(
     interval: str = "daily",
     time_period: int = 14,
     series_type: str = "close"
-) -> str:
+) -> VendorResult:
     """
     Returns Alpha Vantage technical indicator values over a time window.
 
@@ -22,7 +24,7 @@ def get_indicator(
         series_type: The desired price type (close, open, high, low)
 
     Returns:
-        String containing indicator values and description
+        Indicator values with their description (error messages as strings)
     """
     from datetime import datetime
     from dateutil.relativedelta import relativedelta
@@ -198,25 +200,21 @@ def get_indicator(
                 except (ValueError, IndexError):
                     continue
 
-        # Sort by date and format output
+        # Sort by date
         result_data.sort(key=lambda x: x[0])
 
-        ind_string = ""
-        for date_dt, value in result_data:
-            ind_string += f"{date_dt.strftime('%Y-%m-%d')}: {value}\n"
-
-        if not ind_string:
-            ind_string = "No data available for the specified date range.\n"
-
-        result_str = (
-            f"## {indicator.upper()} values from {before.strftime('%Y-%m-%d')} to {curr_date}:\n\n"
-            + ind_string
-            + "\n\n"
-            + indicator_descriptions.get(indicator, "No description available.")
+        return VendorResult(
+            "series",
+            pd.Series(
+                {date_dt.strftime('%Y-%m-%d'): value for date_dt, value in result_data},
+                name=indicator,
+                dtype=object,
+            ),
+            title=f"{indicator.upper()} values from {before.strftime('%Y-%m-%d')} to {curr_date}",
+            description=indicator_descriptions.get(indicator, "No description available."),
+            meta={"symbol": symbol.upper(), "indicator": indicator, "start_date": before.strftime('%Y-%m-%d'), "end_date": curr_date},
         )
 
-        return result_str
-
     except Exception as e:
         print(f"Error getting Alpha Vantage indicator data for {indicator}: {e}")
         return f"Error retrieving {indicator} data: {str(e)}"
@@ -1,11 +1,14 @@
 from datetime import datetime
+from io import StringIO
+import pandas as pd
 from .alpha_vantage_common import _make_api_request, _filter_csv_by_date_range
+from .results import VendorResult
 
 def get_stock(
     symbol: str,
     start_date: str,
     end_date: str
-) -> str:
+) -> VendorResult:
     """
     Returns raw daily OHLCV values, adjusted close values, and historical split/dividend events
     filtered to the specified date range.
@@ -16,7 +19,8 @@ def get_stock(
         end_date: End date in yyyy-mm-dd format
 
     Returns:
-        CSV string containing the daily adjusted time series data filtered to the date range.
+        Table of the daily adjusted time series filtered to the date range,
+        or the raw response when it is not CSV.
     """
     # Parse dates to determine the range
     start_dt = datetime.strptime(start_date, "%Y-%m-%d")
@@ -35,4 +39,16 @@ def get_stock(
 
     response = _make_api_request("TIME_SERIES_DAILY_ADJUSTED", params)
 
-    return _filter_csv_by_date_range(response, start_date, end_date)
\ No newline at end of file
+    filtered = _filter_csv_by_date_range(response, start_date, end_date)
+    try:
+        data = pd.read_csv(StringIO(filtered), index_col=0)
+    except ValueError:
+        return filtered
+
+    return VendorResult(
+        "table",
+        data,
+        title=f"Stock data for {symbol.upper()} from {start_date} to {end_date}",
+        notes=[f"Total records: {len(data)}"],
+        meta={"symbol": symbol.upper(), "start_date": start_date, "end_date": end_date},
+    )
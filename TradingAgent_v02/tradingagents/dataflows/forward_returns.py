@@ -0,0 +1,147 @@
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import get_config
+from .price_store import PriceStore, price_store, window_end
+
+HORIZONS = (1, 5, 20)
+PRIMARY_HORIZON = 5
+
+
+class ForwardReturnEvaluator:
+    """Forward returns after an analysis date, read from the shared price store.
+
+    Returns for every horizon are computed in one pass over the closes. Once a
+    date is old enough for all horizons to be known, its returns never change,
+    so they are memoized on disk and later lookups skip the price data entirely.
+    """
+
+    def __init__(self, store: Optional[PriceStore] = None, horizons: Tuple[int, ...] = HORIZONS):
+        self.store = store or price_store
+        self.horizons = tuple(sorted(horizons))
+        self.lock = threading.Lock()
+        self._memo: Optional[Dict[str, dict]] = None
+
+    def _memo_path(self) -> str:
+        return os.path.join(get_config()["data_cache_dir"], "forward_returns.json")
+
+    def _load_memo(self) -> Dict[str, dict]:
+        if self._memo is None:
+            try:
+                with open(self._memo_path(), "r") as f:
+                    self._memo = json.load(f)
+            except (OSError, ValueError):
+                self._memo = {}
+        return self._memo
+
+    def _save_memo(self):
+        os.makedirs(os.path.dirname(self._memo_path()), exist_ok=True)
+        tmp_path = self._memo_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._memo, f)
+        os.replace(tmp_path, self._memo_path())
+
+    def _window_end(self, date_str: str) -> str:
+        # Trading days -> calendar days, with slack for weekends and holidays
+        return window_end(date_str, int(self.horizons[-1] * 1.6) + 10)
+
+    def prefetch(self, tickers: List[str], date_str: str):
+        """Download the forward window for every ticker not memoized yet, in one request."""
+        memo = self._load_memo()
+        pending = [t for t in tickers if f"{t.upper()}|{date_str}" not in memo]
+        if pending:
+            self.store.prefetch(pending, date_str, self._window_end(date_str))
+
+    def forward_returns(self, ticker: str, date_str: str) -> Optional[dict]:
+        """Closes and returns per horizon, or None when there is no data.
+
+        Result: {"start_price", "closes": {h: close}, "returns": {h: pct}, "last_index"}
+        """
+        ticker = ticker.upper()
+        key = f"{ticker}|{date_str}"
+        with self.lock:
+            memo = self._load_memo()
+            if key in memo:
+                return memo[key]
+
+        closes = self.store.get(ticker, date_str, self._window_end(date_str))["Close"].to_numpy(dtype=float)
+        closes = closes[~np.isnan(closes)]
+        if len(closes) < 2:
+            return None
+
+        horizons = np.array(self.horizons)
+        available = horizons[horizons < len(closes)]
+        returns = (closes[available] / closes[0] - 1) * 100
+
+        result = {
+            "start_price": float(closes[0]),
+            "closes": {str(h): float(closes[h]) for h in available},
+            "returns": {str(h): float(r) for h, r in zip(available, returns)},
+            "last_index": int(len(closes) - 1),
+            "last_price": float(closes[-1]),
+        }
+
+        # Only complete results are final; recent dates are recomputed as data arrives
+        if len(available) == len(horizons):
+            with self.lock:
+                self._load_memo()[key] = result
+                self._save_memo()
+        return result
+
+    def evaluate(self, ticker: str, date_str: str, decision: str) -> dict:
+        """Score a BUY/SELL/HOLD decision against the forward returns."""
+        target_date = datetime.strptime(date_str, "%Y-%m-%d")
+        if target_date.date() >= datetime.now().date():
+            return {"calculable": False, "message": "Future date/Today (미래/오늘 날짜)"}
+
+        result = self.forward_returns(ticker, date_str)
+        if result is None:
+            return {"calculable": False, "message": "Insufficient data (데이터 부족)"}
+
+        start_price = result["start_price"]
+        horizons = {
+            h: {
+                "end_price": f"{result['closes'][h]:.2f}",
+                "return_pct": f"{result['returns'][h]:.2f}%",
+                "is_accurate": is_accurate(decision, result["returns"][h]),
+            }
+            for h in result["returns"]
+        }
+
+        # Headline figure: the primary horizon, or the last available day
+        primary = str(PRIMARY_HORIZON)
+        if primary in result["returns"]:
+            days, end_price, period_return = PRIMARY_HORIZON, result["closes"][primary], result["returns"][primary]
+        else:
+            days, end_price = result["last_index"], result["last_price"]
+            period_return = (end_price / start_price - 1) * 100
+
+        return {
+            "calculable": True,
+            "start_price": f"{start_price:.2f}",
+            "end_price": f"{end_price:.2f}",
+            "return_pct": f"{period_return:.2f}%",
+            "is_accurate": is_accurate(decision, period_return),
+            "horizons": horizons,
+            "explanation": f"Price moved {start_price:.2f} -> {end_price:.2f} over {days} days (주가 변동)",
+        }
+
+
+def is_accurate(decision: str, period_return: float) -> bool:
+    """Buy -> return > 0, Sell -> return < 0, Hold -> within +/-2%."""
+    decision_lower = decision.lower()
+    if "buy" in decision_lower:
+        return period_return > 0
+    if "sell" in decision_lower:
+        return period_return < 0
+    if "hold" in decision_lower:
+        return abs(period_return) < 2.0
+    return False
+
+
+forward_return_evaluator = ForwardReturnEvaluator()
@@ -1,6 +1,5 @@
-from pandas_datareader import data as web  
+from .macro_features import macro_features, LIQUIDITY_SERIES  
 from typing import Annotated  
-from datetime import datetime, timedelta  
   
 def get_net_liquidity(  
     curr_date: Annotated[str, "Current date in yyyy-mm-dd format"],  
@@ -9,20 +8,19 @@ def get_net_liquidity(
     """  
     Calculate Net Liquidity = Fed Balance Sheet - (TGA + RRP)  
     """  
-    end = datetime.strptime(curr_date, "%Y-%m-%d")  
-    start = end - timedelta(days=lookback_days)  
-      
     # WALCL: 연준 총자산, WTREGEN: 재무부 계정, RRPONTSYD: 역레포  
-    df = web.DataReader(['WALCL', 'WTREGEN', 'RRPONTSYD'], 'fred', start, end)  
-    df = df.fillna(method='ffill')  
-      
-    df['Net_Liquidity'] = df['WALCL'] - (df['WTREGEN'] + df['RRPONTSYD'])  
+    # Looked up in the shared daily macro feature table, computed once per data release  
+    df = macro_features.window(curr_date, lookback_days)  
+    if df.empty:  
+        return f"No net liquidity data available up to {curr_date}"  
       
-    current_liquidity = df['Net_Liquidity'].iloc[-1]  
-    ma_20 = df['Net_Liquidity'].rolling(window=20).mean().iloc[-1]  
-    trend = "INCREASING" if current_liquidity > ma_20 else "DECREASING"  
+    latest = df.iloc[-1]  
+    current_liquidity = latest['Net_Liquidity']  
+    ma_20 = latest['Net_Liquidity_MA20']  
+    trend = latest['Liquidity_Trend']  
       
-    return f"Net Liquidity: {current_liquidity:.2f}B, Trend: {trend}, 20-day MA: {ma_20:.2f}B\n{df.tail(10).to_string()}"  
+    columns = LIQUIDITY_SERIES + ['Net_Liquidity', 'Net_Liquidity_MA20']  
+    return f"Net Liquidity: {current_liquidity:.2f}B, Trend: {trend}, 20-day MA: {ma_20:.2f}B\n{df[columns].tail(10).to_string()}"  
   
 def get_macro_indicators(  
     curr_date: Annotated[str, "Current date in yyyy-mm-dd format"]  
@@ -30,13 +28,10 @@ def get_macro_indicators(
     """  
     Get CPI, PCE, Unemployment Rate, and Yield Curve (10Y-2Y)  
     """  
-    end = datetime.strptime(curr_date, "%Y-%m-%d")  
-    start = end - timedelta(days=365)  
-      
     # CPIAUCSL: CPI, PCE: PCE, UNRATE: 실업률, DGS10: 10년물, DGS2: 2년물  
-    df = web.DataReader(['CPIAUCSL', 'PCE', 'UNRATE', 'DGS10', 'DGS2'], 'fred', start, end)  
-    df = df.fillna(method='ffill')  
-      
-    df['Yield_Curve'] = df['DGS10'] - df['DGS2']  
+    df = macro_features.window(curr_date, 365)  
+    if df.empty:  
+        return f"No macro indicator data available up to {curr_date}"  
       
-    return f"Latest Macro Indicators:\n{df.tail(5).to_string()}"
+    columns = ['CPIAUCSL', 'CPI_YoY', 'PCE', 'PCE_YoY', 'UNRATE', 'UNRATE_Change', 'DGS10', 'DGS2', 'Yield_Curve']  
+    return f"Latest Macro Indicators:\n{df[columns].tail(5).to_string()}"
@@ -0,0 +1,236 @@
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .config import get_config
+
+# Series -> (days between observations, days from observation date to release).
+# The release lag keeps backtests from seeing a print before it was published.
+SERIES_CALENDAR = {
+    "WALCL": (7, 1),        # Fed total assets, weekly (Wed), released Thu
+    "WTREGEN": (7, 1),      # Treasury General Account, weekly
+    "RRPONTSYD": (1, 1),    # Overnight reverse repo, daily
+    "DGS10": (1, 1),        # 10Y Treasury yield, daily
+    "DGS2": (1, 1),         # 2Y Treasury yield, daily
+    "CPIAUCSL": (31, 45),   # CPI, monthly, mid following month
+    "PCE": (31, 60),        # PCE, monthly, end of following month
+    "UNRATE": (31, 38),     # Unemployment rate, monthly, first Friday
+}
+DEFAULT_CALENDAR = (1, 1)
+
+
+class FredStore:
+    """Full-history store for FRED series with incremental refresh.
+
+    Each series lives in its own file under `<data_cache_dir>/fred_store`
+    (parquet when a parquet engine is installed, CSV otherwise). A series is
+    only re-downloaded from its last stored observation, and only once a new
+    release is due per SERIES_CALENDAR. With the `macro_data` vendor set to
+    "local", series are read from `<data_dir>/fred/<SERIES>.csv` instead, and
+    with "snapshot" from the configured snapshot bundle, which keeps offline
+    runs and tests off the network.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self._series: Dict[str, pd.Series] = {}
+        self._meta: Optional[Dict[str, dict]] = None
+        self._failed: Dict[str, Exception] = {}  # series whose last refresh failed
+
+    @property
+    def cache_dir(self) -> str:
+        cache_dir = self._cache_dir or os.path.join(get_config()["data_cache_dir"], "fred_store")
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+
+    @staticmethod
+    def _source() -> str:
+        return get_config().get("data_vendors", {}).get("macro_data", "fred")
+
+    @classmethod
+    def _offline(cls) -> bool:
+        return cls._source() in ("local", "snapshot")
+
+    # Storage
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.cache_dir, "meta.json")
+
+    def _load_meta(self) -> Dict[str, dict]:
+        if self._meta is None:
+            try:
+                with open(self._meta_path(), "r") as f:
+                    self._meta = json.load(f)
+            except (OSError, ValueError):
+                self._meta = {}
+        return self._meta
+
+    def _save_meta(self):
+        tmp_path = self._meta_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self._meta_path())
+
+    def _read(self, name: str) -> Optional[pd.Series]:
+        if name in self._series:
+            return self._series[name]
+        parquet_path = os.path.join(self.cache_dir, f"{name}.parquet")
+        csv_path = os.path.join(self.cache_dir, f"{name}.csv")
+        if os.path.exists(parquet_path):
+            frame = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            frame = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        else:
+            return None
+        self._series[name] = frame[name]
+        return self._series[name]
+
+    def _write(self, name: str, series: pd.Series):
+        frame = series.to_frame(name)
+        try:
+            frame.to_parquet(os.path.join(self.cache_dir, f"{name}.parquet"))
+        except ImportError:
+            frame.to_csv(os.path.join(self.cache_dir, f"{name}.csv"), index_label="DATE")
+        self._series[name] = series
+
+    @staticmethod
+    def _read_local(name: str) -> Optional[pd.Series]:
+        """Series from a FRED CSV download (DATE/observation_date + value column)."""
+        path = os.path.join(get_config()["data_dir"], "fred", f"{name}.csv")
+        if not os.path.exists(path):
+            return None
+        frame = pd.read_csv(path, index_col=0, parse_dates=True, na_values=".")
+        return pd.to_numeric(frame.iloc[:, 0], errors="coerce").rename(name)
+
+    # Refresh
+
+    def _due(self, name: str, today: datetime) -> bool:
+        """True when a new observation could have been released since the last check."""
+        meta = self._load_meta().get(name)
+        if meta is None:
+            return True
+        if meta.get("checked") == today.strftime("%Y-%m-%d"):
+            return False
+        cadence, lag = SERIES_CALENDAR.get(name, DEFAULT_CALENDAR)
+        last_obs = datetime.strptime(meta["last_obs"], "%Y-%m-%d")
+        return today >= last_obs + timedelta(days=cadence + lag)
+
+    @staticmethod
+    def _download(due: List[str], start: datetime, end: datetime):
+        """Fetch `due` in one request, falling back to one request per series if that fails.
+
+        Returns (frame of fetched series, {series: error} for those that failed).
+        """
+        from pandas_datareader import data as web
+
+        try:
+            return web.DataReader(due, "fred", start, end), {}
+        except Exception as e:
+            if len(due) == 1:
+                return pd.DataFrame(), {due[0]: e}
+            print(f"FRED refresh of {', '.join(due)} failed ({e}); retrying series one by one")
+        columns, failed = {}, {}
+        for name in due:
+            try:
+                columns[name] = web.DataReader(name, "fred", start, end)[name]
+            except Exception as e:
+                failed[name] = e
+        return pd.DataFrame(columns), failed
+
+    def refresh(self, names: List[str]) -> List[str]:
+        """Download new observations for the series that are due, in one request.
+
+        A series that can't be fetched keeps its stored history and is not
+        marked as checked, so the next call tries again. Returns the series
+        that were refreshed.
+        """
+        if self._offline():
+            return []
+        today = datetime.now()
+
+        with self.lock:
+            meta = self._load_meta()
+            due = [name for name in names if self._due(name, today)]
+            if not due:
+                return []
+
+            # Re-read one period before the last observation to pick up revisions
+            history_start = datetime.strptime(get_config().get("fred_history_start", "2000-01-01"), "%Y-%m-%d")
+            starts = []
+            for name in due:
+                if name in meta and self._read(name) is not None:
+                    cadence, _ = SERIES_CALENDAR.get(name, DEFAULT_CALENDAR)
+                    starts.append(datetime.strptime(meta[name]["last_obs"], "%Y-%m-%d") - timedelta(days=cadence))
+                else:
+                    starts.append(history_start)
+
+            fetched, failed = self._download(due, min(starts), today)
+            for name, error in failed.items():
+                print(f"FRED refresh of {name} failed; keeping stored data and retrying later: {error}")
+                self._failed[name] = error
+            due = [name for name in due if name not in failed]
+
+            for name in due:
+                self._failed.pop(name, None)
+                if name not in fetched.columns:
+                    continue
+                new = fetched[name].dropna()
+                existing = self._read(name)
+                if existing is not None:
+                    new = pd.concat([existing, new])
+                    new = new[~new.index.duplicated(keep="last")].sort_index()
+                if new.empty:
+                    continue
+                self._write(name, new)
+                meta[name] = {"last_obs": new.index[-1].strftime("%Y-%m-%d")}
+
+            # A release that has not landed yet is retried tomorrow, not on every call
+            for name in due:
+                if name in meta:
+                    meta[name]["checked"] = today.strftime("%Y-%m-%d")
+            self._save_meta()
+            return due
+
+    # Queries
+
+    def get_series(self, name: str) -> pd.Series:
+        """Full stored history of one series."""
+        if self._source() == "snapshot":
+            from .snapshot import open_snapshot, SnapshotMiss
+
+            try:
+                series = open_snapshot().series(name)
+            except SnapshotMiss:
+                series = None
+        elif self._offline():
+            series = self._read_local(name)
+        else:
+            self.refresh([name])
+            with self.lock:
+                series = self._read(name)
+                # Stale data beats none; with nothing stored, surface the download error
+                if series is None and name in self._failed:
+                    raise self._failed[name]
+        return series if series is not None else pd.Series(dtype=float, name=name)
+
+    def get_frame(self, names: List[str], curr_date: str, lookback_days: int) -> pd.DataFrame:
+        """Point-in-time slice: observations in the lookback window already released by curr_date."""
+        self.refresh(names)
+        end = datetime.strptime(curr_date, "%Y-%m-%d")
+        start = end - timedelta(days=lookback_days)
+
+        columns = {}
+        for name in names:
+            series = self.get_series(name)
+            _, lag = SERIES_CALENDAR.get(name, DEFAULT_CALENDAR)
+            released = series[series.index <= end - timedelta(days=lag)]
+            columns[name] = released[released.index >= start]
+        return pd.DataFrame(columns).sort_index()
+
+
+fred_store = FredStore()
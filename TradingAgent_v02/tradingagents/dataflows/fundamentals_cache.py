@@ -0,0 +1,120 @@
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+from .config import get_config
+
+# Days from period end to filing: (earliest seen, latest allowed). The earliest
+# drives when to look for a new filing, the latest decides what a backtest may see.
+FILING_LAG_DAYS = {
+    "quarterly": (25, 45),
+    "annual": (55, 90),
+}
+PERIOD_MONTHS = {"quarterly": 3, "annual": 12}
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _cadence(freq: str) -> str:
+    return "annual" if str(freq).lower().startswith("annual") else "quarterly"
+
+
+def is_public(period_end: str, freq: str, curr_date: Optional[str]) -> bool:
+    """True when a statement for `period_end` was certainly filed by `curr_date`."""
+    if not curr_date:
+        return True
+    period_dt, curr_dt = _parse_date(period_end), _parse_date(curr_date)
+    if period_dt is None or curr_dt is None:
+        return True
+    return period_dt + timedelta(days=FILING_LAG_DAYS[_cadence(freq)][1]) <= curr_dt
+
+
+def next_expected_filing(period_ends: List[str], freq: str) -> str:
+    """Earliest date a statement for the period after the latest one could appear."""
+    cadence = _cadence(freq)
+    latest = max(d for d in (_parse_date(p) for p in period_ends) if d is not None)
+    next_period = latest + relativedelta(months=PERIOD_MONTHS[cadence])
+    expected = next_period + timedelta(days=FILING_LAG_DAYS[cadence][0])
+    # A late filer is rechecked daily instead of on every call
+    tomorrow = datetime.now() + timedelta(days=1)
+    return max(expected, tomorrow).strftime("%Y-%m-%d")
+
+
+class FundamentalsCache:
+    """Statement payloads persisted per (ticker, statement, freq, vendor).
+
+    An entry is served without a request until the next filing is expected. A
+    backtest date before the fetch date is always served from the entry, since
+    the statements it may see were already public when it was fetched.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self.lock = threading.Lock()
+
+    def _path(self, ticker: str, statement: str, freq: str, vendor: str) -> str:
+        cache_dir = self._cache_dir or os.path.join(get_config()["data_cache_dir"], "fundamentals")
+        cache_dir = os.path.join(cache_dir, vendor)
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, f"{ticker.upper()}-{statement}-{_cadence(freq)}.json")
+
+    def get(
+        self,
+        ticker: str,
+        statement: str,
+        freq: str,
+        vendor: str,
+        fetch: Callable[[], Tuple[str, List[str]]],
+        curr_date: Optional[str] = None,
+    ) -> str:
+        """Return the cached payload, calling `fetch` only when it may be stale.
+
+        `fetch` returns (payload, period end dates in the payload). Payloads with
+        no periods (errors, empty statements) are returned but not cached.
+        """
+        if not get_config().get("cache_fundamentals", True):
+            return fetch()[0]
+
+        path = self._path(ticker, statement, freq, vendor)
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        with self.lock:
+            entry = None
+            if os.path.exists(path):
+                try:
+                    with open(path, "r") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = None
+
+        if entry is not None:
+            if today < entry["next_filing"] or (curr_date and curr_date < entry["fetched_at"]):
+                return entry["payload"]
+
+        payload, period_ends = fetch()
+        if not period_ends:
+            return payload
+
+        entry = {
+            "payload": payload,
+            "fetched_at": today,
+            "next_filing": next_expected_filing(period_ends, freq),
+        }
+        with self.lock:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        return payload
+
+
+fundamentals_cache = FundamentalsCache()
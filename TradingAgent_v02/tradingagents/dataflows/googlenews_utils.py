@@ -1,7 +1,12 @@
+import os
 import json
+import hashlib
+import threading
 import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlparse
 import time
 import random
 from tenacity import (
@@ -12,6 +17,16 @@ from tenacity import (
     retry_if_result,
 )
 
+from .config import get_config
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/101.0.4951.54 Safari/537.36"
+    )
+}
+
 
 def is_rate_limited(response):
     """Check if the response indicates rate limiting (status code 429)"""
@@ -31,6 +46,176 @@ def make_request(url, headers):
     return response
 
 
+def parse_results_page(html):
+    """Parse one Google News results page into (results, has_next_page)."""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for el in soup.select("div.SoaBEf"):
+        try:
+            results.append(
+                {
+                    "link": el.find("a")["href"],
+                    "title": el.select_one("div.MBeuO").get_text(),
+                    "snippet": el.select_one(".GI74Re").get_text(),
+                    "date": el.select_one(".LfVVr").get_text(),
+                    "source": el.select_one(".NUnG9d span").get_text(),
+                }
+            )
+        except Exception as e:
+            print(f"Error processing result: {e}")
+            # If one of the fields is not found, skip this result
+            continue
+    return results, soup.find("a", id="pnnext") is not None
+
+
+def _search_url(query, start_date, end_date, offset):
+    return (
+        f"https://www.google.com/search?q={query}"
+        f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
+        f"&tbm=nws&start={offset}"
+    )
+
+
+class HostRateLimiter:
+    """Polite per-host limiter: bounded concurrency and a jittered gap between requests."""
+
+    def __init__(self, max_concurrent=2, min_interval=(1.0, 3.0)):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    def _slot(self, host):
+        with self.lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.max_concurrent)
+            return self._slots[host]
+
+    def request(self, url, headers):
+        host = urlparse(url).netloc
+        with self._slot(host):
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + random.uniform(*self.min_interval)
+            time.sleep(max(0.0, start - time.monotonic()))
+            return _request_with_backoff(url, headers)
+
+
+@retry(
+    retry=(retry_if_result(is_rate_limited)),
+    wait=wait_exponential(multiplier=1, min=4, max=60),
+    stop=stop_after_attempt(5),
+)
+def _request_with_backoff(url, headers):
+    """Request with backoff on 429; pacing is left to the limiter."""
+    return requests.get(url, headers=headers)
+
+
+rate_limiter = HostRateLimiter()
+
+
+class PageCache:
+    """Parsed result pages on disk, keyed by (query, date range, offset).
+
+    Pages for ranges that ended before today never change and are kept for
+    good; ranges reaching today expire after `google_news_cache_ttl` seconds.
+    """
+
+    def __init__(self, cache_dir=None):
+        self._cache_dir = cache_dir
+
+    def _path(self, query, start_date, end_date, offset):
+        cache_dir = self._cache_dir or os.path.join(get_config()["data_cache_dir"], "google_news")
+        os.makedirs(cache_dir, exist_ok=True)
+        key = hashlib.sha1(f"{query}|{start_date}|{end_date}|{offset}".encode("utf-8")).hexdigest()
+        return os.path.join(cache_dir, f"{key}.json")
+
+    def get(self, query, start_date, end_date, offset):
+        path = self._path(query, start_date, end_date, offset)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        ended = datetime.strptime(end_date, "%m/%d/%Y").date() < datetime.now().date()
+        ttl = get_config().get("google_news_cache_ttl", 3600)
+        if not ended and time.time() - entry["fetched_at"] > ttl:
+            return None
+        return entry["results"], entry["has_next"]
+
+    def put(self, query, start_date, end_date, offset, results, has_next):
+        path = self._path(query, start_date, end_date, offset)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"results": results, "has_next": has_next, "fetched_at": time.time()}, f)
+        os.replace(tmp_path, path)
+
+
+page_cache = PageCache()
+
+
+def _fetch_page(query, start_date, end_date, offset):
+    """One results page, from the page cache when possible."""
+    cached = page_cache.get(query, start_date, end_date, offset)
+    if cached is not None:
+        return cached
+    response = rate_limiter.request(_search_url(query, start_date, end_date, offset), HEADERS)
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Google News returned {response.status_code}")
+    results, has_next = parse_results_page(response.content)
+    # A 200 with nothing parsed is usually a consent or captcha page; fetch it again next time
+    if results:
+        page_cache.put(query, start_date, end_date, offset, results, has_next)
+    return results, has_next
+
+
+def _get_news_data_concurrent(query, start_date, end_date):
+    """Fetch the first page, then later pages in concurrent batches; dedupe by link."""
+    config = get_config()
+    max_pages = config.get("google_news_max_pages", 10)
+    batch_size = max(1, rate_limiter.max_concurrent)
+
+    try:
+        results, has_next = _fetch_page(query, start_date, end_date, 0)
+    except Exception as e:
+        print(f"Failed after multiple retries: {e}")
+        return []
+    pages = [results]
+
+    page = 1
+    with ThreadPoolExecutor(max_workers=batch_size) as executor:
+        while has_next and page < max_pages:
+            offsets = [(page + i) * 10 for i in range(min(batch_size, max_pages - page))]
+            futures = [executor.submit(_fetch_page, query, start_date, end_date, o) for o in offsets]
+            has_next = False
+            for future in futures:
+                try:
+                    results, page_has_next = future.result()
+                except Exception as e:
+                    print(f"Failed after multiple retries: {e}")
+                    break
+                if not results:
+                    break
+                pages.append(results)
+                # Only keep going past this batch if its last page points further
+                has_next = page_has_next
+                if not page_has_next:
+                    break
+            page += len(offsets)
+
+    news_results = []
+    seen_links = set()
+    for results in pages:
+        for item in results:
+            if item["link"] in seen_links:
+                continue
+            seen_links.add(item["link"])
+            news_results.append(item)
+    return news_results
+
+
 def getNewsData(query, start_date, end_date):
     """
     Scrape Google News search results for a given query and date range.
@@ -45,58 +230,26 @@ def getNewsData(query, start_date, end_date):
         end_date = datetime.strptime(end_date, "%Y-%m-%d")
         end_date = end_date.strftime("%m/%d/%Y")
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/101.0.4951.54 Safari/537.36"
-        )
-    }
+    if get_config().get("google_news_concurrent", True):
+        return _get_news_data_concurrent(query, start_date, end_date)
 
+    headers = HEADERS
     news_results = []
     page = 0
     while True:
-        offset = page * 10
-        url = (
-            f"https://www.google.com/search?q={query}"
-            f"&tbs=cdr:1,cd_min:{start_date},cd_max:{end_date}"
-            f"&tbm=nws&start={offset}"
-        )
+        url = _search_url(query, start_date, end_date, page * 10)
 
         try:
             response = make_request(url, headers)
-            soup = BeautifulSoup(response.content, "html.parser")
-            results_on_page = soup.select("div.SoaBEf")
+            results_on_page, has_next = parse_results_page(response.content)
 
             if not results_on_page:
                 break  # No more results found
 
-            for el in results_on_page:
-                try:
-                    link = el.find("a")["href"]
-                    title = el.select_one("div.MBeuO").get_text()
-                    snippet = el.select_one(".GI74Re").get_text()
-                    date = el.select_one(".LfVVr").get_text()
-                    source = el.select_one(".NUnG9d span").get_text()
-                    news_results.append(
-                        {
-                            "link": link,
-                            "title": title,
-                            "snippet": snippet,
-                            "date": date,
-                            "source": source,
-                        }
-                    )
-                except Exception as e:
-                    print(f"Error processing result: {e}")
-                    # If one of the fields is not found, skip this result
-                    continue
-
-            # Update the progress bar with the current count of results scraped
+            news_results.extend(results_on_page)
 
             # Check for the "Next" link (pagination)
-            next_link = soup.find("a", id="pnnext")
-            if not next_link:
+            if not has_next:
                 break
 
             page += 1
@@ -106,3 +259,19 @@ def getNewsData(query, start_date, end_date):
             break
 
     return news_results
+
+
+if __name__ == "__main__":
+    # Run the parser over saved pages: the bundled fixtures, or paths given on the command line
+    import sys
+
+    fixture_dir = os.path.join(os.path.dirname(__file__), "fixtures", "google_news")
+    paths = sys.argv[1:] or sorted(
+        os.path.join(fixture_dir, name) for name in os.listdir(fixture_dir) if name.endswith(".html")
+    )
+    for path in paths:
+        with open(path, "rb") as f:
+            results, has_next = parse_results_page(f.read())
+        print(f"{os.path.basename(path)}: {len(results)} results, next page: {has_next}")
+        for item in results:
+            print(f"  {item['date']} | {item['source']} | {item['title']}")
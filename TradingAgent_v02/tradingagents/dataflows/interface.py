@@ -16,6 +16,11 @@ from .alpha_vantage import (
     get_news as get_alpha_vantage_news
 )
 from .alpha_vantage_common import AlphaVantageRateLimitError
+from . import snapshot
+
+from .price_store import prefetch_history
+from .news_aggregation import aggregate_news
+from .results import as_result, combine
 
 # Configuration and routing logic
 from .config import get_config
@@ -58,7 +63,8 @@ VENDOR_LIST = [
     "local",
     "yfinance",
     "openai",
-    "google"
+    "google",
+    "snapshot"
 ]
 
 # Mapping of methods to their vendor-specific implementations
@@ -68,32 +74,38 @@ VENDOR_METHODS = {
         "alpha_vantage": get_alpha_vantage_stock,
         "yfinance": get_YFin_data_online,
         "local": get_YFin_data,
+        "snapshot": snapshot.get_stock_data,
     },
     # technical_indicators
     "get_indicators": {
         "alpha_vantage": get_alpha_vantage_indicator,
         "yfinance": get_stock_stats_indicators_window,
-        "local": get_stock_stats_indicators_window
+        "local": get_stock_stats_indicators_window,
+        "snapshot": snapshot.get_indicators,
     },
     # fundamental_data
     "get_fundamentals": {
         "alpha_vantage": get_alpha_vantage_fundamentals,
         "openai": get_fundamentals_openai,
+        "snapshot": snapshot.get_fundamentals,
     },
     "get_balance_sheet": {
         "alpha_vantage": get_alpha_vantage_balance_sheet,
         "yfinance": get_yfinance_balance_sheet,
         "local": get_simfin_balance_sheet,
+        "snapshot": snapshot.get_balance_sheet,
     },
     "get_cashflow": {
         "alpha_vantage": get_alpha_vantage_cashflow,
         "yfinance": get_yfinance_cashflow,
         "local": get_simfin_cashflow,
+        "snapshot": snapshot.get_cashflow,
     },
     "get_income_statement": {
         "alpha_vantage": get_alpha_vantage_income_statement,
         "yfinance": get_yfinance_income_statement,
         "local": get_simfin_income_statements,
+        "snapshot": snapshot.get_income_statement,
     },
     # news_data
     "get_news": {
@@ -101,18 +113,22 @@ VENDOR_METHODS = {
         "openai": get_stock_news_openai,
         "google": get_google_news,
         "local": [get_finnhub_news, get_reddit_company_news, get_google_news],
+        "snapshot": snapshot.get_news,
     },
     "get_global_news": {
         "openai": get_global_news_openai,
-        "local": get_reddit_global_news
+        "local": get_reddit_global_news,
+        "snapshot": snapshot.get_global_news,
     },
     "get_insider_sentiment": {
-        "local": get_finnhub_company_insider_sentiment
+        "local": get_finnhub_company_insider_sentiment,
+        "snapshot": snapshot.get_insider_sentiment,
     },
     "get_insider_transactions": {
         "alpha_vantage": get_alpha_vantage_insider_transactions,
         "yfinance": get_yfinance_insider_transactions,
         "local": get_finnhub_company_insider_transactions,
+        "snapshot": snapshot.get_insider_transactions,
     },
 }
 
@@ -138,8 +154,29 @@ def get_vendor(category: str, method: str = None) -> str:
     # Fall back to category-level configuration
     return config.get("data_vendors", {}).get(category, "default")
 
+def prefetch_market_data(symbols) -> list:
+    """Download price history for a list of tickers in one batch before a run.
+
+    Only applies when prices or indicators come from yfinance; returns the
+    symbols that were actually downloaded.
+    """
+    uses_yfinance = any(
+        "yfinance" in get_vendor(get_category_for_method(method), method)
+        for method in ("get_stock_data", "get_indicators")
+    )
+    if not uses_yfinance or not symbols:
+        return []
+    try:
+        return prefetch_history(symbols)
+    except Exception as e:
+        print(f"Price prefetch failed, tools will fetch on demand: {e}")
+        return []
+
 def route_to_vendor(method: str, *args, **kwargs):
-    """Route method calls to appropriate vendor implementation with fallback support."""
+    """Route method calls to appropriate vendor implementation with fallback support.
+
+    Returns a VendorResult; `str()` or `results.render` turns it into prompt text.
+    """
     category = get_category_for_method(method)
     vendor_config = get_vendor(category, method)
 
@@ -154,9 +191,11 @@ def route_to_vendor(method: str, *args, **kwargs):
     
     # Create fallback vendor list: primary vendors first, then remaining vendors as fallbacks
     fallback_vendors = primary_vendors.copy()
-    for vendor in all_available_vendors:
-        if vendor not in fallback_vendors:
-            fallback_vendors.append(vendor)
+    # A snapshot is served exclusively; falling back would reach the network
+    if "snapshot" not in primary_vendors:
+        for vendor in all_available_vendors:
+            if vendor not in fallback_vendors:
+                fallback_vendors.append(vendor)
 
     # Debug: Print fallback ordering
     primary_str = " → ".join(primary_vendors)
@@ -199,7 +238,7 @@ def route_to_vendor(method: str, *args, **kwargs):
         for impl_func, vendor_name in vendor_methods:
             try:
                 print(f"DEBUG: Calling {impl_func.__name__} from vendor '{vendor_name}'...")
-                result = impl_func(*args, **kwargs)
+                result = as_result(impl_func(*args, **kwargs), method, vendor_name)
                 vendor_results.append(result)
                 print(f"SUCCESS: {impl_func.__name__} from vendor '{vendor_name}' completed successfully")
                     
@@ -236,9 +275,14 @@ def route_to_vendor(method: str, *args, **kwargs):
     else:
         print(f"FINAL: Method '{method}' completed with {len(results)} result(s) from {vendor_attempt_count} vendor attempt(s)")
 
-    # Return single result if only one, otherwise concatenate as string
-    if len(results) == 1:
-        return results[0]
-    else:
-        # Convert all results to strings and concatenate
-        return '\n'.join(str(result) for result in results)
\ No newline at end of file
+    # Merge news from every vendor into one deduplicated, ranked list
+    if method == "get_news" and get_config().get("aggregate_news", True):
+        try:
+            aggregated = aggregate_news(results, *args[:3])
+            if aggregated is not None:
+                return aggregated
+        except Exception as e:
+            print(f"News aggregation failed, returning raw results: {e}")
+
+    # Typed result; callers render it to text with results.render
+    return combine(results)
\ No newline at end of file
@@ -6,6 +6,8 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import json
 from .reddit_utils import fetch_top_from_category
+from .results import VendorResult
+from .news_aggregation import NewsItem
 from tqdm import tqdm
 
 def get_YFin_data_window(
@@ -52,7 +54,7 @@ def get_YFin_data(
     symbol: Annotated[str, "ticker symbol of the company"],
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
-) -> str:
+) -> VendorResult:
     # read in data
     data = pd.read_csv(
         os.path.join(
@@ -77,10 +79,13 @@ def get_YFin_data(
     # Drop the temporary column we created
     filtered_data = filtered_data.drop("DateOnly", axis=1)
 
-    # remove the index from the dataframe
-    filtered_data = filtered_data.reset_index(drop=True)
-
-    return filtered_data
+    return VendorResult(
+        "table",
+        filtered_data.set_index("Date"),
+        title=f"Stock data for {symbol.upper()} from {start_date} to {end_date}",
+        notes=[f"Total records: {len(filtered_data)}"],
+        meta={"symbol": symbol.upper(), "start_date": start_date, "end_date": end_date},
+    )
 
 def get_finnhub_news(
     query: Annotated[str, "Search query or ticker symbol"],
@@ -95,7 +100,7 @@ def get_finnhub_news(
         start_date (str): Start date in yyyy-mm-dd format
         end_date (str): End date in yyyy-mm-dd format
     Returns
-        str: dataframe containing the news of the company in the time frame
+        VendorResult: news items of the company in the time frame
 
     """
 
@@ -104,17 +109,18 @@ def get_finnhub_news(
     if len(result) == 0:
         return ""
 
-    combined_result = ""
-    for day, data in result.items():
-        if len(data) == 0:
-            continue
-        for entry in data:
-            current_news = (
-                "### " + entry["headline"] + f" ({day})" + "\n" + entry["summary"]
-            )
-            combined_result += current_news + "\n\n"
+    items = [
+        NewsItem(title=entry["headline"], summary=entry["summary"], source=entry.get("source", ""), published=day)
+        for day, data in result.items()
+        for entry in data
+    ]
 
-    return f"## {query} News, from {start_date} to {end_date}:\n" + str(combined_result)
+    return VendorResult(
+        "news",
+        items,
+        title=f"{query} News, from {start_date} to {end_date}",
+        meta={"symbol": query, "start_date": start_date, "end_date": end_date},
+    )
 
 
 def get_finnhub_company_insider_sentiment(
@@ -264,10 +270,12 @@ def get_simfin_balance_sheet(
     # drop the SimFinID column
     latest_balance_sheet = latest_balance_sheet.drop("SimFinId")
 
-    return (
-        f"## {freq} balance sheet for {ticker} released on {str(latest_balance_sheet['Publish Date'])[0:10]}: \n"
-        + str(latest_balance_sheet)
-        + "\n\nThis includes metadata like reporting dates and currency, share details, and a breakdown of assets, liabilities, and equity. Assets are grouped as current (liquid items like cash and receivables) and noncurrent (long-term investments and property). Liabilities are split between short-term obligations and long-term debts, while equity reflects shareholder funds such as paid-in capital and retained earnings. Together, these components ensure that total assets equal the sum of liabilities and equity."
+    return VendorResult(
+        "record",
+        latest_balance_sheet,
+        title=f"{freq} balance sheet for {ticker} released on {str(latest_balance_sheet['Publish Date'])[0:10]}",
+        description="This includes metadata like reporting dates and currency, share details, and a breakdown of assets, liabilities, and equity. Assets are grouped as current (liquid items like cash and receivables) and noncurrent (long-term investments and property). Liabilities are split between short-term obligations and long-term debts, while equity reflects shareholder funds such as paid-in capital and retained earnings. Together, these components ensure that total assets equal the sum of liabilities and equity.",
+        meta={"symbol": ticker, "freq": freq, "curr_date": curr_date},
     )
 
 
@@ -311,10 +319,12 @@ def get_simfin_cashflow(
     # drop the SimFinID column
     latest_cash_flow = latest_cash_flow.drop("SimFinId")
 
-    return (
-        f"## {freq} cash flow statement for {ticker} released on {str(latest_cash_flow['Publish Date'])[0:10]}: \n"
-        + str(latest_cash_flow)
-        + "\n\nThis includes metadata like reporting dates and currency, share details, and a breakdown of cash movements. Operating activities show cash generated from core business operations, including net income adjustments for non-cash items and working capital changes. Investing activities cover asset acquisitions/disposals and investments. Financing activities include debt transactions, equity issuances/repurchases, and dividend payments. The net change in cash represents the overall increase or decrease in the company's cash position during the reporting period."
+    return VendorResult(
+        "record",
+        latest_cash_flow,
+        title=f"{freq} cash flow statement for {ticker} released on {str(latest_cash_flow['Publish Date'])[0:10]}",
+        description="This includes metadata like reporting dates and currency, share details, and a breakdown of cash movements. Operating activities show cash generated from core business operations, including net income adjustments for non-cash items and working capital changes. Investing activities cover asset acquisitions/disposals and investments. Financing activities include debt transactions, equity issuances/repurchases, and dividend payments. The net change in cash represents the overall increase or decrease in the company's cash position during the reporting period.",
+        meta={"symbol": ticker, "freq": freq, "curr_date": curr_date},
     )
 
 
@@ -358,10 +368,12 @@ def get_simfin_income_statements(
     # drop the SimFinID column
     latest_income = latest_income.drop("SimFinId")
 
-    return (
-        f"## {freq} income statement for {ticker} released on {str(latest_income['Publish Date'])[0:10]}: \n"
-        + str(latest_income)
-        + "\n\nThis includes metadata like reporting dates and currency, share details, and a comprehensive breakdown of the company's financial performance. Starting with Revenue, it shows Cost of Revenue and resulting Gross Profit. Operating Expenses are detailed, including SG&A, R&D, and Depreciation. The statement then shows Operating Income, followed by non-operating items and Interest Expense, leading to Pretax Income. After accounting for Income Tax and any Extraordinary items, it concludes with Net Income, representing the company's bottom-line profit or loss for the period."
+    return VendorResult(
+        "record",
+        latest_income,
+        title=f"{freq} income statement for {ticker} released on {str(latest_income['Publish Date'])[0:10]}",
+        description="This includes metadata like reporting dates and currency, share details, and a comprehensive breakdown of the company's financial performance. Starting with Revenue, it shows Cost of Revenue and resulting Gross Profit. Operating Expenses are detailed, including SG&A, R&D, and Depreciation. The statement then shows Operating Income, followed by non-operating items and Interest Expense, leading to Pretax Income. After accounting for Income Tax and any Extraordinary items, it concludes with Net Income, representing the company's bottom-line profit or loss for the period.",
+        meta={"symbol": ticker, "freq": freq, "curr_date": curr_date},
     )
 
 
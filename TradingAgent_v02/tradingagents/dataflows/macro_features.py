@@ -0,0 +1,98 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from .fred_store import fred_store, SERIES_CALENDAR, DEFAULT_CALENDAR
+
+LIQUIDITY_SERIES = ["WALCL", "WTREGEN", "RRPONTSYD"]
+MACRO_SERIES = ["CPIAUCSL", "PCE", "UNRATE", "DGS10", "DGS2"]
+MA_WINDOW = 20
+
+
+def _as_of_daily(series: pd.Series, name: str, index: pd.DatetimeIndex) -> pd.Series:
+    """Value known on each business day: shift by the release lag, then forward fill."""
+    if series.empty:
+        return pd.Series(index=index, dtype=float, name=name)
+    _, lag = SERIES_CALENDAR.get(name, DEFAULT_CALENDAR)
+    released = series.copy()
+    released.index = released.index + pd.Timedelta(days=lag)
+    released = released[~released.index.duplicated(keep="last")]
+    return released.reindex(released.index.union(index)).ffill().reindex(index).rename(name)
+
+
+class MacroFeatureTable:
+    """Daily macro-regime features shared by every ticker analysed on a date.
+
+    One row per business day with the raw series as known on that day (release
+    lags applied) plus net liquidity, its 20-day MA and trend, the 10Y-2Y spread,
+    CPI/PCE YoY and the monthly change in unemployment. The whole table is built
+    in one vectorized pass and rebuilt only when the FRED store has new data, so
+    the macro tools become lookups.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.table: Optional[pd.DataFrame] = None
+        self._signature: Optional[Tuple] = None
+        self._end: Optional[str] = None
+
+    def _load_series(self) -> Dict[str, pd.Series]:
+        names = LIQUIDITY_SERIES + MACRO_SERIES
+        fred_store.refresh(names)
+        return {name: fred_store.get_series(name).dropna() for name in names}
+
+    @staticmethod
+    def build(series: Dict[str, pd.Series], end: str) -> pd.DataFrame:
+        """Compute the feature table from full series histories up to `end`."""
+        starts = [s.index[0] for s in series.values() if not s.empty]
+        if not starts:
+            return pd.DataFrame()
+        index = pd.bdate_range(min(starts), end)
+
+        # Period-over-period changes are taken on the observations, before release lags
+        derived = {
+            "CPI_YoY": series["CPIAUCSL"].pct_change(12, fill_method=None) * 100,
+            "PCE_YoY": series["PCE"].pct_change(12, fill_method=None) * 100,
+            "UNRATE_Change": series["UNRATE"].diff(),
+        }
+        lag_source = {"CPI_YoY": "CPIAUCSL", "PCE_YoY": "PCE", "UNRATE_Change": "UNRATE"}
+
+        table = pd.DataFrame(
+            {name: _as_of_daily(s, name, index) for name, s in series.items()},
+            index=index,
+        )
+        for name, values in derived.items():
+            table[name] = _as_of_daily(values.dropna(), lag_source[name], index)
+
+        table["Net_Liquidity"] = table["WALCL"] - (table["WTREGEN"] + table["RRPONTSYD"])
+        table["Net_Liquidity_MA20"] = table["Net_Liquidity"].rolling(window=MA_WINDOW).mean()
+        table["Liquidity_Trend"] = (table["Net_Liquidity"] > table["Net_Liquidity_MA20"]).map(
+            {True: "INCREASING", False: "DECREASING"}
+        )
+        table["Yield_Curve"] = table["DGS10"] - table["DGS2"]
+        return table
+
+    def get_table(self, curr_date: str) -> pd.DataFrame:
+        """The feature table, rebuilt only when the underlying series changed."""
+        series = self._load_series()
+        signature = tuple(
+            (name, len(s), s.index[-1] if not s.empty else None) for name, s in series.items()
+        )
+        with self.lock:
+            stale = self.table is None or signature != self._signature or curr_date > self._end
+            if stale:
+                self._end = max(curr_date, datetime.now().strftime("%Y-%m-%d"))
+                self.table = self.build(series, self._end)
+                self._signature = signature
+            return self.table
+
+    def window(self, curr_date: str, lookback_days: int) -> pd.DataFrame:
+        """Rows from curr_date - lookback_days through curr_date."""
+        table = self.get_table(curr_date)
+        end = pd.Timestamp(curr_date)
+        return table.loc[end - timedelta(days=lookback_days): end]
+
+
+macro_features = MacroFeatureTable()
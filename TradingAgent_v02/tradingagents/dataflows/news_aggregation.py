@@ -0,0 +1,237 @@
+import re
+import json
+import math
+import hashlib
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from .config import get_config
+from .results import VendorResult, as_result, combine, news_section
+
+DATE_PATTERN = re.compile(r"\((\d{4}-\d{2}-\d{2})\)")
+SOURCE_PATTERN = re.compile(r"\(source:\s*([^)]+)\)")
+WORD_PATTERN = re.compile(r"[a-z0-9$%]+")
+
+
+@dataclass
+class NewsItem:
+    """One news story, whatever vendor it came from."""
+
+    title: str
+    summary: str = ""
+    source: str = ""
+    published: Optional[str] = None  # yyyy-mm-dd
+    url: str = ""
+    relevance: Optional[float] = None  # vendor-provided ticker relevance in [0, 1]
+    sources: List[str] = field(default_factory=list)
+    duplicates: int = 0  # near-duplicate copies merged into this item
+
+
+# Parsing vendor output
+
+
+def _parse_markdown_news(text: str) -> List[NewsItem]:
+    """Items from the `### title` blocks used by the finnhub, reddit and Google vendors."""
+    items = []
+    for block in re.split(r"(?m)^### ", text)[1:]:
+        heading, _, body = block.partition("\n")
+        published = DATE_PATTERN.search(heading)
+        source = SOURCE_PATTERN.search(heading)
+        title = SOURCE_PATTERN.sub("", DATE_PATTERN.sub("", heading)).strip()
+        if not title:
+            continue
+        items.append(
+            NewsItem(
+                title=title,
+                summary=body.strip(),
+                source=source.group(1).strip() if source else "",
+                published=published.group(1) if published else None,
+            )
+        )
+    return items
+
+
+def _parse_alpha_vantage_news(text: str, ticker: str) -> List[NewsItem]:
+    """Items from an Alpha Vantage NEWS_SENTIMENT response."""
+    try:
+        feed = json.loads(text).get("feed", [])
+    except (ValueError, AttributeError):
+        return []
+    items = []
+    for entry in feed:
+        relevance = None
+        for sentiment in entry.get("ticker_sentiment", []):
+            if sentiment.get("ticker", "").upper() == (ticker or "").upper():
+                relevance = float(sentiment.get("relevance_score", 0) or 0)
+        published = entry.get("time_published", "")
+        items.append(
+            NewsItem(
+                title=entry.get("title", ""),
+                summary=entry.get("summary", ""),
+                source=entry.get("source", ""),
+                published=f"{published[:4]}-{published[4:6]}-{published[6:8]}" if len(published) >= 8 else None,
+                url=entry.get("url", ""),
+                relevance=relevance,
+            )
+        )
+    return items
+
+
+def _normalize(results: list, ticker: str = None) -> Tuple[List[NewsItem], List[VendorResult]]:
+    """NewsItem records plus the vendor outputs that yielded none (free-form text)."""
+    items, unparsed = [], []
+    for result in results:
+        if isinstance(result, VendorResult):
+            if result.kind == "news":
+                items.extend(replace(item) for item in result.data)
+                continue
+            if result.kind == "bundle":
+                bundle_items, bundle_unparsed = _normalize(result.data, ticker)
+                items.extend(bundle_items)
+                unparsed.extend(bundle_unparsed)
+                continue
+        text = str(result)
+        if text.lstrip().startswith("{"):
+            # An Alpha Vantage response without a feed carries no stories
+            items.extend(_parse_alpha_vantage_news(text, ticker))
+            continue
+        parsed = _parse_markdown_news(text)
+        items.extend(parsed)
+        if not parsed and text.strip():
+            unparsed.append(as_result(result))
+    return items, unparsed
+
+
+def normalize_news(results: list, ticker: str = None) -> List[NewsItem]:
+    """Turn vendor outputs into NewsItem records; typed results are used as-is."""
+    return _normalize(results, ticker)[0]
+
+
+# Near-duplicate detection
+
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.md5(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.md5(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME,
+    )
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def minhash(text: str) -> tuple:
+    """MinHash signature over word bigrams; equal slots estimate Jaccard similarity."""
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = {" ".join(words[i:i + 2]) for i in range(max(1, len(words) - 1))}
+    hashes = [int.from_bytes(hashlib.md5(s.encode("utf-8")).digest()[:8], "big") for s in shingles]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _similarity(sig_a: tuple, sig_b: tuple) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def dedupe_news(items: List[NewsItem], threshold: float = 0.6) -> List[NewsItem]:
+    """Collapse stories whose estimated Jaccard similarity is at least `threshold`.
+
+    The most detailed version of each story is kept and records every source.
+    """
+    kept = []
+    signatures = []
+    for item in items:
+        signature = minhash(f"{item.title} {item.summary[:500]}")
+        match = next(
+            (i for i, other in enumerate(signatures) if _similarity(signature, other) >= threshold),
+            None,
+        )
+        if match is None:
+            item.sources = [item.source] if item.source else []
+            kept.append(item)
+            signatures.append(signature)
+            continue
+        existing = kept[match]
+        existing.duplicates += 1
+        if item.source and item.source not in existing.sources:
+            existing.sources.append(item.source)
+        if len(item.summary) > len(existing.summary):
+            item.sources = existing.sources
+            item.duplicates = existing.duplicates
+            item.published = item.published or existing.published
+            kept[match] = item
+        else:
+            existing.published = existing.published or item.published
+    return kept
+
+
+# Ranking
+
+
+def _score(item: NewsItem, ticker: str, curr_date: datetime, half_life_days: float) -> float:
+    if item.published:
+        try:
+            age = max(0, (curr_date - datetime.strptime(item.published, "%Y-%m-%d")).days)
+            recency = math.exp(-math.log(2) * age / half_life_days)
+        except ValueError:
+            recency = 0.5
+    else:
+        recency = 0.5
+
+    if item.relevance is not None:
+        relevance = item.relevance
+    elif ticker:
+        pattern = re.compile(rf"\b{re.escape(ticker)}\b", re.IGNORECASE)
+        mentions = 2 * len(pattern.findall(item.title)) + len(pattern.findall(item.summary))
+        relevance = min(1.0, mentions / 3)
+    else:
+        relevance = 0.0
+
+    # Stories picked up by several outlets are more likely to matter
+    coverage = min(1.0, item.duplicates / 3)
+    return recency + relevance + 0.5 * coverage
+
+
+def rank_news(items: List[NewsItem], ticker: str, curr_date: str, half_life_days: float = 3.0) -> List[NewsItem]:
+    """Sort by recency, ticker relevance and cross-source coverage."""
+    curr_dt = datetime.strptime(curr_date, "%Y-%m-%d")
+    return sorted(items, key=lambda item: _score(item, ticker, curr_dt, half_life_days), reverse=True)
+
+
+def aggregate_news(results: list, ticker: str, start_date: str, end_date: str) -> Optional[VendorResult]:
+    """Normalize, dedupe and rank news from one or more vendors.
+
+    Returns None when nothing could be parsed (e.g. free-form LLM output), so
+    the caller can fall back to the raw text. Output of vendors that could
+    not be parsed alongside others that could is kept as its own section
+    after the ranked stories.
+    """
+    config = get_config()
+    items, unparsed = _normalize(results, ticker)
+    if not items:
+        return None
+
+    unique = dedupe_news(items, config.get("news_dedup_threshold", 0.6))
+    ranked = rank_news(unique, ticker, end_date, config.get("news_recency_half_life_days", 3.0))
+
+    top_k = config.get("news_top_k", 20)
+    budget_chars = config.get("news_max_tokens", 3000) * 4
+    title = (
+        f"{ticker} News, from {start_date} to {end_date} "
+        f"({len(unique)} unique of {len(items)} stories, most relevant first)"
+    )
+    selected = []
+    used = len(title)
+    for item in ranked[:top_k]:
+        size = len(news_section(item))
+        if selected and used + size > budget_chars:
+            break
+        selected.append(item)
+        used += size
+    news = VendorResult(
+        "news",
+        selected,
+        title=title,
+        meta={"method": "get_news", "symbol": ticker, "start_date": start_date, "end_date": end_date},
+    )
+    return combine([news] + unparsed) if unparsed else news
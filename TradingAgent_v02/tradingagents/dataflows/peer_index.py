@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .price_store import price_store
+from .ticker_metadata import ticker_metadata
+
+# Fewer overlapping return days than this and a correlation is not trusted
+MIN_OVERLAP_DAYS = 60
+
+
+def _matches(entry: dict, sectors: Iterable[str]) -> bool:
+    """Loose match of profile sector names ("tech", "Semiconductors") against a ticker's classification."""
+    labels = [(entry.get("sector") or "").lower(), (entry.get("industry") or "").lower()]
+    for name in sectors:
+        name = name.strip().lower()
+        if name and any(label and (name in label or label in name) for label in labels):
+            return True
+    return False
+
+
+class PeerIndex:
+    """Top-k similar tickers over everything stored locally.
+
+    Similarity blends the correlation of daily returns from the price store,
+    shared industry/sector from the ticker metadata store and, optionally,
+    cosine similarity of embedded analysis reports; weights come from
+    `peer_weights`. The full score matrix is built once, so queries are
+    array lookups. Rebuilds (after `peer_index_ttl`, when new reports are
+    embedded, or for a ticker not in the matrix) run on one background
+    thread while queries keep using the current matrix. Nothing is
+    downloaded while building except metadata for tickers that have prices
+    but no classification yet.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()  # one build at a time
+        self.symbols: List[str] = []
+        self._position: Dict[str, int] = {}
+        self._scores: Optional[np.ndarray] = None
+        self._correlation: Optional[np.ndarray] = None
+        self._metadata: Dict[str, dict] = {}
+        self._built_at = 0.0
+        self._unknown: Dict[str, float] = {}  # ticker -> when a build last failed to place it
+        self._pending = set()  # tickers waiting for the background rebuild
+        self._rebuilding = False
+        self._embeddings: Optional[Dict[str, List[float]]] = None
+
+    def _embeddings_path(self) -> str:
+        cache_dir = self._cache_dir or get_config()["data_cache_dir"]
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, "peer_embeddings.json")
+
+    def _load_embeddings(self) -> Dict[str, List[float]]:
+        if self._embeddings is None:
+            try:
+                with open(self._embeddings_path(), "r") as f:
+                    self._embeddings = json.load(f)
+            except (OSError, ValueError):
+                self._embeddings = {}
+        return self._embeddings
+
+    def add_report(self, symbol: str, text: str):
+        """Embed an analysis report for `symbol` so similar write-ups count towards similarity."""
+        if not text:
+            return
+        from openai import OpenAI
+
+        config = get_config()
+        model = "nomic-embed-text" if config["backend_url"] == "http://localhost:11434/v1" else "text-embedding-3-small"
+        response = OpenAI(base_url=config["backend_url"]).embeddings.create(model=model, input=text[:8000])
+        with self.lock:
+            self._load_embeddings()[symbol.upper()] = response.data[0].embedding
+            tmp_path = self._embeddings_path() + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._embeddings, f)
+            os.replace(tmp_path, self._embeddings_path())
+            self._built_at = 0.0  # rebuild on the next query
+
+    def _returns(self, symbols: List[str], lookback: int) -> pd.DataFrame:
+        columns = {}
+        for symbol in symbols:
+            frame = price_store.stored(symbol)
+            if frame is not None and "Close" in frame and len(frame) > 1:
+                columns[symbol] = frame["Close"].iloc[-(lookback + 1):]
+        closes = pd.DataFrame(columns).sort_index()
+        return np.log(closes).diff().iloc[1:]
+
+    def build(self, extra: Iterable[str] = ()):
+        """Recompute the score matrix from the local stores."""
+        with self.build_lock:
+            self._build(extra)
+
+    def _build(self, extra: Iterable[str]):
+        extra = {s.upper() for s in extra}
+        config = get_config()
+        weights = {"correlation": 1.0, "industry": 0.6, "sector": 0.3, "embedding": 0.5}
+        weights.update(config.get("peer_weights") or {})
+
+        universe = sorted(set(ticker_metadata.universe()) | extra)
+        ticker_metadata.ensure(universe)
+        metadata = ticker_metadata.entries()
+        symbols = [s for s in universe if s in metadata]
+        n = len(symbols)
+
+        returns = self._returns(symbols, config.get("peer_lookback_days", 252))
+        correlation = returns.corr(min_periods=MIN_OVERLAP_DAYS).reindex(index=symbols, columns=symbols)
+        correlation = np.nan_to_num(correlation.to_numpy(dtype=float))
+
+        industries = np.array([metadata[s].get("industry") or f"?{i}" for i, s in enumerate(symbols)], dtype=object)
+        sectors = np.array([metadata[s].get("sector") or f"?{i}" for i, s in enumerate(symbols)], dtype=object)
+        scores = (
+            weights["correlation"] * correlation
+            + weights["industry"] * (industries[:, None] == industries[None, :])
+            + weights["sector"] * (sectors[:, None] == sectors[None, :])
+        )
+
+        with self.lock:
+            embeddings = dict(self._load_embeddings())
+        embedded = [i for i, s in enumerate(symbols) if s in embeddings]
+        if len(embedded) > 1 and weights["embedding"]:
+            vectors = np.array([embeddings[symbols[i]] for i in embedded], dtype=float)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+            scores[np.ix_(embedded, embedded)] += weights["embedding"] * (vectors @ vectors.T)
+
+        if n:
+            np.fill_diagonal(scores, -np.inf)
+        with self.lock:
+            self.symbols = symbols
+            self._position = {s: i for i, s in enumerate(symbols)}
+            self._scores = scores
+            self._correlation = correlation
+            self._metadata = metadata
+            self._built_at = time.time()
+            self._unknown.update((s, self._built_at) for s in extra - set(symbols))
+            for s in symbols:
+                self._unknown.pop(s, None)
+        print(f"Peer index built over {n} tickers ({returns.shape[1]} with price history)")
+
+    def _fresh(self, symbol: str) -> bool:
+        """Whether the matrix is current and has already placed (or failed to place) `symbol`."""
+        ttl = get_config().get("peer_index_ttl", 86400)
+        now = time.time()
+        known = symbol in self._position or now - self._unknown.get(symbol, 0.0) < ttl
+        return now - self._built_at < ttl and known
+
+    def _schedule_rebuild(self, symbol: str):
+        """Queue `symbol` for a rebuild on the background thread, starting it if idle."""
+        with self.lock:
+            self._pending.add(symbol)
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_pending, name="peer-index-build", daemon=True).start()
+
+    def _rebuild_pending(self):
+        while True:
+            with self.lock:
+                pending, self._pending = self._pending, set()
+                if not pending:
+                    self._rebuilding = False
+                    return
+            try:
+                self.build(extra=pending)
+            except Exception as e:
+                print(f"Peer index rebuild failed: {e}")
+                with self.lock:
+                    self._rebuilding = False
+                return
+            with self.lock:
+                # Drop tickers queued during that build which it already placed
+                self._pending = {s for s in self._pending if not self._fresh(s)}
+
+    def peers(
+        self,
+        symbol: str,
+        k: int = 5,
+        avoid_sectors: Iterable[str] = (),
+        favorite_sectors: Iterable[str] = (),
+        favorite_bonus: float = 0.2,
+    ) -> List[dict]:
+        """Up to `k` similar tickers, skipping avoided sectors and nudging favourites up.
+
+        Tickers scoring below `peer_min_score` are never returned, so a small
+        local universe yields fewer peers rather than unrelated ones.
+        """
+        symbol = symbol.upper()
+        min_score = get_config().get("peer_min_score", 0.6)
+        if self._scores is None:
+            # Only the first query waits for a build
+            with self.build_lock:
+                if self._scores is None:
+                    self._build([symbol])
+        with self.lock:
+            fresh = self._fresh(symbol)
+        if not fresh:
+            # Answer from the current matrix ([] for a new ticker) and pick it up in the background
+            self._schedule_rebuild(symbol)
+
+        avoid_sectors, favorite_sectors = list(avoid_sectors), list(favorite_sectors)
+        with self.lock:
+            row = self._position.get(symbol)
+            if row is None:
+                return []
+            scores = self._scores[row].copy()
+            # The favourite bonus reorders peers but doesn't let weak ones through
+            scores[scores < min_score] = -np.inf
+            if favorite_sectors:
+                scores += favorite_bonus * np.array([_matches(self._metadata[s], favorite_sectors) for s in self.symbols])
+
+            peers = []
+            for i in np.argsort(-scores):
+                if len(peers) >= k or not np.isfinite(scores[i]):
+                    break
+                entry = self._metadata[self.symbols[i]]
+                if avoid_sectors and _matches(entry, avoid_sectors):
+                    continue
+                peers.append({
+                    "ticker": self.symbols[i],
+                    "score": round(float(scores[i]), 4),
+                    "correlation": round(float(self._correlation[row, i]), 4),
+                    "sector": entry.get("sector"),
+                    "industry": entry.get("industry"),
+                })
+            return peers
+
+
+peer_index = PeerIndex()
@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+from .config import get_config
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Indicator paths compute over this much daily history
+HISTORY_YEARS = 15
+# Seconds before a symbol that returned no data is asked for again
+EMPTY_RETRY = 86400
+
+
+class PriceStore:
+    """Local daily OHLCV store shared by the yfinance data paths.
+
+    Each symbol is kept in one CSV under `<data_cache_dir>/price_store` along with
+    the date range already fetched, so repeated lookups are served from disk.
+    Missing symbols are downloaded together in one multi-symbol `yf.download`
+    call. Dates are yyyy-mm-dd strings; `end` is exclusive like yfinance.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._coverage: Optional[Dict[str, List[str]]] = None
+        self._empty: Optional[Dict[str, list]] = None  # symbol -> [start, end, checked_at]
+        self._inflight: Dict[str, threading.Event] = {}
+
+    @property
+    def cache_dir(self) -> str:
+        cache_dir = self._cache_dir or os.path.join(get_config()["data_cache_dir"], "price_store")
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}.csv")
+
+    def _coverage_path(self) -> str:
+        return os.path.join(self.cache_dir, "coverage.json")
+
+    def _load_coverage(self) -> Dict[str, List[str]]:
+        if self._coverage is None:
+            try:
+                with open(self._coverage_path(), "r") as f:
+                    self._coverage = json.load(f)
+            except (OSError, ValueError):
+                self._coverage = {}
+        return self._coverage
+
+    def _save_coverage(self):
+        tmp_path = self._coverage_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._coverage, f)
+        os.replace(tmp_path, self._coverage_path())
+
+    def _load(self, symbol: str) -> Optional[pd.DataFrame]:
+        if symbol not in self._frames:
+            path = self._path(symbol)
+            if not os.path.exists(path):
+                return None
+            self._frames[symbol] = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        return self._frames[symbol]
+
+    @staticmethod
+    def _clamp_end(end: str) -> str:
+        # Today's bar is still moving, so never treat it as cached
+        today = datetime.now().strftime("%Y-%m-%d")
+        return min(end, today)
+
+    def _empty_path(self) -> str:
+        return os.path.join(self.cache_dir, "empty.json")
+
+    def _load_empty(self) -> Dict[str, list]:
+        if self._empty is None:
+            try:
+                with open(self._empty_path(), "r") as f:
+                    self._empty = json.load(f)
+            except (OSError, ValueError):
+                self._empty = {}
+        return self._empty
+
+    def _save_empty(self):
+        tmp_path = self._empty_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._empty, f)
+        os.replace(tmp_path, self._empty_path())
+
+    def is_covered(self, symbol: str, start: str, end: str) -> bool:
+        """True when the store already holds `symbol` for [start, end), or recently found nothing there."""
+        symbol = symbol.upper()
+        end = self._clamp_end(end)
+        span = self._load_coverage().get(symbol)
+        if span and span[0] <= start and span[1] >= end:
+            return True
+        empty = self._load_empty().get(symbol)
+        return bool(empty) and empty[0] <= start and empty[1] >= end and time.time() - empty[2] < EMPTY_RETRY
+
+    def prefetch(self, symbols: List[str], start: str, end: str) -> List[str]:
+        """Make sure every symbol is stored for [start, end), downloading what is missing.
+
+        All missing symbols are fetched in a single threaded `yf.download` call,
+        made without holding the store lock so reads carry on meanwhile. A
+        symbol already being downloaded by another thread is waited for rather
+        than fetched twice, then fetched here if that download did not cover
+        [start, end). Symbols that come back empty are remembered for
+        `EMPTY_RETRY` seconds. Returns the symbols that were downloaded.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        end = self._clamp_end(end)
+        if start >= end:
+            return []
+
+        fetched = []
+        while symbols:
+            with self.lock:
+                coverage = self._load_coverage()
+                missing = [s for s in symbols if not self.is_covered(s, start, end)]
+                waiting = {s: self._inflight[s] for s in missing if s in self._inflight}
+                missing = [s for s in missing if s not in waiting]
+                done = threading.Event()
+                for symbol in missing:
+                    self._inflight[symbol] = done
+
+                # Extend existing ranges rather than leaving gaps between them
+                fetch_start = min([start] + [coverage[s][0] for s in missing if s in coverage])
+                fetch_end = max([end] + [coverage[s][1] for s in missing if s in coverage])
+
+            if missing:
+                try:
+                    self._download(missing, fetch_start, fetch_end)
+                    fetched.extend(missing)
+                finally:
+                    with self.lock:
+                        for symbol in missing:
+                            self._inflight.pop(symbol, None)
+                    done.set()
+
+            for event in set(waiting.values()):
+                event.wait()
+            # The other download may have been narrower than [start, end); check those symbols again
+            symbols = list(waiting)
+        return fetched
+
+    def _download(self, missing: List[str], fetch_start: str, fetch_end: str):
+        data = yf.download(
+            missing,
+            start=fetch_start,
+            end=fetch_end,
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+
+        with self.lock:
+            coverage = self._load_coverage()
+            empty = self._load_empty()
+            # An all-empty multi-symbol download is more likely an outage than bad symbols
+            outage = (data is None or data.empty) and len(missing) > 1
+            for symbol in missing:
+                frame = self._split(data, symbol, len(missing))
+                if frame is None:
+                    if not outage:
+                        empty[symbol] = [fetch_start, fetch_end, time.time()]
+                    continue
+                existing = self._load(symbol)
+                if existing is not None:
+                    frame = pd.concat([existing, frame])
+                    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                frame.to_csv(self._path(symbol), index_label="Date")
+                self._frames[symbol] = frame
+                coverage[symbol] = [fetch_start, fetch_end]
+                empty.pop(symbol, None)
+
+            self._save_coverage()
+            self._save_empty()
+
+    @staticmethod
+    def _split(data: pd.DataFrame, symbol: str, n_symbols: int) -> Optional[pd.DataFrame]:
+        """Pull one symbol's OHLCV out of a multi-symbol download."""
+        if data is None or data.empty:
+            return None
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            frame = data[symbol]
+        elif n_symbols == 1:
+            frame = data
+        else:
+            return None
+        frame = frame[[c for c in PRICE_COLUMNS if c in frame.columns]].dropna(how="all")
+        if frame.empty:
+            return None
+        if frame.index.tz is not None:
+            frame.index = frame.index.tz_localize(None)
+        frame.index.name = "Date"
+        return frame
+
+    def stored(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Everything already stored for `symbol`, without fetching."""
+        with self.lock:
+            return self._load(symbol.upper())
+
+    def symbols(self) -> List[str]:
+        """Symbols with stored prices."""
+        with self.lock:
+            return sorted(self._load_coverage())
+
+    def get(self, symbol: str, start: str, end: str) -> pd.DataFrame:
+        """Daily OHLCV for [start, end), fetching it first if it is not stored yet."""
+        symbol = symbol.upper()
+        self.prefetch([symbol], start, end)
+        with self.lock:
+            frame = self._load(symbol)
+        if frame is None:
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        return frame[(frame.index >= pd.Timestamp(start)) & (frame.index < pd.Timestamp(end))]
+
+
+price_store = PriceStore()
+
+
+def prefetch_prices(symbols: List[str], start: str, end: str) -> List[str]:
+    """Warm the shared price store for several symbols with one download."""
+    return price_store.prefetch(symbols, start, end)
+
+
+def history_window() -> tuple:
+    """(start, end) of the daily history the indicator paths work on."""
+    today = pd.Timestamp.today()
+    start = today - pd.DateOffset(years=HISTORY_YEARS)
+    return start.strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d")
+
+
+def get_history(symbol: str) -> pd.DataFrame:
+    """Full indicator history for one symbol with a `Date` column, from the store."""
+    return price_store.get(symbol, *history_window()).reset_index()
+
+
+def prefetch_history(symbols: List[str]) -> List[str]:
+    """Warm the full indicator history for a ticker universe in one download."""
+    return price_store.prefetch(symbols, *history_window())
+
+
+def window_end(date_str: str, days: int) -> str:
+    """Calendar date `days` after `date_str`, as yyyy-mm-dd."""
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
@@ -0,0 +1,203 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .config import get_config
+
+# Result kinds:
+#   table  - pd.DataFrame indexed by date (OHLCV, vendor CSV payloads)
+#   series - pd.Series of one indicator indexed by date string
+#   record - pd.Series of one statement row (field -> value)
+#   news   - list of NewsItem
+#   text   - pre-rendered string from a vendor without a typed path
+#   bundle - list of VendorResult from several vendors
+KINDS = ("table", "series", "record", "news", "text", "bundle")
+FORMATS = ("default", "csv", "markdown", "compact")
+
+
+@dataclass
+class VendorResult:
+    """Typed output of a vendor function, rendered to prompt text on demand.
+
+    `meta` carries provenance (method, vendor, symbol, date range) so callers
+    can inspect or cache data without parsing strings.
+    """
+
+    kind: str
+    data: Any
+    title: str = ""
+    notes: List[str] = field(default_factory=list)  # extra header lines, e.g. record counts
+    description: str = ""  # trailing explanation (indicator usage, statement layout)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    _rendered: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    def __str__(self) -> str:
+        return render(self)
+
+    def __len__(self) -> int:
+        return len(render(self))
+
+    @property
+    def empty(self) -> bool:
+        if self.kind in ("table", "series", "record"):
+            return self.data is None or self.data.empty
+        return not self.data
+
+    def frame(self) -> pd.DataFrame:
+        """Tabular view of the data for table-like kinds."""
+        if self.kind == "table":
+            return self.data
+        if self.kind == "series":
+            return self.data.to_frame(self.meta.get("indicator", "value"))
+        if self.kind == "record":
+            return self.data.to_frame("value")
+        if self.kind == "news":
+            return pd.DataFrame([vars(item) for item in self.data])
+        raise TypeError(f"No tabular view for '{self.kind}' results")
+
+
+def as_result(value: Any, method: str = None, vendor: str = None) -> VendorResult:
+    """Wrap a raw vendor return value, tagging it with its provenance."""
+    if isinstance(value, VendorResult):
+        result = value
+    elif isinstance(value, pd.DataFrame):
+        result = VendorResult("table", value)
+    else:
+        result = VendorResult("text", "" if value is None else str(value))
+    if method:
+        result.meta.setdefault("method", method)
+    if vendor:
+        result.meta.setdefault("vendor", vendor)
+    return result
+
+
+def combine(results: List[VendorResult]) -> VendorResult:
+    """One result from several vendors' outputs."""
+    if len(results) == 1:
+        return results[0]
+    return VendorResult("bundle", list(results), meta={"vendors": [r.meta.get("vendor") for r in results]})
+
+
+# Rendering
+
+
+def news_section(item) -> str:
+    """One story as a `### title (sources, date)` block."""
+    sources = ", ".join(item.sources) if item.sources else item.source
+    meta = ", ".join(filter(None, [sources, item.published]))
+    heading = f"{item.title} ({meta})" if meta else item.title
+    return f"### {heading}\n{item.summary}\n\n"
+
+
+def _to_markdown(frame: pd.DataFrame) -> str:
+    try:
+        return frame.to_markdown()
+    except ImportError:  # tabulate is optional
+        return frame.to_string()
+
+
+def decimals_for(value: float, digits: int, significant: int) -> int:
+    """Decimals that keep `digits` places but never fewer than `significant` figures (0.0045 stays 0.0045)."""
+    if not value or not math.isfinite(value):
+        return digits
+    return max(digits, significant - 1 - math.floor(math.log10(abs(value))))
+
+
+def format_float(value: float, digits: int, significant: int) -> str:
+    return f"{value:.{decimals_for(value, digits, significant)}f}"
+
+
+def _round(frame: pd.DataFrame, digits: int, significant: int) -> pd.DataFrame:
+    if frame.empty:
+        return frame
+    rounded = frame.copy()
+    for column in rounded.select_dtypes(include="number").columns:
+        rounded[column] = rounded[column].map(
+            lambda v: round(v, decimals_for(v, digits, significant)) if isinstance(v, float) else v
+        )
+    return rounded
+
+
+def _render_default(result: VendorResult) -> str:
+    """The layout each vendor produced before results were typed."""
+    if result.kind == "table":
+        header = "".join(f"# {line}\n" for line in [result.title] + result.notes if line)
+        return header + ("\n" if header else "") + result.data.to_csv()
+    if result.kind == "series":
+        lines = "".join(f"{date}: {value}\n" for date, value in result.data.items())
+        if not lines:
+            lines = "No data available for the specified date range.\n"
+        return f"## {result.title}:\n\n" + lines + "\n\n" + result.description
+    if result.kind == "record":
+        text = f"## {result.title}: \n" + str(result.data)
+        return text + ("\n\n" + result.description if result.description else "")
+    if result.kind == "news":
+        if not result.data:
+            return ""
+        return f"## {result.title}:\n\n" + "".join(news_section(item) for item in result.data)
+    return str(result.data)
+
+
+def _render_csv(result: VendorResult) -> str:
+    header = "".join(f"# {line}\n" for line in [result.title] + result.notes if line)
+    body = result.frame().to_csv(index=result.kind != "news")
+    return header + body
+
+
+def _render_markdown(result: VendorResult) -> str:
+    if result.kind == "news":
+        return _render_default(result)
+    text = f"## {result.title}\n\n" if result.title else ""
+    text += "".join(f"_{line}_\n" for line in result.notes)
+    text += _to_markdown(result.frame())
+    return text + ("\n\n" + result.description if result.description else "")
+
+
+def _render_compact(result: VendorResult) -> str:
+    """Title plus data only: floats rounded, non-trading days and descriptions dropped."""
+    config = get_config()
+    digits = config.get("tool_output_float_digits", 2)
+    significant = config.get("tool_output_significant_digits", 4)
+    if result.kind == "news":
+        lines = [f"- {item.title} ({item.published or 'n/d'})" for item in result.data]
+        return f"{result.title}\n" + "\n".join(lines)
+    if result.kind == "series":
+        values = pd.to_numeric(result.data, errors="coerce").dropna()
+        body = "".join(f"{date},{format_float(value, digits, significant)}\n" for date, value in values.items())
+        return f"{result.title}\n{body}"
+    return f"{result.title}\n" + _round(result.frame(), digits, significant).to_csv()
+
+
+RENDERERS = {
+    "default": _render_default,
+    "csv": _render_csv,
+    "markdown": _render_markdown,
+    "compact": _render_compact,
+}
+
+
+def render(result: Any, fmt: Optional[str] = None) -> str:
+    """Render a vendor result as prompt text.
+
+    `fmt` defaults to the `tool_output_format` config key. Renders are memoized
+    on the result, so a result shared by several tools is formatted once.
+    """
+    if not isinstance(result, VendorResult):
+        return "" if result is None else str(result)
+    fmt = fmt or get_config().get("tool_output_format", "default")
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown output format '{fmt}'. Choose from: {list(RENDERERS)}")
+
+    cached = result._rendered.get(fmt)
+    if cached is not None:
+        return cached
+    if result.kind == "bundle":
+        text = "\n".join(render(part, fmt) for part in result.data)
+    elif result.kind == "text" or result.empty:
+        text = _render_default(result)
+    else:
+        text = RENDERERS[fmt](result)
+    result._rendered[fmt] = text
+    return text
@@ -0,0 +1,368 @@
+import io
+import os
+import json
+import struct
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import StringIO
+from typing import Annotated, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from .config import get_config
+from .fundamentals_cache import is_public
+from .fred_store import fred_store
+from .macro_features import LIQUIDITY_SERIES, MACRO_SERIES
+from .price_store import PRICE_COLUMNS, HISTORY_YEARS, price_store, window_end
+from .results import VendorResult, render
+from .y_finance import get_stock_stats_indicators_window, _get_statement as _get_yfinance_statement
+
+SNAPSHOT_VERSION = 1
+STATEMENTS = {
+    "balance_sheet": "Balance Sheet",
+    "cashflow": "Cash Flow",
+    "income_statement": "Income Statement",
+}
+FREQS = ("quarterly", "annual")
+
+# Methods whose output is recorded as text per (ticker, date), with the
+# arguments the analysts use by default. Lookups serve the latest recording
+# on or before the requested date.
+NEWS_LOOKBACK_DAYS = 7
+RECORDED_METHODS = {
+    "get_news": lambda ticker, date: (ticker, window_end(date, -NEWS_LOOKBACK_DAYS), date),
+    "get_global_news": lambda ticker, date: (date, NEWS_LOOKBACK_DAYS, 5),
+    "get_fundamentals": lambda ticker, date: (ticker, date),
+    "get_insider_sentiment": lambda ticker, date: (ticker, date),
+    "get_insider_transactions": lambda ticker, date: (ticker, date),
+}
+TICKERLESS_METHODS = {"get_global_news"}
+
+
+class SnapshotMiss(LookupError):
+    """The snapshot holds no data for the request."""
+
+
+def _days(index: pd.DatetimeIndex) -> np.ndarray:
+    return index.values.astype("datetime64[D]").astype(np.int64).astype(np.float64)
+
+
+def _dates(days: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(days.astype(np.int64).astype("datetime64[D]"))
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(array, dtype=np.float64))
+    return buffer.getvalue()
+
+
+class SnapshotBundle:
+    """Read side of a point-in-time data snapshot.
+
+    A bundle is a single zip file. Numeric arrays (prices, FRED series) are
+    stored uncompressed as .npy members and memory-mapped in place; statements,
+    recorded tool outputs and the manifest are deflate-compressed text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, "r")
+        self.manifest = json.loads(self._zip.read("manifest.json"))
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._records: Optional[Dict[str, Dict[str, str]]] = None
+        self._record_dates: Dict[str, List[str]] = {}
+
+    @property
+    def end_date(self) -> str:
+        return self.manifest["end_date"]
+
+    def _array(self, name: str) -> np.ndarray:
+        """Memory-map a stored .npy member without extracting it."""
+        with self.lock:
+            if name in self._arrays:
+                return self._arrays[name]
+            try:
+                info = self._zip.getinfo(name)
+            except KeyError:
+                raise SnapshotMiss(f"'{name}' is not in snapshot {self.path}")
+            with open(self.path, "rb") as f:
+                f.seek(info.header_offset + 26)
+                name_len, extra_len = struct.unpack("<HH", f.read(4))
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+                offset = f.tell()
+            array = np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                              order="F" if fortran else "C")
+            self._arrays[name] = array
+            return array
+
+    def _check_date(self, date: str):
+        if date > self.end_date:
+            raise SnapshotMiss(f"{date} is after the snapshot end date {self.end_date}")
+
+    # Prices
+
+    def prices(self, symbol: str) -> pd.DataFrame:
+        """Daily OHLCV indexed by Date, up to the snapshot end date."""
+        array = self._array(f"prices/{symbol.upper()}.npy")
+        frame = pd.DataFrame(array[:, 1:], index=_dates(array[:, 0]), columns=PRICE_COLUMNS)
+        frame.index.name = "Date"
+        return frame
+
+    def history(self, symbol: str) -> pd.DataFrame:
+        """Price history with a `Date` column, as the indicator path expects."""
+        return self.prices(symbol).reset_index()
+
+    # Macro
+
+    def series(self, name: str) -> pd.Series:
+        array = self._array(f"fred/{name}.npy")
+        return pd.Series(array[:, 1], index=_dates(array[:, 0]), name=name)
+
+    # Statements
+
+    def statement(self, ticker: str, statement: str, freq: str) -> pd.DataFrame:
+        member = f"statements/{ticker.upper()}/{statement}-{freq.lower()}.csv"
+        try:
+            payload = self._zip.read(member).decode("utf-8")
+        except KeyError:
+            raise SnapshotMiss(f"'{member}' is not in snapshot {self.path}")
+        return pd.read_csv(StringIO(payload), index_col=0)
+
+    # Recorded tool outputs
+
+    def record(self, method: str, ticker: Optional[str], date: str) -> str:
+        """Latest recording of `method` on or before `date`."""
+        self._check_date(date)
+        with self.lock:
+            if self._records is None:
+                self._records = json.loads(self._zip.read("records.json"))
+        records = self._records.get(method, {})
+        prefix = "" if method in TICKERLESS_METHODS else f"{ticker.upper()}|"
+
+        key = f"{method}|{prefix}"
+        if key not in self._record_dates:
+            self._record_dates[key] = sorted(k[len(prefix):] for k in records if k.startswith(prefix))
+        dates = self._record_dates[key]
+        known = [d for d in dates if d <= date]
+        if not known:
+            raise SnapshotMiss(f"No {method} recorded for {ticker or 'market'} on or before {date}")
+        return records[prefix + known[-1]]
+
+
+_bundles: Dict[str, SnapshotBundle] = {}
+_bundles_lock = threading.Lock()
+
+
+def default_snapshot_path() -> str:
+    config = get_config()
+    return config.get("snapshot_path") or os.path.join(config["data_cache_dir"], "snapshot.zip")
+
+
+def open_snapshot(path: str = None) -> SnapshotBundle:
+    """Shared bundle for `path` (default: the `snapshot_path` config key)."""
+    path = path or default_snapshot_path()
+    with _bundles_lock:
+        if path not in _bundles:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Snapshot not found: {path}. Build it with build_snapshot().")
+            _bundles[path] = SnapshotBundle(path)
+        return _bundles[path]
+
+
+# Building
+
+
+def _record_task(method: str, ticker: Optional[str], date: str):
+    from .interface import route_to_vendor
+
+    try:
+        args = RECORDED_METHODS[method](ticker, date)
+        return render(route_to_vendor(method, *args))
+    except Exception as e:
+        print(f"Snapshot: {method} for {ticker or 'market'} on {date} not recorded: {e}")
+        return None
+
+
+def build_snapshot(
+    tickers: List[str],
+    start_date: str,
+    end_date: str,
+    path: str = None,
+    record_methods: List[str] = None,
+    max_workers: int = 4,
+) -> str:
+    """Prefetch everything the analyst tools can request for `tickers` over
+    [start_date, end_date] into one bundle, using the configured live vendors.
+
+    Prices cover the indicator history window ending at end_date, statements
+    are stored whole and filtered point-in-time when served, and the text
+    tools are recorded once per business day. Returns the bundle path.
+    """
+    path = path or default_snapshot_path()
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    record_methods = list(RECORDED_METHODS) if record_methods is None else record_methods
+
+    history_start = (datetime.strptime(end_date, "%Y-%m-%d") - relativedelta(years=HISTORY_YEARS)).strftime("%Y-%m-%d")
+    price_end = window_end(end_date, 1)
+    price_store.prefetch(tickers, history_start, price_end)
+
+    arrays: Dict[str, bytes] = {}
+    texts: Dict[str, str] = {}
+
+    for ticker in tickers:
+        frame = price_store.get(ticker, history_start, price_end)
+        if frame.empty:
+            print(f"Snapshot: no prices for {ticker}")
+            continue
+        frame = frame.reindex(columns=PRICE_COLUMNS)
+        arrays[f"prices/{ticker}.npy"] = _npy_bytes(np.column_stack([_days(frame.index), frame.to_numpy(dtype=float)]))
+
+    for ticker in tickers:
+        for statement in STATEMENTS:
+            for freq in FREQS:
+                try:
+                    data = _get_yfinance_statement(ticker, statement, freq)
+                except Exception as e:
+                    print(f"Snapshot: {statement} ({freq}) for {ticker} not stored: {e}")
+                    continue
+                if not data.empty:
+                    texts[f"statements/{ticker}/{statement}-{freq}.csv"] = data.to_csv()
+
+    for name in LIQUIDITY_SERIES + MACRO_SERIES:
+        try:
+            series = fred_store.get_series(name).dropna()
+        except Exception as e:
+            print(f"Snapshot: FRED series {name} not stored: {e}")
+            continue
+        series = series[series.index <= pd.Timestamp(end_date)]
+        if not series.empty:
+            arrays[f"fred/{name}.npy"] = _npy_bytes(np.column_stack([_days(series.index), series.to_numpy(dtype=float)]))
+
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(start_date, end_date)]
+    tasks = [
+        (method, None if method in TICKERLESS_METHODS else ticker, date)
+        for method in record_methods
+        for date in dates
+        for ticker in ([None] if method in TICKERLESS_METHODS else tickers)
+    ]
+    records: Dict[str, Dict[str, str]] = {method: {} for method in record_methods}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outputs = executor.map(lambda task: _record_task(*task), tasks)
+        for (method, ticker, date), text in zip(tasks, outputs):
+            if text is not None:
+                records[method][f"{ticker}|{date}" if ticker else date] = text
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "tickers": tickers,
+        "start_date": start_date,
+        "end_date": end_date,
+        "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "data_vendors": get_config().get("data_vendors", {}),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w") as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("records.json", json.dumps(records), compress_type=zipfile.ZIP_DEFLATED)
+        for name, text in texts.items():
+            zf.writestr(name, text, compress_type=zipfile.ZIP_DEFLATED)
+        # Stored uncompressed so they can be memory-mapped
+        for name, data in arrays.items():
+            zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+    os.replace(tmp_path, path)
+
+    with _bundles_lock:
+        stale = _bundles.pop(path, None)
+    if stale is not None:
+        stale._zip.close()
+    return path
+
+
+# Vendor functions (registered as "snapshot" in VENDOR_METHODS)
+
+
+def get_stock_data(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
+    end_date: Annotated[str, "End date in yyyy-mm-dd format"],
+) -> VendorResult:
+    bundle = open_snapshot()
+    frame = bundle.prices(symbol)
+    data = frame[(frame.index >= pd.Timestamp(start_date)) & (frame.index < pd.Timestamp(end_date))]
+    if data.empty:
+        return f"No data found for symbol '{symbol}' between {start_date} and {end_date}"
+    return VendorResult(
+        "table",
+        data.round({c: 2 for c in ["Open", "High", "Low", "Close"]}),
+        title=f"Stock data for {symbol.upper()} from {start_date} to {end_date}",
+        notes=[f"Total records: {len(data)}", f"Snapshot built on: {bundle.manifest['built_at']}"],
+        meta={"symbol": symbol.upper(), "start_date": start_date, "end_date": end_date},
+    )
+
+
+def get_indicators(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    indicator: Annotated[str, "technical indicator to get the analysis and report of"],
+    curr_date: Annotated[str, "The current trading date you are trading on, YYYY-mm-dd"],
+    look_back_days: Annotated[int, "how many days to look back"],
+) -> VendorResult:
+    bundle = open_snapshot()
+    bundle._check_date(curr_date)
+    return get_stock_stats_indicators_window(symbol, indicator, curr_date, look_back_days, history=bundle.history)
+
+
+def _get_statement(ticker: str, statement: str, freq: str, curr_date: str = None):
+    bundle = open_snapshot()
+    data = bundle.statement(ticker, statement, freq)
+    data = data[[c for c in data.columns if is_public(c, freq, curr_date or bundle.end_date)]]
+    if data.empty:
+        return f"No {STATEMENTS[statement].lower()} data found for symbol '{ticker}'"
+    header = f"# {STATEMENTS[statement]} data for {ticker.upper()} ({freq})\n"
+    header += f"# Snapshot built on: {bundle.manifest['built_at']}\n\n"
+    return header + data.to_csv()
+
+
+def get_balance_sheet(ticker: str, freq: str = "quarterly", curr_date: str = None):
+    return _get_statement(ticker, "balance_sheet", freq, curr_date)
+
+
+def get_cashflow(ticker: str, freq: str = "quarterly", curr_date: str = None):
+    return _get_statement(ticker, "cashflow", freq, curr_date)
+
+
+def get_income_statement(ticker: str, freq: str = "quarterly", curr_date: str = None):
+    return _get_statement(ticker, "income_statement", freq, curr_date)
+
+
+def get_fundamentals(ticker: str, curr_date: str):
+    return open_snapshot().record("get_fundamentals", ticker, curr_date)
+
+
+def get_news(ticker: str, start_date: str, end_date: str):
+    return open_snapshot().record("get_news", ticker, end_date)
+
+
+def get_global_news(curr_date: str, look_back_days: int = 7, limit: int = 5):
+    return open_snapshot().record("get_global_news", None, curr_date)
+
+
+def get_insider_sentiment(ticker: str, curr_date: str):
+    return open_snapshot().record("get_insider_sentiment", ticker, curr_date)
+
+
+def get_insider_transactions(ticker: str, curr_date: str = None):
+    bundle = open_snapshot()
+    return bundle.record("get_insider_transactions", ticker, curr_date or bundle.end_date)
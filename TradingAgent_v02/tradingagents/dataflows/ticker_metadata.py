@@ -0,0 +1,131 @@
+import os
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from .config import get_config
+from .price_store import price_store
+
+
+def _clean(value) -> Optional[str]:
+    if value is None or value == "N/A" or value != value:  # NaN
+        return None
+    return str(value)
+
+
+class TickerMetadata:
+    """Company name, sector and industry per ticker, persisted locally.
+
+    Entries come from `YFinanceUtils.get_company_info` once and are kept in
+    `<data_cache_dir>/ticker_metadata.json`; classifications rarely change.
+    The metadata doubles as a peer graph: tickers are grouped by industry and
+    by sector, so same-industry and same-sector peers are dictionary lookups.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self._by_industry: Dict[str, List[str]] = {}
+        self._by_sector: Dict[str, List[str]] = {}
+
+    def _path(self) -> str:
+        cache_dir = self._cache_dir or get_config()["data_cache_dir"]
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, "ticker_metadata.json")
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self._path(), "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+            self._index()
+        return self._entries
+
+    def _save(self):
+        tmp_path = self._path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path())
+
+    def _index(self):
+        by_industry, by_sector = defaultdict(list), defaultdict(list)
+        for symbol, entry in sorted(self._entries.items()):
+            if entry.get("industry"):
+                by_industry[entry["industry"]].append(symbol)
+            if entry.get("sector"):
+                by_sector[entry["sector"]].append(symbol)
+        self._by_industry, self._by_sector = dict(by_industry), dict(by_sector)
+
+    @staticmethod
+    def _fetch(symbol: str) -> Optional[dict]:
+        from .yfin_utils import YFinanceUtils
+
+        try:
+            info = YFinanceUtils.get_company_info(symbol).iloc[0]
+        except Exception as e:
+            print(f"Company info lookup failed for {symbol}: {e}")
+            return None
+        return {
+            "name": _clean(info.get("Company Name")),
+            "sector": _clean(info.get("Sector")),
+            "industry": _clean(info.get("Industry")),
+            "country": _clean(info.get("Country")),
+        }
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Metadata for one ticker, fetched and stored on first use."""
+        symbol = symbol.upper()
+        with self.lock:
+            entry = self._load().get(symbol)
+        if entry is None:
+            self.ensure([symbol])
+            with self.lock:
+                entry = self._entries.get(symbol)
+        return entry
+
+    def ensure(self, symbols: Iterable[str], max_workers: int = 8) -> List[str]:
+        """Fetch metadata for any of `symbols` not stored yet; returns those fetched."""
+        with self.lock:
+            known = self._load()
+            missing = [s for s in dict.fromkeys(s.upper() for s in symbols if s) if s not in known]
+        if not missing:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            fetched = dict(zip(missing, pool.map(self._fetch, missing)))
+        fetched = {s: entry for s, entry in fetched.items() if entry is not None}
+        if fetched:
+            with self.lock:
+                self._entries.update(fetched)
+                self._index()
+                self._save()
+        return list(fetched)
+
+    def entries(self) -> Dict[str, dict]:
+        """All stored metadata, by ticker."""
+        with self.lock:
+            return dict(self._load())
+
+    def universe(self) -> List[str]:
+        """Tickers known locally: those with metadata or stored prices."""
+        with self.lock:
+            symbols = set(self._load())
+        symbols.update(price_store.symbols())
+        return sorted(symbols)
+
+    def peers(self, symbol: str, limit: int = 10) -> List[str]:
+        """Same-industry tickers first, then same-sector ones, from stored metadata."""
+        symbol = symbol.upper()
+        entry = self.get(symbol)
+        if not entry:
+            return []
+        with self.lock:
+            candidates = self._by_industry.get(entry.get("industry"), []) + self._by_sector.get(entry.get("sector"), [])
+        return [s for s in dict.fromkeys(candidates) if s != symbol][:limit]
+
+
+ticker_metadata = TickerMetadata()
@@ -1,9 +1,14 @@
-from typing import Annotated
+from typing import Annotated, Callable
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 import yfinance as yf
+import pandas as pd
 import os
+from io import StringIO
 from .stockstats_utils import StockstatsUtils
+from .price_store import price_store, get_history
+from .fundamentals_cache import fundamentals_cache, is_public
+from .results import VendorResult
 
 def get_YFin_data_online(
     symbol: Annotated[str, "ticker symbol of the company"],
@@ -14,11 +19,8 @@ def get_YFin_data_online(
     datetime.strptime(start_date, "%Y-%m-%d")
     datetime.strptime(end_date, "%Y-%m-%d")
 
-    # Create ticker object
-    ticker = yf.Ticker(symbol.upper())
-
-    # Fetch historical data for the specified date range
-    data = ticker.history(start=start_date, end=end_date)
+    # Served from the shared price store; only missing ranges hit Yahoo Finance
+    data = price_store.get(symbol.upper(), start_date, end_date)
 
     # Check if data is empty
     if data.empty:
@@ -36,15 +38,16 @@ def get_YFin_data_online(
         if col in data.columns:
             data[col] = data[col].round(2)
 
-    # Convert DataFrame to CSV string
-    csv_string = data.to_csv()
-
-    # Add header information
-    header = f"# Stock data for {symbol.upper()} from {start_date} to {end_date}\n"
-    header += f"# Total records: {len(data)}\n"
-    header += f"# Data retrieved on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-
-    return header + csv_string
+    return VendorResult(
+        "table",
+        data,
+        title=f"Stock data for {symbol.upper()} from {start_date} to {end_date}",
+        notes=[
+            f"Total records: {len(data)}",
+            f"Data retrieved on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        ],
+        meta={"symbol": symbol.upper(), "start_date": start_date, "end_date": end_date},
+    )
 
 def get_stock_stats_indicators_window(
     symbol: Annotated[str, "ticker symbol of the company"],
@@ -53,7 +56,9 @@ def get_stock_stats_indicators_window(
         str, "The current trading date you are trading on, YYYY-mm-dd"
     ],
     look_back_days: Annotated[int, "how many days to look back"],
-) -> str:
+    history: Callable[[str], pd.DataFrame] = None,
+) -> VendorResult:
+    """Indicator values over a window. `history(symbol)` overrides the price source."""
 
     best_ind_params = {
         # Moving Averages
@@ -139,7 +144,7 @@ def get_stock_stats_indicators_window(
 
     # Optimized: Get stock data once and calculate indicators for all dates
     try:
-        indicator_data = _get_stock_stats_bulk(symbol, indicator, curr_date)
+        indicator_data = _get_stock_stats_bulk(symbol, indicator, curr_date, history)
         
         # Generate the date range we need
         current_dt = curr_date_dt
@@ -157,37 +162,35 @@ def get_stock_stats_indicators_window(
             date_values.append((date_str, indicator_value))
             current_dt = current_dt - relativedelta(days=1)
         
-        # Build the result string
-        ind_string = ""
-        for date_str, value in date_values:
-            ind_string += f"{date_str}: {value}\n"
-        
     except Exception as e:
         print(f"Error getting bulk stockstats data: {e}")
+        if history is not None:
+            # The per-day fallback would go to the network
+            raise
         # Fallback to original implementation if bulk method fails
-        ind_string = ""
+        date_values = []
         curr_date_dt = datetime.strptime(curr_date, "%Y-%m-%d")
         while curr_date_dt >= before:
             indicator_value = get_stockstats_indicator(
                 symbol, indicator, curr_date_dt.strftime("%Y-%m-%d")
             )
-            ind_string += f"{curr_date_dt.strftime('%Y-%m-%d')}: {indicator_value}\n"
+            date_values.append((curr_date_dt.strftime("%Y-%m-%d"), indicator_value))
             curr_date_dt = curr_date_dt - relativedelta(days=1)
 
-    result_str = (
-        f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
-        + ind_string
-        + "\n\n"
-        + best_ind_params.get(indicator, "No description available.")
+    return VendorResult(
+        "series",
+        pd.Series(dict(date_values), name=indicator, dtype=object),
+        title=f"{indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}",
+        description=best_ind_params.get(indicator, "No description available."),
+        meta={"symbol": symbol.upper(), "indicator": indicator, "start_date": before.strftime("%Y-%m-%d"), "end_date": end_date},
     )
 
-    return result_str
-
 
 def _get_stock_stats_bulk(
     symbol: Annotated[str, "ticker symbol of the company"],
     indicator: Annotated[str, "technical indicator to calculate"],
-    curr_date: Annotated[str, "current date for reference"]
+    curr_date: Annotated[str, "current date for reference"],
+    history: Callable[[str], pd.DataFrame] = None,
 ) -> dict:
     """
     Optimized bulk calculation of stock stats indicators.
@@ -202,7 +205,11 @@ def _get_stock_stats_bulk(
     config = get_config()
     online = config["data_vendors"]["technical_indicators"] != "local"
     
-    if not online:
+    if history is not None:
+        # Caller-supplied history (e.g. a data snapshot)
+        df = wrap(history(symbol))
+        df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+    elif not online:
         # Local data path
         try:
             data = pd.read_csv(
@@ -215,36 +222,8 @@ def _get_stock_stats_bulk(
         except FileNotFoundError:
             raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
     else:
-        # Online data fetching with caching
-        today_date = pd.Timestamp.today()
-        curr_date_dt = pd.to_datetime(curr_date)
-        
-        end_date = today_date
-        start_date = today_date - pd.DateOffset(years=15)
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        
-        os.makedirs(config["data_cache_dir"], exist_ok=True)
-        
-        data_file = os.path.join(
-            config["data_cache_dir"],
-            f"{symbol}-YFin-data-{start_date_str}-{end_date_str}.csv",
-        )
-        
-        if os.path.exists(data_file):
-            data = pd.read_csv(data_file)
-            data["Date"] = pd.to_datetime(data["Date"])
-        else:
-            data = yf.download(
-                symbol,
-                start=start_date_str,
-                end=end_date_str,
-                multi_level_index=False,
-                progress=False,
-                auto_adjust=True,
-            )
-            data = data.reset_index()
-            data.to_csv(data_file, index=False)
+        # Online data from the shared price store (warmed by prefetch_market_data)
+        data = get_history(symbol)
         
         df = wrap(data)
         df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
@@ -293,19 +272,39 @@ def get_stockstats_indicator(
     return str(indicator_value)
 
 
+STATEMENT_ATTRS = {
+    "balance_sheet": ("quarterly_balance_sheet", "balance_sheet"),
+    "cashflow": ("quarterly_cashflow", "cashflow"),
+    "income_statement": ("quarterly_income_stmt", "income_stmt"),
+}
+
+
+def _get_statement(ticker: str, statement: str, freq: str, curr_date: str = None) -> pd.DataFrame:
+    """Statement table from the fundamentals cache, limited to periods filed by curr_date."""
+    def fetch():
+        ticker_obj = yf.Ticker(ticker.upper())
+        quarterly_attr, annual_attr = STATEMENT_ATTRS[statement]
+        data = getattr(ticker_obj, quarterly_attr if freq.lower() == "quarterly" else annual_attr)
+        if data is None or data.empty:
+            return "", []
+        return data.to_csv(), [str(c)[:10] for c in data.columns]
+
+    payload = fundamentals_cache.get(ticker, statement, freq, "yfinance", fetch, curr_date)
+    if not payload:
+        return pd.DataFrame()
+    data = pd.read_csv(StringIO(payload), index_col=0)
+    # Point-in-time: drop periods that were not yet filed on curr_date
+    return data[[c for c in data.columns if is_public(c, freq, curr_date)]]
+
+
 def get_balance_sheet(
     ticker: Annotated[str, "ticker symbol of the company"],
     freq: Annotated[str, "frequency of data: 'annual' or 'quarterly'"] = "quarterly",
-    curr_date: Annotated[str, "current date (not used for yfinance)"] = None
+    curr_date: Annotated[str, "current date, statements filed after it are hidden"] = None
 ):
     """Get balance sheet data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
-        
-        if freq.lower() == "quarterly":
-            data = ticker_obj.quarterly_balance_sheet
-        else:
-            data = ticker_obj.balance_sheet
+        data = _get_statement(ticker, "balance_sheet", freq, curr_date)
             
         if data.empty:
             return f"No balance sheet data found for symbol '{ticker}'"
@@ -326,16 +325,11 @@ def get_balance_sheet(
 def get_cashflow(
     ticker: Annotated[str, "ticker symbol of the company"],
     freq: Annotated[str, "frequency of data: 'annual' or 'quarterly'"] = "quarterly",
-    curr_date: Annotated[str, "current date (not used for yfinance)"] = None
+    curr_date: Annotated[str, "current date, statements filed after it are hidden"] = None
 ):
     """Get cash flow data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
-        
-        if freq.lower() == "quarterly":
-            data = ticker_obj.quarterly_cashflow
-        else:
-            data = ticker_obj.cashflow
+        data = _get_statement(ticker, "cashflow", freq, curr_date)
             
         if data.empty:
             return f"No cash flow data found for symbol '{ticker}'"
@@ -356,16 +350,11 @@ def get_cashflow(
 def get_income_statement(
     ticker: Annotated[str, "ticker symbol of the company"],
     freq: Annotated[str, "frequency of data: 'annual' or 'quarterly'"] = "quarterly",
-    curr_date: Annotated[str, "current date (not used for yfinance)"] = None
+    curr_date: Annotated[str, "current date, statements filed after it are hidden"] = None
 ):
     """Get income statement data from yfinance."""
     try:
-        ticker_obj = yf.Ticker(ticker.upper())
-        
-        if freq.lower() == "quarterly":
-            data = ticker_obj.quarterly_income_stmt
-        else:
-            data = ticker_obj.income_stmt
+        data = _get_statement(ticker, "income_statement", freq, curr_date)
             
         if data.empty:
             return f"No income statement data found for symbol '{ticker}'"
@@ -7,6 +7,7 @@ import pandas as pd
 from functools import wraps
 
 from .utils import save_output, SavePathType, decorate_all_methods
+from .price_store import price_store
 
 
 def init_ticker(func: Callable) -> Callable:
@@ -38,7 +39,7 @@ class YFinanceUtils:
         # add one day to the end_date so that the data range is inclusive
         end_date = pd.to_datetime(end_date) + pd.DateOffset(days=1)
         end_date = end_date.strftime("%Y-%m-%d")
-        stock_data = ticker.history(start=start_date, end=end_date)
+        stock_data = price_store.get(ticker.ticker, start_date, end_date)
         # save_output(stock_data, f"Stock data for {ticker.ticker}", save_path)
         return stock_data
 
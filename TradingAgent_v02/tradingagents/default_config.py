@@ -17,13 +17,64 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    "debate_early_stop": False,          # Stop debates once positions stop moving between rounds
+    "debate_convergence_method": "lexical",  # Options: lexical, embedding
+    # Similarity of a speaker's consecutive arguments that counts as converged, per method
+    "debate_convergence_threshold_lexical": 0.85,
+    "debate_convergence_threshold_embedding": 0.95,  # embedding cosines of same-topic text are already ~0.85
+    "min_debate_rounds": 1,
+    "parallel_risk_debate": False,       # Run the three risk debaters of each round concurrently
+    # Reflection settings
+    "batch_reflection": True,            # Run all reflection prompts in one batch and embed each situation once
+    "reflection_max_concurrency": 5,
+    # Prompt compaction settings
+    "compact_reports": True,             # Digest analyst reports and roll up debate history before the debate stages
+    "report_digest_max_chars": 2500,     # Upper bound on each report digest
+    "debate_history_turns": 3,           # Most recent debate turns kept verbatim
+    "debate_summary_max_chars": 2000,    # Upper bound on the rolling summary of older turns
+    "debate_summary_batch_turns": 3,     # Older turns folded into the summary together, one call per batch
+    # Tool output shaping (applied before results enter analyst messages)
+    "shape_tool_outputs": True,
+    "tool_output_max_rows": 60,          # Most recent rows kept per dated table
+    "tool_output_max_tokens": 2000,      # Budget per tool result; older rows are summarized beyond it
+    "tool_output_float_digits": 2,
+    "tool_output_significant_digits": 4, # Small values keep this many figures instead of rounding to 0.00
+    "tool_output_format": "default",     # Rendering of typed vendor results: default, csv, markdown, compact
+    # Data caching
+    "cache_fundamentals": True,          # Serve statements from disk until the next filing is expected
+    "fred_history_start": "2000-01-01",  # First observation kept in the local FRED store
+    "google_news_concurrent": True,      # Cached, concurrent pagination for the Google News scraper
+    "google_news_max_pages": 10,
+    "google_news_cache_ttl": 3600,       # Seconds; only for date ranges that include today
+    "snapshot_path": None,               # Bundle served by the "snapshot" vendor (default: data_cache_dir/snapshot.zip)
+    # News aggregation (dedupe and rank get_news results across vendors)
+    "aggregate_news": True,
+    "news_top_k": 20,
+    "news_max_tokens": 3000,
+    "news_dedup_threshold": 0.6,         # MinHash Jaccard estimate above which stories are merged
+    "news_recency_half_life_days": 3.0,
+    # Peer similarity index (related-ticker discovery from local data)
+    "peer_lookback_days": 252,           # Trading days of returns correlated between tickers
+    "peer_weights": {"correlation": 1.0, "industry": 0.6, "sector": 0.3, "embedding": 0.5},
+    "peer_report_embeddings": False,     # Embed each analysed ticker's fundamentals report for similarity
+    "peer_index_ttl": 86400,             # Seconds before the index is rebuilt from the stores
+    "peer_min_score": 0.6,               # Weakest similarity served as a peer (same industry, or sector plus some correlation)
+    # Graph checkpointing (resume interrupted runs, rerun from a node)
+    "checkpointing": True,
+    "checkpoint_db": None,               # SQLite file (default: data_cache_dir/checkpoints.sqlite)
+    "checkpoint_ttl": 7 * 86400,         # Seconds a run's checkpoints are kept after it was last used
+    # Web service settings
+    "analysis_cache_ttl": 86400,         # Seconds an identical past-date analysis is reused (0 disables)
+    "ws_frame_window_ms": 50,            # Websocket events are coalesced into one frame per window
+    "ws_max_pending_events": 500,        # Buffered events per socket before log/stream updates are shed
     # Data vendor configuration
     # Category-level configuration (default for all tools in category)
     "data_vendors": {
-        "core_stock_apis": "yfinance",       # Options: yfinance, alpha_vantage, local
-        "technical_indicators": "yfinance",  # Options: yfinance, alpha_vantage, local
-        "fundamental_data": "alpha_vantage", # Options: openai, alpha_vantage, local
-        "news_data": "alpha_vantage",        # Options: openai, alpha_vantage, google, local
+        "core_stock_apis": "yfinance",       # Options: yfinance, alpha_vantage, local, snapshot
+        "technical_indicators": "yfinance",  # Options: yfinance, alpha_vantage, local, snapshot
+        "fundamental_data": "alpha_vantage", # Options: openai, alpha_vantage, local, snapshot
+        "news_data": "alpha_vantage",        # Options: openai, alpha_vantage, google, local, snapshot
+        "macro_data": "fred",                # Options: fred, local (CSV files under data_dir/fred), snapshot
     },
     # Tool-level configuration (takes precedence over category-level)
     "tool_vendors": {
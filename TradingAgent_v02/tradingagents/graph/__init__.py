@@ -2,16 +2,23 @@
 
 from .trading_graph import TradingAgentsGraph
 from .conditional_logic import ConditionalLogic
+from .convergence import DebateConvergence
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .profiler import GraphProfiler
+from .checkpointing import create_checkpointer, thread_id_for
 
 __all__ = [
     "TradingAgentsGraph",
     "ConditionalLogic",
+    "DebateConvergence",
     "GraphSetup",
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "GraphProfiler",
+    "create_checkpointer",
+    "thread_id_for",
 ]
@@ -0,0 +1,155 @@
+# TradingAgents/graph/checkpointing.py
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+# One saver per checkpoint database per process, shared by every graph
+_savers: Dict[str, Any] = {}
+_activity: Dict[int, "_Activity"] = {}
+_lock = threading.Lock()
+
+# Expired threads are swept at most this often
+SWEEP_INTERVAL = 3600
+
+
+class _Activity:
+    """Last-used time per checkpoint thread, so idle threads can be expired.
+
+    Kept in a `thread_activity` table next to the saver's own tables when the
+    saver is SQLite, in memory otherwise.
+    """
+
+    def __init__(self, saver, conn: Optional[sqlite3.Connection] = None):
+        self.saver = saver
+        self.conn = conn
+        # Share the saver's lock so our statements never interleave with its transactions
+        self.lock = getattr(saver, "lock", None) or threading.Lock()
+        self.touched: Dict[str, float] = {}
+        self.swept_at = 0.0
+        if conn is not None:
+            with self.lock, conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, touched_at REAL)")
+
+    def touch(self, thread_id: str):
+        now = time.time()
+        with self.lock:
+            if self.conn is None:
+                self.touched[thread_id] = now
+                return
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO thread_activity VALUES (?, ?)", (thread_id, now))
+
+    def idle_threads(self, ttl: float) -> list:
+        cutoff = time.time() - ttl
+        with self.lock:
+            if self.conn is None:
+                idle = [t for t, touched in self.touched.items() if touched < cutoff]
+                # Threads the saver holds but nobody touched (none in practice)
+                idle += [t for t in getattr(self.saver, "storage", {}) if t not in self.touched]
+                return idle
+            tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            idle = [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE touched_at < ?", (cutoff,)
+            )]
+            if "checkpoints" in tables:
+                # Threads saved before activity was tracked
+                idle += [row[0] for row in self.conn.execute(
+                    "SELECT DISTINCT thread_id FROM checkpoints"
+                    " WHERE thread_id NOT IN (SELECT thread_id FROM thread_activity)"
+                )]
+            return idle
+
+    def forget(self, thread_id: str):
+        with self.lock:
+            self.touched.pop(thread_id, None)
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+
+
+def _open(path: str):
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+
+        print("langgraph-checkpoint-sqlite not installed; graph checkpoints are kept in memory only")
+        saver = MemorySaver()
+        return saver, _Activity(saver)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Graph runs happen on worker threads; the saver serializes access itself
+    conn = sqlite3.connect(path, check_same_thread=False)
+    saver = SqliteSaver(conn)
+    return saver, _Activity(saver, conn)
+
+
+def create_checkpointer(config: Dict[str, Any]):
+    """SQLite checkpointer for graph runs, or None when checkpointing is off.
+
+    Every graph in the process shares one saver (and connection) per
+    database. Falls back to an in-memory saver (resumable within the process
+    only) when the `langgraph-checkpoint-sqlite` package is not installed.
+    """
+    if not config.get("checkpointing", True):
+        return None
+
+    path = os.path.abspath(config.get("checkpoint_db") or os.path.join(config["data_cache_dir"], "checkpoints.sqlite"))
+    with _lock:
+        if path not in _savers:
+            saver, activity = _open(path)
+            _savers[path] = saver
+            _activity[id(saver)] = activity
+        return _savers[path]
+
+
+def thread_id_for(ticker: str, trade_date: str, session_id: Optional[str] = None) -> str:
+    """Checkpoint thread for one (ticker, date, session) run."""
+    return f"{ticker.upper()}:{trade_date}:{session_id or 'default'}"
+
+
+def touch_thread(checkpointer, thread_id: str):
+    """Record that `thread_id` was just used; idle threads expire after `checkpoint_ttl`."""
+    activity = _activity.get(id(checkpointer))
+    if activity is not None:
+        activity.touch(thread_id)
+
+
+def delete_thread(checkpointer, thread_id: str):
+    """Drop every checkpoint and pending write saved for `thread_id`."""
+    if hasattr(checkpointer, "delete_thread"):
+        checkpointer.delete_thread(thread_id)
+    else:
+        activity = _activity.get(id(checkpointer))
+        if activity is not None and activity.conn is not None:
+            with activity.lock, activity.conn:
+                activity.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                activity.conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        else:
+            getattr(checkpointer, "storage", {}).pop(thread_id, None)
+            writes = getattr(checkpointer, "writes", {})
+            for key in [k for k in writes if k[0] == thread_id]:
+                del writes[key]
+    activity = _activity.get(id(checkpointer))
+    if activity is not None:
+        activity.forget(thread_id)
+
+
+def expire_checkpoints(checkpointer, ttl: float, force: bool = False) -> int:
+    """Delete threads idle for longer than `ttl` seconds; sweeps at most hourly unless forced."""
+    activity = _activity.get(id(checkpointer))
+    if activity is None or not ttl:
+        return 0
+    now = time.time()
+    if not force and now - activity.swept_at < SWEEP_INTERVAL:
+        return 0
+    activity.swept_at = now
+    idle = activity.idle_threads(ttl)
+    for thread_id in idle:
+        delete_thread(checkpointer, thread_id)
+    if idle:
+        print(f"Expired checkpoints of {len(idle)} idle graph runs")
+    return len(idle)
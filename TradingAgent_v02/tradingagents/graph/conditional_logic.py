@@ -1,15 +1,40 @@
 # TradingAgents/graph/conditional_logic.py
 
+from typing import Optional
+
 from tradingagents.agents.utils.agent_states import AgentState
 
+from .convergence import DebateConvergence
+
 
 class ConditionalLogic:
     """Handles conditional logic for determining graph flow."""
 
-    def __init__(self, max_debate_rounds=1, max_risk_discuss_rounds=1):
-        """Initialize with configuration parameters."""
+    def __init__(
+        self,
+        max_debate_rounds=1,
+        max_risk_discuss_rounds=1,
+        convergence: Optional[DebateConvergence] = None,
+        min_debate_rounds=1,
+    ):
+        """Initialize with configuration parameters.
+
+        When `convergence` is given, debates stop early at a round boundary once
+        every speaker's position has stopped moving (after `min_debate_rounds`).
+        """
         self.max_debate_rounds = max_debate_rounds
         self.max_risk_discuss_rounds = max_risk_discuss_rounds
+        self.convergence = convergence
+        self.min_debate_rounds = max(1, min_debate_rounds)
+
+    def _round_converged(self, count, speakers, histories) -> bool:
+        """Check convergence only at the end of a full round past the minimum."""
+        if self.convergence is None:
+            return False
+        n = len(speakers)
+        if count % n != 0 or count < n * max(2, self.min_debate_rounds):
+            return False
+        return self.convergence.has_converged(dict(zip(speakers, histories)))
 
     def should_continue_market(self, state: AgentState):
         """Determine if market analysis should continue."""
@@ -50,6 +75,13 @@ class ConditionalLogic:
             state["investment_debate_state"]["count"] >= 2 * self.max_debate_rounds
         ):  # 3 rounds of back-and-forth between 2 agents
             return "Research Manager"
+        debate_state = state["investment_debate_state"]
+        if self._round_converged(
+            debate_state["count"],
+            ["Bull Analyst", "Bear Analyst"],
+            [debate_state.get("bull_history", ""), debate_state.get("bear_history", "")],
+        ):
+            return "Research Manager"
         if state["investment_debate_state"]["current_response"].startswith("Bull"):
             return "Bear Researcher"
         return "Bull Researcher"
@@ -60,8 +92,36 @@ class ConditionalLogic:
             state["risk_debate_state"]["count"] >= 3 * self.max_risk_discuss_rounds
         ):  # 3 rounds of back-and-forth between 3 agents
             return "Risk Judge"
+        risk_state = state["risk_debate_state"]
+        if self._round_converged(
+            risk_state["count"],
+            ["Risky Analyst", "Safe Analyst", "Neutral Analyst"],
+            [
+                risk_state.get("risky_history", ""),
+                risk_state.get("safe_history", ""),
+                risk_state.get("neutral_history", ""),
+            ],
+        ):
+            return "Risk Judge"
         if state["risk_debate_state"]["latest_speaker"].startswith("Risky"):
             return "Safe Analyst"
         if state["risk_debate_state"]["latest_speaker"].startswith("Safe"):
             return "Neutral Analyst"
         return "Risky Analyst"
+
+    def should_continue_risk_round(self, state: AgentState) -> str:
+        """Determine if the parallel risk debate should run another round."""
+        risk_state = state["risk_debate_state"]
+        if risk_state["count"] >= 3 * self.max_risk_discuss_rounds:
+            return "Risk Judge"
+        if self._round_converged(
+            risk_state["count"],
+            ["Risky Analyst", "Safe Analyst", "Neutral Analyst"],
+            [
+                risk_state.get("risky_history", ""),
+                risk_state.get("safe_history", ""),
+                risk_state.get("neutral_history", ""),
+            ],
+        ):
+            return "Risk Judge"
+        return "Risk Debate Round"
@@ -0,0 +1,113 @@
+# TradingAgents/graph/convergence.py
+
+import math
+import re
+from collections import Counter, OrderedDict
+from threading import Lock
+from typing import Callable, List, Optional
+
+STOP_WORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "for", "with",
+    "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "these",
+    "those", "as", "at", "by", "from", "we", "you", "i", "our", "your", "their",
+    "they", "not", "no", "so", "if", "than", "then", "can", "could", "would",
+    "should", "will", "has", "have", "had", "do", "does", "more", "most", "also",
+}
+
+# Default "converged" similarity per method. Embedding cosines of same-topic
+# text already sit around 0.85, so only near-restatements should count there.
+THRESHOLDS = {"lexical": 0.85, "embedding": 0.95}
+
+
+def split_turns(history: str, speaker: str) -> List[str]:
+    """Split a speaker's history string into individual arguments."""
+    prefix = f"{speaker}:"
+    turns = re.split(rf"(?:^|\n){re.escape(prefix)}", history or "")
+    return [turn.strip() for turn in turns if turn.strip()]
+
+
+def _term_vector(text: str) -> Counter:
+    tokens = re.findall(r"[a-z0-9%$.]+", text.lower())
+    return Counter(token for token in tokens if token not in STOP_WORDS and len(token) > 1)
+
+
+def _cosine(a, b) -> float:
+    if isinstance(a, Counter):
+        dot = sum(count * b.get(term, 0) for term, count in a.items())
+        norm_a = math.sqrt(sum(v * v for v in a.values()))
+        norm_b = math.sqrt(sum(v * v for v in b.values()))
+    else:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm_a = math.sqrt(sum(x * x for x in a))
+        norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+class DebateConvergence:
+    """Scores how much debaters' positions still move between rounds.
+
+    Compares each speaker's latest argument with their previous one. By default
+    a bag-of-words cosine is used, which needs no API call; pass `embed_fn` to
+    score with embeddings instead. The two scales differ, so each method has
+    its own default threshold (`THRESHOLDS`).
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        embed_fn: Optional[Callable[[str], list]] = None,
+        cache_size: int = 64,
+    ):
+        """Initialize with the similarity threshold and optional embedding function."""
+        self.method = "embedding" if embed_fn is not None else "lexical"
+        self.threshold = threshold if threshold is not None else THRESHOLDS[self.method]
+        self.embed_fn = embed_fn
+        self.last_scores: List[float] = []  # per speaker, from the latest check
+        self.cache_size = cache_size
+        self.lock = Lock()
+        # Bounded LRU: the graph lives across runs, but an argument is only needed until the next round
+        self._embeddings: "OrderedDict[str, list]" = OrderedDict()
+
+    def _embed(self, text: str) -> list:
+        # Each argument is compared twice (as latest, then as previous), so embed it once
+        with self.lock:
+            if text in self._embeddings:
+                self._embeddings.move_to_end(text)
+                return self._embeddings[text]
+        embedding = self.embed_fn(text)
+        with self.lock:
+            self._embeddings[text] = embedding
+            while len(self._embeddings) > self.cache_size:
+                self._embeddings.popitem(last=False)
+        return embedding
+
+    def similarity(self, new_argument: str, previous_argument: str) -> float:
+        """Similarity between two arguments in [0, 1]."""
+        if self.embed_fn is not None:
+            try:
+                return _cosine(self._embed(new_argument), self._embed(previous_argument))
+            except Exception as e:
+                print(f"Embedding similarity failed, using lexical similarity: {e}")
+        return _cosine(_term_vector(new_argument), _term_vector(previous_argument))
+
+    def speaker_score(self, history: str, speaker: str) -> Optional[float]:
+        """Similarity of a speaker's last two arguments, or None if fewer than two."""
+        turns = split_turns(history, speaker)
+        if len(turns) < 2:
+            return None
+        return self.similarity(turns[-1], turns[-2])
+
+    def has_converged(self, histories: dict) -> bool:
+        """True when every speaker's latest argument repeats their previous one.
+
+        Args:
+            histories: mapping of speaker name (e.g. "Bull Analyst") to that
+                speaker's history string
+        """
+        scores = [self.speaker_score(history, speaker) for speaker, history in histories.items()]
+        if not scores or any(score is None for score in scores):
+            return False
+        self.last_scores = scores
+        return min(scores) >= self.threshold
@@ -0,0 +1,285 @@
+# TradingAgents/graph/profiler.py
+
+import time
+import threading
+from typing import Dict, Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "o4-mini": (1.10, 4.40),
+    "o3-mini": (1.10, 4.40),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# Internal LangGraph/LangChain runs that are not agent nodes
+IGNORED_NODES = {"LangGraph", "__start__", "branches", "RunnableSequence"}
+
+
+def _empty_node_stats() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "wall_time": 0.0,
+        "llm_calls": 0,
+        "queue_time": 0.0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost": 0.0,
+        "retries": 0,
+        "errors": 0,
+    }
+
+
+def _empty_tool_stats() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "wall_time": 0.0,
+        "output_chars": 0,
+        "errors": 0,
+    }
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate USD cost of an LLM call from its token usage."""
+    if not model_name:
+        return 0.0
+    # Provider model names may carry a date suffix (e.g. gpt-4o-mini-2024-07-18)
+    for name in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model_name.startswith(name):
+            prompt_price, completion_price = MODEL_PRICING[name]
+            return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+    return 0.0
+
+
+class GraphProfiler(BaseCallbackHandler):
+    """Records per-node and per-tool timing and token usage for a graph run.
+
+    Per node it tracks wall time, queue time (time from sending an LLM request
+    until the first streamed token, or the full call when not streaming),
+    prompt/completion tokens reported in the provider usage metadata, cost,
+    retries and errors. Pass an instance in the graph `callbacks` config and read
+    `summary()` once the run has finished.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.tools: Dict[str, Dict[str, Any]] = {}
+        self.run_start: Optional[float] = None
+        self.run_end: Optional[float] = None
+        self._run_nodes: Dict[UUID, str] = {}
+        self._node_runs: Dict[UUID, tuple] = {}
+        self._llm_runs: Dict[UUID, Dict[str, Any]] = {}
+        self._tool_runs: Dict[UUID, tuple] = {}
+        self._root_run_id: Optional[UUID] = None
+
+    def _node_for(self, run_id, parent_run_id=None, metadata=None) -> str:
+        """Resolve the graph node a run belongs to."""
+        node = (metadata or {}).get("langgraph_node", "")
+        if not node:
+            node = self._run_nodes.get(run_id) or self._run_nodes.get(parent_run_id, "")
+        if node:
+            self._run_nodes[run_id] = node
+        return node
+
+    def _node_stats(self, node: str) -> Dict[str, Any]:
+        if node not in self.nodes:
+            self.nodes[node] = _empty_node_stats()
+        return self.nodes[node]
+
+    # Chain (graph node) callbacks
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        now = time.perf_counter()
+        with self.lock:
+            if parent_run_id is None and self._root_run_id is None:
+                self._root_run_id = run_id
+                self.run_start = now
+            node = self._node_for(run_id, parent_run_id, metadata)
+            name = kwargs.get("name") or (serialized or {}).get("name", "")
+            # The node's own run carries its name; nested chains inside the node do not
+            if node and name == node and node not in IGNORED_NODES:
+                self._node_runs[run_id] = (node, now)
+
+    def _finish_chain(self, run_id, failed=False):
+        now = time.perf_counter()
+        with self.lock:
+            if run_id == self._root_run_id:
+                self.run_end = now
+            entry = self._node_runs.pop(run_id, None)
+            if entry is None:
+                return
+            node, start = entry
+            stats = self._node_stats(node)
+            stats["calls"] += 1
+            stats["wall_time"] += now - start
+            if failed:
+                stats["errors"] += 1
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_chain(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish_chain(run_id, failed=True)
+
+    # LLM callbacks
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        with self.lock:
+            node = self._node_for(run_id, parent_run_id, metadata)
+            self._llm_runs[run_id] = {
+                "node": node,
+                "start": time.perf_counter(),
+                "first_token": None,
+            }
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id, parent_run_id=parent_run_id, metadata=metadata, **kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        with self.lock:
+            entry = self._llm_runs.get(run_id)
+            if entry is not None and entry["first_token"] is None:
+                entry["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        now = time.perf_counter()
+        prompt_tokens, completion_tokens, model_name = self._extract_usage(response)
+        with self.lock:
+            entry = self._llm_runs.pop(run_id, None)
+            if entry is None:
+                return
+            stats = self._node_stats(entry["node"] or "Unknown")
+            first_token = entry["first_token"] or now
+            stats["llm_calls"] += 1
+            stats["queue_time"] += first_token - entry["start"]
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost"] += estimate_cost(model_name, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self.lock:
+            entry = self._llm_runs.pop(run_id, None)
+            if entry is not None:
+                self._node_stats(entry["node"] or "Unknown")["errors"] += 1
+
+    def on_retry(self, retry_state, *, run_id, parent_run_id=None, **kwargs):
+        with self.lock:
+            node = self._node_for(run_id, parent_run_id)
+            self._node_stats(node or "Unknown")["retries"] += 1
+
+    @staticmethod
+    def _extract_usage(response: LLMResult):
+        """Pull token counts and model name from provider usage metadata."""
+        llm_output = response.llm_output or {}
+        usage = llm_output.get("token_usage") or llm_output.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0) or usage.get("input_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0) or usage.get("output_tokens", 0)
+        model_name = llm_output.get("model_name", "") or llm_output.get("model", "")
+
+        if not (prompt_tokens or completion_tokens) or not model_name:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is None:
+                        continue
+                    usage_metadata = getattr(message, "usage_metadata", None)
+                    if usage_metadata and not (prompt_tokens or completion_tokens):
+                        prompt_tokens += usage_metadata.get("input_tokens", 0)
+                        completion_tokens += usage_metadata.get("output_tokens", 0)
+                    if not model_name:
+                        response_metadata = getattr(message, "response_metadata", {}) or {}
+                        model_name = response_metadata.get("model_name", "") or response_metadata.get("model", "")
+
+        return prompt_tokens, completion_tokens, model_name
+
+    # Tool callbacks
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        with self.lock:
+            self._node_for(run_id, parent_run_id, metadata)
+            name = kwargs.get("name") or (serialized or {}).get("name", "Unknown Tool")
+            self._tool_runs[run_id] = (name, time.perf_counter())
+
+    def _finish_tool(self, run_id, output=None, failed=False):
+        now = time.perf_counter()
+        with self.lock:
+            entry = self._tool_runs.pop(run_id, None)
+            if entry is None:
+                return
+            name, start = entry
+            if name not in self.tools:
+                self.tools[name] = _empty_tool_stats()
+            stats = self.tools[name]
+            stats["calls"] += 1
+            stats["wall_time"] += now - start
+            if output is not None:
+                stats["output_chars"] += len(str(getattr(output, "content", output)))
+            if failed:
+                stats["errors"] += 1
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish_tool(run_id, output=output)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id, failed=True)
+
+    # Reporting
+
+    def total_cost(self) -> float:
+        """Estimated USD cost of all LLM calls recorded so far."""
+        with self.lock:
+            return sum(stats["cost"] for stats in self.nodes.values())
+
+    def summary(self, top_n: int = 3) -> Dict[str, Any]:
+        """Return a JSON-serializable summary of the run."""
+        with self.lock:
+            nodes = {name: dict(stats) for name, stats in self.nodes.items()}
+            tools = {name: dict(stats) for name, stats in self.tools.items()}
+            end = self.run_end or time.perf_counter()
+            total_wall_time = end - self.run_start if self.run_start else 0.0
+
+        for stats in list(nodes.values()) + list(tools.values()):
+            for key, value in stats.items():
+                if isinstance(value, float):
+                    stats[key] = round(value, 6 if key == "cost" else 3)
+
+        return {
+            "total_wall_time": round(total_wall_time, 3),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in nodes.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in nodes.values()),
+            "cost": round(sum(s["cost"] for s in nodes.values()), 6),
+            "nodes": nodes,
+            "tools": tools,
+            "latency_hot_spots": sorted(nodes, key=lambda n: nodes[n]["wall_time"], reverse=True)[:top_n],
+            "cost_hot_spots": sorted(nodes, key=lambda n: nodes[n]["cost"], reverse=True)[:top_n],
+        }
+
+    def format_summary(self, top_n: int = 3) -> str:
+        """Render the summary as plain text lines for logs and the CLI."""
+        summary = self.summary(top_n)
+        lines = [
+            f"Run time: {summary['total_wall_time']:.1f}s | "
+            f"Tokens: {summary['prompt_tokens']} prompt / {summary['completion_tokens']} completion | "
+            f"Est. cost: ${summary['cost']:.4f}"
+        ]
+        for name in sorted(summary["nodes"], key=lambda n: summary["nodes"][n]["wall_time"], reverse=True):
+            stats = summary["nodes"][name]
+            lines.append(
+                f"  {name}: {stats['wall_time']:.1f}s wall, {stats['queue_time']:.1f}s queue, "
+                f"{stats['prompt_tokens']}/{stats['completion_tokens']} tok, ${stats['cost']:.4f}, "
+                f"{stats['retries']} retries"
+            )
+        for name in sorted(summary["tools"], key=lambda n: summary["tools"][n]["wall_time"], reverse=True):
+            stats = summary["tools"][name]
+            lines.append(
+                f"  [Tool] {name}: {stats['calls']} calls, {stats['wall_time']:.1f}s, {stats['output_chars']} chars"
+            )
+        return "\n".join(lines)
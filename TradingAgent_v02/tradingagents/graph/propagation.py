@@ -1,6 +1,6 @@
 # TradingAgents/graph/propagation.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from tradingagents.agents.utils.agent_states import (
     AgentState,
     InvestDebateState,
@@ -25,7 +25,13 @@ class Propagator:
             "trade_date": str(trade_date),
             "user_profile": user_profile,
             "investment_debate_state": InvestDebateState(
-                {"history": "", "current_response": "", "count": 0}
+                {
+                    "history": "",
+                    "current_response": "",
+                    "count": 0,
+                    "history_summary": "",
+                    "recent_turns": [],
+                }
             ),
             "risk_debate_state": RiskDebateState(
                 {
@@ -34,6 +40,8 @@ class Propagator:
                     "current_safe_response": "",
                     "current_neutral_response": "",
                     "count": 0,
+                    "history_summary": "",
+                    "recent_turns": [],
                 }
             ),
             "market_report": "",
@@ -42,9 +50,16 @@ class Propagator:
             "news_report": "",
         }
 
-    def get_graph_args(self) -> Dict[str, Any]:
+    def get_graph_args(
+        self, callbacks: Optional[List[Any]] = None, thread_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get arguments for the graph invocation."""
+        config = {"recursion_limit": self.max_recur_limit}
+        if callbacks:
+            config["callbacks"] = callbacks
+        if thread_id:
+            config["configurable"] = {"thread_id": thread_id}
         return {
             "stream_mode": "values",
-            "config": {"recursion_limit": self.max_recur_limit},
+            "config": config,
         }
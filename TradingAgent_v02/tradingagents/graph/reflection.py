@@ -1,6 +1,6 @@
 # TradingAgents/graph/reflection.py
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from langchain_openai import ChatOpenAI
 
 
@@ -59,7 +59,14 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
         self, component_type: str, report: str, situation: str, returns_losses
     ) -> str:
         """Generate reflection for a component."""
-        messages = [
+        messages = self._reflection_messages(report, situation, returns_losses)
+
+        result = self.quick_thinking_llm.invoke(messages).content
+        return result
+
+    def _reflection_messages(self, report: str, situation: str, returns_losses) -> list:
+        """Build the reflection prompt for one component."""
+        return [
             ("system", self.reflection_system_prompt),
             (
                 "human",
@@ -67,8 +74,57 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
             ),
         ]
 
-        result = self.quick_thinking_llm.invoke(messages).content
-        return result
+    def reflect_batch(
+        self,
+        states_and_returns: List[Tuple[Dict[str, Any], Any]],
+        memories: Dict[str, Any],
+        max_concurrency: int = 5,
+    ):
+        """Reflect on every component for one or more past runs in a single batch.
+
+        Args:
+            states_and_returns: list of (final_state, returns_losses) pairs, e.g. a whole backtest
+            memories: memory per component, keyed "bull", "bear", "trader", "invest_judge", "risk_manager"
+            max_concurrency: upper bound on concurrent reflection LLM calls
+        """
+        components = {
+            "bull": lambda state: state["investment_debate_state"]["bull_history"],
+            "bear": lambda state: state["investment_debate_state"]["bear_history"],
+            "trader": lambda state: state["trader_investment_plan"],
+            "invest_judge": lambda state: state["investment_debate_state"]["judge_decision"],
+            "risk_manager": lambda state: state["risk_debate_state"]["judge_decision"],
+        }
+
+        jobs = []
+        for current_state, returns_losses in states_and_returns:
+            situation = self._extract_current_situation(current_state)
+            for key, get_report in components.items():
+                if key in memories:
+                    jobs.append((key, situation, get_report(current_state), returns_losses))
+        if not jobs:
+            return
+
+        # All reflection prompts run concurrently instead of one blocking call each
+        responses = self.quick_thinking_llm.batch(
+            [self._reflection_messages(report, situation, returns) for _, situation, report, returns in jobs],
+            config={"max_concurrency": max_concurrency},
+        )
+
+        # Every memory uses the same embedding model, so embed each situation once
+        situations = list(dict.fromkeys(situation for _, situation, _, _ in jobs))
+        embedder = next(iter(memories.values()))
+        embedding_by_situation = dict(zip(situations, embedder.get_embeddings(situations)))
+
+        for key, memory in memories.items():
+            entries = [
+                (situation, response.content)
+                for (job_key, situation, _, _), response in zip(jobs, responses)
+                if job_key == key
+            ]
+            memory.add_situations(
+                entries,
+                embeddings=[embedding_by_situation[situation] for situation, _ in entries],
+            )
 
     def reflect_bull_researcher(self, current_state, returns_losses, bull_memory):
         """Reflect on bull researcher's analysis and update memory."""
@@ -1,6 +1,7 @@
 # TradingAgents/graph/trading_graph.py
 
 import os
+import uuid
 from pathlib import Path
 import json
 from datetime import date
@@ -21,6 +22,7 @@ from tradingagents.agents.utils.agent_states import (
     RiskDebateState,
 )
 from tradingagents.dataflows.config import set_config
+from tradingagents.dataflows.interface import prefetch_market_data
 
 # Import the new abstract tool methods from agent_utils
 from tradingagents.agents.utils.agent_utils import (
@@ -41,10 +43,13 @@ from tradingagents.agents.utils.macro_tools import (
 )
 
 from .conditional_logic import ConditionalLogic
+from .convergence import DebateConvergence
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .profiler import GraphProfiler
+from .checkpointing import create_checkpointer, thread_id_for, touch_thread, delete_thread, expire_checkpoints
 
 
 class TradingAgentsGraph:
@@ -77,8 +82,8 @@ class TradingAgentsGraph:
 
         # Initialize LLMs
         if self.config["llm_provider"].lower() == "openai" or self.config["llm_provider"] == "ollama" or self.config["llm_provider"] == "openrouter":
-            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], streaming=True)
-            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], streaming=True)
+            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], streaming=True, stream_usage=True)
+            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], streaming=True, stream_usage=True)
         elif self.config["llm_provider"].lower() == "anthropic":
             self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
@@ -99,7 +104,20 @@ class TradingAgentsGraph:
         self.tool_nodes = self._create_tool_nodes()
 
         # Initialize components
-        self.conditional_logic = ConditionalLogic()
+        convergence = None
+        if self.config.get("debate_early_stop", False):
+            method = self.config.get("debate_convergence_method", "lexical")
+            embed_fn = self.bull_memory.get_embedding if method == "embedding" else None
+            convergence = DebateConvergence(
+                threshold=self.config.get(f"debate_convergence_threshold_{method}"),
+                embed_fn=embed_fn,
+            )
+        self.conditional_logic = ConditionalLogic(
+            max_debate_rounds=self.config["max_debate_rounds"],
+            max_risk_discuss_rounds=self.config["max_risk_discuss_rounds"],
+            convergence=convergence,
+            min_debate_rounds=self.config.get("min_debate_rounds", 1),
+        )
         self.graph_setup = GraphSetup(
             self.quick_thinking_llm,
             self.deep_thinking_llm,
@@ -110,6 +128,7 @@ class TradingAgentsGraph:
             self.invest_judge_memory,
             self.risk_manager_memory,
             self.conditional_logic,
+            self.config,
         )
 
         self.propagator = Propagator()
@@ -118,11 +137,15 @@ class TradingAgentsGraph:
 
         # State tracking
         self.curr_state = None
+        self.profiler = None
         self.ticker = None
+        self.thread_id = None
+        self.session_id = None
         self.log_states_dict = {}  # date to full state dict
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.checkpointer = create_checkpointer(self.config)
+        self.graph = self.graph_setup.setup_graph(selected_analysts, checkpointer=self.checkpointer)
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources using abstract methods."""
@@ -163,16 +186,74 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def prefetch(self, tickers):
+        """Warm the local price store for a ticker universe in one batched download."""
+        return prefetch_market_data(tickers)
+
+    def propagate(self, company_name, trade_date, callbacks=None, user_profile="", session_id=None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Extra `callbacks` (e.g. progress reporters) run alongside the profiler.
+        With checkpointing on, calling again with the session_id of a run that
+        was interrupted resumes it after its last completed node, and a finished
+        run returns its saved final state. Without a session_id every call is a
+        fresh run whose checkpoints are deleted once it ends, since nothing
+        could resume it.
+        """
 
         self.ticker = company_name
+        self.session_id = session_id or uuid.uuid4().hex
+        self.thread_id = thread_id_for(company_name, trade_date, self.session_id) if self.checkpointer else None
 
-        # Initialize state
+        # Initialize state, or resume from the last checkpoint of this thread
         init_agent_state = self.propagator.create_initial_state(
-            company_name, trade_date
+            company_name, trade_date, user_profile
+        )
+        if self.thread_id:
+            saved = self.graph.get_state({"configurable": {"thread_id": self.thread_id}})
+            if saved.values:
+                if not saved.next:
+                    self.profiler = None
+                    return self._finish(trade_date, dict(saved.values))
+                print(f"Resuming {self.thread_id} at {list(saved.next)}")
+                init_agent_state = None
+
+        try:
+            return self._run(trade_date, init_agent_state, self.thread_id, callbacks)
+        finally:
+            if self.thread_id and session_id is None:
+                delete_thread(self.checkpointer, self.thread_id)
+
+    def rerun_from(self, node, company_name, trade_date, callbacks=None, session_id=None):
+        """Redo `node` and everything downstream of it, reusing earlier outputs.
+
+        Forks the run saved for (ticker, date, session_id) at the checkpoint
+        taken just before `node` last ran, e.g. to regenerate the Risk Judge
+        after changing its prompt without rerunning the analysts.
+        """
+        if not self.checkpointer:
+            raise ValueError("rerun_from needs checkpointing enabled")
+        self.ticker = company_name
+        self.thread_id = thread_id_for(company_name, trade_date, session_id)
+
+        thread = {"configurable": {"thread_id": self.thread_id}}
+        fork = next(
+            (snapshot for snapshot in self.graph.get_state_history(thread) if node in snapshot.next),
+            None,
         )
-        args = self.propagator.get_graph_args()
+        if fork is None:
+            raise ValueError(f"No checkpoint before node '{node}' for {self.thread_id}")
+        return self._run(trade_date, None, fork.config["configurable"], callbacks)
+
+    def _run(self, trade_date, init_agent_state, configurable, callbacks=None):
+        """Invoke the graph (from a checkpoint when `init_agent_state` is None)."""
+        self.profiler = GraphProfiler()
+        args = self.propagator.get_graph_args(callbacks=[self.profiler] + list(callbacks or []))
+        if configurable:
+            if isinstance(configurable, str):
+                configurable = {"thread_id": configurable}
+            args["config"]["configurable"] = configurable
+            touch_thread(self.checkpointer, configurable["thread_id"])
 
         if self.debug:
             # Debug mode with tracing
@@ -189,6 +270,18 @@ class TradingAgentsGraph:
             # Standard mode without tracing
             final_state = self.graph.invoke(init_agent_state, **args)
 
+        return self._finish(trade_date, final_state)
+
+    def _finish(self, trade_date, final_state):
+        if self.thread_id:
+            # Kept for resume/rerun until idle for `checkpoint_ttl`
+            touch_thread(self.checkpointer, self.thread_id)
+            expire_checkpoints(self.checkpointer, self.config.get("checkpoint_ttl", 7 * 86400))
+
+        # Attach per-node timing and token usage
+        if self.profiler is not None:
+            final_state["run_profile"] = self.profiler.summary()
+
         # Store current state for reflection
         self.curr_state = final_state
 
@@ -228,6 +321,7 @@ class TradingAgentsGraph:
             },
             "investment_plan": final_state["investment_plan"],
             "final_trade_decision": final_state["final_trade_decision"],
+            "run_profile": final_state.get("run_profile", {}),
         }
 
         # Save to file
@@ -242,6 +336,10 @@ class TradingAgentsGraph:
 
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
+        if self.config.get("batch_reflection", True):
+            self.reflect_and_remember_batch([(self.curr_state, returns_losses)])
+            return
+
         self.reflector.reflect_bull_researcher(
             self.curr_state, returns_losses, self.bull_memory
         )
@@ -258,6 +356,20 @@ class TradingAgentsGraph:
             self.curr_state, returns_losses, self.risk_manager_memory
         )
 
+    def reflect_and_remember_batch(self, states_and_returns):
+        """Reflect on a list of (final_state, returns_losses) pairs, e.g. a whole backtest, in one batch."""
+        self.reflector.reflect_batch(
+            states_and_returns,
+            {
+                "bull": self.bull_memory,
+                "bear": self.bear_memory,
+                "trader": self.trader_memory,
+                "invest_judge": self.invest_judge_memory,
+                "risk_manager": self.risk_manager_memory,
+            },
+            max_concurrency=self.config.get("reflection_max_concurrency", 5),
+        )
+
     def process_signal(self, full_signal):
         """Process a signal to extract the core decision."""
         return self.signal_processor.process_signal(full_signal)
@@ -6,18 +6,19 @@ load_dotenv()
 import os
 import json
 import asyncio
-import yfinance as yf
 from fastapi import FastAPI, Request, Form, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime, timedelta
 
 # Import TradingAgents components
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.dataflows.forward_returns import forward_return_evaluator
+from tradingagents.dataflows.interface import prefetch_market_data
+from tradingagents.dataflows.peer_index import peer_index
 
 app = FastAPI()
 
@@ -30,54 +31,297 @@ templates = Jinja2Templates(directory="templates")
 class AnalysisRequest(BaseModel):
     ticker: str
     date: str
+    user: str = "default"
+    priority: int = 5  # lower runs first
+    mode: str = "deep"
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+# --- Analysis Jobs ---
+import re
+import time
+from datetime import datetime
+from langchain_core.outputs import LLMResult
+from tradingagents.graph.profiler import GraphProfiler
+from tradingagents.agents.utils.job_queue import job_queue, QueueFullError, FINISHED, dedupe_key
+from tradingagents.agents.utils.event_channel import EventChannel
+from tradingagents.agents.utils.session_log import session_store
+
+STREAM_CHUNK_INTERVAL = 0.25  # seconds between token-driven cost updates
+
+STEP_MAP = {
+    "Market Analyst": "Market Research (시장 조사)",
+    "News Analyst": "News Analysis (뉴스 분석)",
+    "Social Analyst": "Social Analysis (소셜 분석)",
+    "Fundamentals Analyst": "Fundamentals (기본적 분석)",
+    "Report Compactor": "Report Compaction (보고서 요약)",
+    "Bull Researcher": "Debate (토론 - Bull)",
+    "Bear Researcher": "Debate (토론 - Bear)",
+    "Research Manager": "Debate (토론 - Manager)",
+    "Risky Analyst": "Risk Assessment (리스크 평가 - Risky)",
+    "Safe Analyst": "Risk Assessment (리스크 평가 - Safe)",
+    "Neutral Analyst": "Risk Assessment (리스크 평가 - Neutral)",
+    "Risk Debate Round": "Risk Assessment (리스크 평가 - Round)",
+    "Risk Judge": "Risk Assessment (리스크 평가 - Judge)",
+    "Trader": "Final Decision (최종 결정)"
+}
+
+
+class JobProgressCallback(GraphProfiler):
+    """Publishes progress, tool logs and running cost as job events."""
+
+    def __init__(self, emit):
+        super().__init__()
+        self.emit = emit
+        self.current_step = ""
+        self.last_chunk_at = 0.0
+
+    def on_chain_start(self, serialized, inputs, **kwargs):
+        super().on_chain_start(serialized, inputs, **kwargs)
+        # LangGraph passes the node name in metadata
+        node_name = (kwargs.get("metadata") or {}).get("langgraph_node", "")
+        new_step = STEP_MAP.get(node_name)
+        if new_step and new_step != self.current_step:
+            self.current_step = new_step
+            self.emit({"type": "progress", "step": new_step})
+            self.emit({"type": "log", "message": f"\n=== {new_step} ==="})
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        super().on_llm_new_token(token, **kwargs)
+        # Tokens only move the cost meter; publish it a few times a second
+        now = time.monotonic()
+        if now - self.last_chunk_at >= STREAM_CHUNK_INTERVAL:
+            self.last_chunk_at = now
+            self.emit({"type": "stream_chunk", "cost": self.total_cost()})
+
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        # Cost comes from the provider's reported token usage
+        super().on_llm_end(response, **kwargs)
+        self.emit({"type": "stream_chunk", "cost": self.total_cost()})
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        super().on_tool_start(serialized, input_str, **kwargs)
+        tool_name = (serialized or {}).get("name", "Unknown Tool")
+        self.emit({"type": "log", "message": f"[Tool] Executing {tool_name}..."})
+
+    def on_tool_end(self, output, **kwargs):
+        super().on_tool_end(output, **kwargs)
+        self.emit({"type": "log", "message": "[Tool] Finished."})
+
+
+def run_analysis_job(job, emit) -> dict:
+    """Worker-side analysis; runs on a job queue thread, off the event loop.
+
+    The job id is the checkpoint session, so a job requeued after a crash
+    resumes after its last completed node. "rerun" jobs redo one node and
+    everything downstream of it in an earlier job's session.
+    """
+    ticker = job.payload["ticker"].upper()
+    date_str = job.payload["date"]
+    config = DEFAULT_CONFIG.copy()
+    if job.payload.get("mode", "deep").lower() == "quick":
+        config["deep_think_llm"] = "gpt-4o-mini"
+
+    ta = TradingAgentsGraph(debug=False, config=config)
+    callback = JobProgressCallback(emit)
+    session_id = job.payload.get("session") or job.id
+    if job.kind == "rerun":
+        emit({"type": "log", "message": f"\n[System] Rerunning {ticker} from {job.payload['node']}..."})
+        final_state, decision = ta.rerun_from(
+            job.payload["node"], ticker, date_str, callbacks=[callback], session_id=session_id
+        )
+    else:
+        emit({"type": "log", "message": f"\n[System] Starting analysis for {ticker}..."})
+        final_state, decision = ta.propagate(
+            ticker, date_str, callbacks=[callback], user_profile=job.payload.get("profile", ""),
+            session_id=session_id,
+        )
+    emit({"type": "log", "message": f"\n[Profile] {ticker}\n{callback.format_summary()}"})
+    if config.get("peer_report_embeddings"):
+        try:
+            peer_index.add_report(ticker, final_state.get("fundamentals_report", ""))
+        except Exception as e:
+            print(f"Report embedding failed for {ticker}: {e}")
+
+    raw_decision = final_state.get("final_trade_decision", "HOLD")
+    conf_match = re.search(r"Confidence:\s*(\w+)", raw_decision, re.IGNORECASE)
+    return {
+        "status": "success",
+        "ticker": ticker,
+        "date": date_str,
+        "session": session_id,
+        "decision": decision,
+        "confidence": conf_match.group(1).upper() if conf_match else "Medium",
+        "reasoning": raw_decision,
+        "report": final_state.get("trader_investment_plan", "No report available."),
+        "accuracy": calculate_accuracy(ticker, date_str, decision),
+        "profile": final_state.get("run_profile", {}),
+        "full_state": {
+            "sentiment": final_state.get("sentiment_report", ""),
+            "fundamentals": final_state.get("fundamentals_report", ""),
+            "technical": final_state.get("market_report", ""),
+            "risk": final_state.get("risk_debate_state", {}).get("judge_decision", "")
+        }
+    }
+
+
+def submit_analysis(ticker: str, date_str: str, mode: str = "deep", user: str = "default", priority: int = 5):
+    """Queue an analysis with the user's current profile, sharing any identical run in flight or cached.
+
+    Identical means same ticker, date, mode and profile content, so users
+    with the same preferences share runs, and editing a profile changes its
+    fingerprint so older results stop being reused. Finished results are
+    reused for `analysis_cache_ttl` seconds, but only for past dates, whose
+    inputs no longer change.
+    """
+    profile = profile_manager.load_profile(user)
+    payload = {
+        "ticker": ticker.upper(),
+        "date": date_str,
+        "mode": mode.lower(),
+        "profile": profile.summary,
+    }
+    key = dedupe_key("analyze", {**payload, "profile": profile.fingerprint})
+    is_past = date_str < datetime.now().strftime("%Y-%m-%d")
+    cache_ttl = DEFAULT_CONFIG.get("analysis_cache_ttl", 0) if is_past else 0
+    return job_queue.submit("analyze", payload, user=user, priority=priority, dedupe_key=key, cache_ttl=cache_ttl)
+
+
+def open_channel(websocket: WebSocket, compress: bool = False) -> EventChannel:
+    """Coalescing, backpressured event channel for one websocket session."""
+    return EventChannel(
+        websocket,
+        window=DEFAULT_CONFIG.get("ws_frame_window_ms", 50) / 1000,
+        max_pending=DEFAULT_CONFIG.get("ws_max_pending_events", 500),
+        compress=compress,
+    ).start()
+
+
+async def stream_job(job_id: str, send):
+    """Forward a job's events to `send` until it finishes; returns the finished job."""
+    events = job_queue.subscribe(job_id, asyncio.get_running_loop())
+    try:
+        job = job_queue.get(job_id)
+        while job is not None and job.status not in FINISHED:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=15)
+            except asyncio.TimeoutError:
+                job = job_queue.get(job_id)
+                continue
+            await send(event)
+            if event.get("type") == "status" and event.get("status") in FINISHED:
+                job = job_queue.get(job_id)
+        return job
+    finally:
+        job_queue.unsubscribe(job_id, events)
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.register("analyze", run_analysis_job)
+    job_queue.register("rerun", run_analysis_job)
+    job_queue.start()
+    # Build the peer index in the background so the first lookup is instant
+    asyncio.get_running_loop().run_in_executor(None, peer_index.build)
+
+
 @app.post("/analyze")
 async def analyze_stock(request: AnalysisRequest):
-    # Backward compatibility or fallback
-    ticker = request.ticker.upper()
-    date_str = request.date
+    """Queue an analysis; poll /api/jobs/{job_id} or stream /ws/jobs/{job_id}."""
     try:
-        ta = TradingAgentsGraph(debug=False, config=DEFAULT_CONFIG.copy())
-        final_state, decision = ta.propagate(ticker, date_str)
-        accuracy_info = calculate_accuracy(ticker, date_str, decision)
-        return JSONResponse(content={
-            "status": "success",
-            "ticker": ticker,
-            "date": date_str,
-            "decision": decision,
-            "report": final_state.get("trader_investment_plan", "No report available."),
-            "accuracy": accuracy_info,
-            "full_state": {
-                "sentiment": final_state.get("sentiment_report", ""),
-                "fundamentals": final_state.get("fundamentals_report", ""),
-                "technical": final_state.get("market_report", ""),
-                "risk": final_state.get("risk_debate_state", {}).get("judge_decision", "")
-            }
-        })
-    except Exception as e:
-        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+        job = submit_analysis(request.ticker, request.date, request.mode, request.user, request.priority)
+    except QueueFullError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=429)
+    return JSONResponse(content={"status": job.status, "job_id": job.id}, status_code=202)
+
+
+@app.get("/api/jobs")
+async def list_jobs(user: Optional[str] = None, limit: int = 50):
+    return [job.to_dict() for job in job_queue.list_jobs(user, limit)]
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": "Unknown job"}, status_code=404)
+    return job.to_dict()
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    if not job_queue.cancel(job_id):
+        return JSONResponse(content={"status": "error", "message": "Job is not queued"}, status_code=409)
+    return {"status": "cancelled", "job_id": job_id}
+
+
+@app.get("/api/peers/{ticker}")
+async def get_peers(ticker: str, k: int = 5, user: str = "default"):
+    """Most similar tickers from the local peer index, filtered by the user's profile."""
+    profile = profile_manager.load_profile(user)
+    peers = await asyncio.to_thread(peer_index.peers, ticker, k, profile.avoid_sectors, profile.favorite_sectors)
+    return {"ticker": ticker.upper(), "peers": peers}
+
+
+class RerunRequest(BaseModel):
+    node: str  # graph node name, e.g. "Risk Judge"
+    priority: int = 5
+
+
+@app.post("/api/jobs/{job_id}/rerun")
+async def rerun_job(job_id: str, request: RerunRequest):
+    """Redo `node` and the stages after it, reusing the job's earlier outputs."""
+    source = job_queue.get(job_id)
+    if source is None or source.kind not in ("analyze", "rerun"):
+        return JSONResponse(content={"status": "error", "message": "Unknown analysis job"}, status_code=404)
+    payload = {**source.payload, "node": request.node, "session": source.payload.get("session") or source.id}
+    try:
+        job = job_queue.submit("rerun", payload, user=source.user, priority=request.priority)
+    except QueueFullError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=429)
+    return JSONResponse(content={"status": job.status, "job_id": job.id}, status_code=202)
+
+
+@app.websocket("/ws/jobs/{job_id}")
+async def job_events(websocket: WebSocket, job_id: str):
+    """Stream a job's status and progress events, ending with its result."""
+    await websocket.accept()
+    channel = open_channel(websocket, websocket.query_params.get("compress") == "1")
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            await channel.send({"type": "error", "message": "Unknown job"})
+            return
+        await channel.send({"type": "status", "job_id": job_id, "status": job.status})
+        job = await stream_job(job_id, channel.send)
+        await channel.send({"type": "result", **job.to_dict()})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await channel.close()
+        await websocket.close()
 
 # --- Profile API ---
 from tradingagents.agents.utils.user_profile import profile_manager
 
 class ProfileUpdate(BaseModel):
     text: str
+    user: str = "default"
 
 @app.get("/api/profile")
-async def get_profile():
-    """Get current user investment profile"""
-    profile = profile_manager.load_profile()
-    return profile.model_dump()
+async def get_profile(user: str = "default"):
+    """Get a user's investment profile"""
+    profile, version = profile_manager.load_versioned(user)
+    return {**profile.model_dump(), "version": version}
 
 @app.post("/api/profile")
 async def update_profile(update: ProfileUpdate):
     """Update profile based on natural language input"""
-    updated_profile = profile_manager.update_profile_from_text(update.text)
-    return updated_profile.model_dump()
+    # The LLM call blocks; keep it off the event loop
+    updated_profile = await asyncio.to_thread(profile_manager.update_profile_from_text, update.text, update.user)
+    return {**updated_profile.model_dump(), "version": profile_manager.version(update.user)}
 
 # --- Trade Execution API ---
 from tradingagents.agents.utils.portfolio_manager import portfolio_manager
@@ -89,261 +333,187 @@ class TradeRequest(BaseModel):
     reason: str
     action: str = "BUY"
     exchange: str = "NASD"
+    user: str = "default"
 
 @app.post("/api/execute_trade")
 async def execute_trade(req: TradeRequest):
     print(f"DEBUG: Trade Request Received: {req}")
-    result = portfolio_manager.judge_and_execute(req.ticker, req.price, req.confidence, req.reason, action=req.action, exchange_cd=req.exchange)
+    # Broker calls block (and the KIS rate limiter sleeps); keep them off the event loop
+    result = await asyncio.to_thread(
+        portfolio_manager.judge_and_execute, req.ticker, req.price, req.confidence, req.reason,
+        action=req.action, exchange_cd=req.exchange, user=req.user,
+    )
     return result
 
 
-@app.websocket("/ws/analyze")
-async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        data = await websocket.receive_text()
-        request_data = json.loads(data)
-        ticker = request_data.get("ticker", "").upper()
-        date_str = request_data.get("date", "")
-        # Default to 'deep' if not provided
-        analysis_mode = request_data.get("mode", "deep").lower() 
-        
-        if not ticker or not date_str:
-            await websocket.send_json({"type": "error", "message": "Missing ticker or date (티커 또는 날짜 누락)"})
-            return
+async def run_session(session, request_data: dict):
+    """Run a full analysis session (primary ticker, then recommendations).
 
+    Events go to the session's ring log rather than a socket, so the run
+    carries on when the client disconnects and can be rejoined later.
+    """
+    send = session.append
+    ticker = request_data.get("ticker", "").upper()
+    date_str = request_data.get("date", "")
+    # Default to 'deep' if not provided
+    analysis_mode = request_data.get("mode", "deep").lower()
+    try:
         mode_msg = "⚡ Quick Mode (Speed/Cost)" if analysis_mode == "quick" else "🧠 Deep Mode (Precision)"
-        await websocket.send_json({"type": "log", "message": f"Initializing analysis for {ticker} on {date_str} [{mode_msg}]..."})
+        await send({"type": "log", "message": f"Initializing analysis for {ticker} on {date_str} [{mode_msg}]..."})
 
-        # --- Callback Definition ---
-        from langchain_core.callbacks import BaseCallbackHandler
-        from langchain_core.outputs import LLMResult
-        
-        class WebSocketCallback(BaseCallbackHandler):
-            def __init__(self, ws):
-                self.ws = ws
-                self.cost = 0.0
-                self.current_step = ""
-                self.loop = asyncio.get_running_loop()
-            
-            def _send_json(self, data):
-                asyncio.run_coroutine_threadsafe(self.ws.send_json(data), self.loop)
-
-            def on_chain_start(self, serialized, inputs, **kwargs):
-                # LangGraph usually passes node name in metadata
-                node_name = kwargs.get("metadata", {}).get("langgraph_node", "")
-                if not node_name:
-                    # Fallback
-                    node_name = serialized.get("name", "") if serialized else ""
-                
-                print(f"DEBUG: on_chain_start node_name='{node_name}'")
-
-                # Filter out system chains and common internal nodes
-                if node_name and node_name not in ["LangGraph", "__start__", "branches", "RunnableSequence"]:
-                     step_map = {
-                        "Market Analyst": "Market Research (시장 조사)",
-                        "News Analyst": "News Analysis (뉴스 분석)", 
-                        "Social Analyst": "Social Analysis (소셜 분석)", 
-                        "Fundamentals Analyst": "Fundamentals (기본적 분석)", 
-                        "Bull Researcher": "Debate (토론 - Bull)",
-                        "Bear Researcher": "Debate (토론 - Bear)",
-                        "Research Manager": "Debate (토론 - Manager)",
-                        "Risky Analyst": "Risk Assessment (리스크 평가 - Risky)",
-                        "Safe Analyst": "Risk Assessment (리스크 평가 - Safe)",
-                        "Neutral Analyst": "Risk Assessment (리스크 평가 - Neutral)",
-                        "Risk Judge": "Risk Assessment (리스크 평가 - Judge)",
-                        "Trader": "Final Decision (최종 결정)"
-                    }
-                     if node_name in step_map:
-                        new_step = step_map[node_name]
-                        if new_step != self.current_step:
-                            self.current_step = new_step
-                            self._send_json({"type": "progress", "step": new_step})
-                            self._send_json({"type": "log", "message": f"\n=== {new_step} ==="})
-
-            def on_llm_new_token(self, token: str, **kwargs):
-                # Basic Cost Estimation (Model Dependent)
-                # Quick Mode (gpt-4o-mini) is ~30x cheaper than Deep Mode (gpt-4o) used as baseline here
-                cost_multiplier = 0.00003
-                if analysis_mode == "quick":
-                    cost_multiplier = 0.000001
-                    
-                self.cost += (len(token)/4.0) * cost_multiplier
-                self._send_json({
-                    "type": "stream_chunk",
-                    "cost": self.cost
-                })
-
-            def on_llm_end(self, response: LLMResult, **kwargs):
-                 pass
-
-            def on_tool_start(self, serialized, input_str, **kwargs):
-                 tool_name = serialized.get("name", "Unknown Tool")
-                 self._send_json({"type": "log", "message": f"[Tool] Executing {tool_name}..."})
-                 
-            def on_tool_end(self, output, **kwargs):
-                 self._send_json({"type": "log", "message": f"[Tool] Finished."})
-
-        # --- Refactored Analysis Loop ---
         from tradingagents.agents.utils.recommender import recommender
-        
-        # Helper for running one analysis flow
+
+        # Helper for running one analysis flow through the job queue
         async def run_analysis(target_ticker: str, target_date: str, is_primary: bool = False):
             try:
-                # Callback (Fresh instance per run)
-                callback = WebSocketCallback(websocket)
-                
-                # Dynamic Config based on Mode
-                current_config = DEFAULT_CONFIG.copy()
-                if analysis_mode == "quick":
-                    current_config["deep_think_llm"] = "gpt-4o-mini"
-                    print(f"DEBUG: Using Quick Mode (gpt-4o-mini)")
-                else:
-                    print(f"DEBUG: Using Deep Mode (gpt-4o)")
-                
-                # Graph Setup
-                target_ta = TradingAgentsGraph(debug=False, config=current_config)
-                target_ta.ticker = target_ticker
-                
-                run_config = target_ta.propagator.get_graph_args()
-                run_config["callbacks"] = [callback]
-                run_config["recursion_limit"] = 150
-
-                # Load Profile
-                current_profile = profile_manager.load_profile()
-                init_state = target_ta.propagator.create_initial_state(target_ticker, target_date, current_profile.summary)
-                
-                # Run
-                await websocket.send_json({"type": "log", "message": f"\n[System] Starting analysis for {target_ticker}..."})
-                print(f"DEBUG: Invoking graph for {target_ticker}")
-                final_state = await target_ta.graph.ainvoke(init_state, run_config)
-                
-                # Process Result
-                raw_decision = final_state.get("final_trade_decision", "HOLD")
-                import re
+                job = submit_analysis(
+                    target_ticker, target_date, analysis_mode,
+                    user=session.user, priority=3 if is_primary else 7,
+                )
+                if job.status in FINISHED:
+                    await send({"type": "log", "message": f"\n[System] Reusing a recent analysis of {target_ticker}."})
+                job = await stream_job(job.id, send)
+                if job is None or job.status != "succeeded":
+                    raise RuntimeError(job.error if job is not None else "job lost")
+
+                result = job.result
+                raw_decision = result.get("reasoning", "HOLD")
                 verdict = "HOLD"
-                confidence = "Medium"
                 if "buy" in raw_decision.lower(): verdict = "BUY"
                 elif "sell" in raw_decision.lower(): verdict = "SELL"
-                
-                conf_match = re.search(r"Confidence:\s*(\w+)", raw_decision, re.IGNORECASE)
-                if conf_match: confidence = conf_match.group(1).upper()
-                
-                accuracy_info = calculate_accuracy(target_ticker, target_date, verdict)
-                
+
                 result_payload = {
                     "type": "result",
                     "ticker": target_ticker,        # Added Ticker field
                     "is_primary": is_primary,       # Added Flag
                     "decision": verdict,
-                    "confidence": confidence,
+                    "confidence": result.get("confidence", "Medium"),
                     "reasoning": raw_decision,
-                    "report": final_state.get("trader_investment_plan", ""),
-                    "accuracy": accuracy_info,
-                    "full_state": {
-                        "sentiment": final_state.get("sentiment_report", ""),
-                        "fundamentals": final_state.get("fundamentals_report", ""),
-                        "technical": final_state.get("market_report", ""),
-                        "risk": final_state.get("risk_debate_state", {}).get("judge_decision", "")
-                    }
+                    "report": result.get("report", ""),
+                    "accuracy": await asyncio.to_thread(calculate_accuracy, target_ticker, target_date, verdict),
+                    "profile": result.get("profile", {}),
+                    "full_state": result.get("full_state", {}),
                 }
-                
-                await websocket.send_json(result_payload)
+
+                await send(result_payload)
                 print(f"DEBUG: Sent result for {target_ticker}")
 
             except Exception as e:
                 print(f"Error in run_analysis({target_ticker}): {e}")
-                await websocket.send_json({"type": "error", "message": f"Error organizing {target_ticker}: {str(e)}"})
+                await send({"type": "error", "message": f"Error organizing {target_ticker}: {str(e)}"})
 
 
+        # Related tickers from the local index show up while the analysis runs
+        async def send_peers():
+            try:
+                profile = profile_manager.load_profile(session.user)
+                peers = await asyncio.to_thread(
+                    peer_index.peers, ticker, 5, profile.avoid_sectors, profile.favorite_sectors
+                )
+                if peers:
+                    await send({"type": "peers", "ticker": ticker, "peers": peers})
+            except Exception as e:
+                print(f"Peer lookup failed for {ticker}: {e}")
+
+        peers_task = asyncio.create_task(send_peers())
+
         # 1. Primary Analysis
         await run_analysis(ticker, date_str, is_primary=True)
+        await peers_task
         
         # 2. Recommendation Phase
-        await websocket.send_json({"type": "log", "message": "\n[Discovery] Identifying related opportunities based on your profile..."})
+        await send({"type": "log", "message": "\n[Discovery] Identifying related opportunities based on your profile..."})
         
-        current_profile = profile_manager.load_profile()
-        recs = recommender.get_recommendations(ticker, current_profile.summary)
+        current_profile = profile_manager.load_profile(session.user)
+        recs = await recommender.aget_recommendations(
+            ticker, current_profile.summary, date_str, profile=current_profile,
+            profile_key=current_profile.fingerprint,
+        )
         
         if recs.tickers:
-            await websocket.send_json({
+            await send({
                 "type": "recommendations",
                 "tickers": recs.tickers,
                 "reasoning": recs.reasoning
             })
             
+            # Warm the price store for every recommendation in one download
+            await asyncio.to_thread(prefetch_market_data, recs.tickers)
+            try:
+                await asyncio.to_thread(forward_return_evaluator.prefetch, recs.tickers, date_str)
+            except Exception as e:
+                print(f"Price prefetch failed: {e}")
+
             # 3. Loop Analysis
             for rec_ticker in recs.tickers:
                 await asyncio.sleep(1) # Breath
                 await run_analysis(rec_ticker, date_str, is_primary=False)
         else:
-            await websocket.send_json({"type": "log", "message": "[Discovery] No recommendations found."})
+            await send({"type": "log", "message": "[Discovery] No recommendations found."})
 
         # End of Session
-        await websocket.send_json({"type": "done"})
+        await send({"type": "done"})
 
     except Exception as e:
-         print(f"Error during analysis session: {e}")
-         await websocket.send_json({"type": "error", "message": f"Session Error: {str(e)}"})
+        print(f"Error during analysis session: {e}")
+        await send({"type": "error", "message": f"Session Error: {str(e)}"})
     finally:
-        await websocket.close()
+        session.finish()
+
+
+@app.websocket("/ws/analyze")
+async def websocket_endpoint(websocket: WebSocket):
+    """Start an analysis session, or rejoin one with {"session_id", "cursor"}.
+
+    The first message on a new session is {"type": "session", "session_id"};
+    every event after that carries a `seq`. A client that drops reconnects
+    with cursor = last seq + 1 to replay what it missed.
+    """
+    await websocket.accept()
+    channel = None
+    try:
+        data = await websocket.receive_text()
+        request_data = json.loads(data)
+        channel = open_channel(websocket, bool(request_data.get("compress", False)))
+
+        session_id = request_data.get("session_id")
+        if session_id:
+            session = session_store.get(session_id)
+            if session is None:
+                await channel.send({"type": "error", "message": "Session expired (세션 만료)"})
+                return
+            cursor = int(request_data.get("cursor", 0))
+        else:
+            if not request_data.get("ticker") or not request_data.get("date"):
+                await channel.send({"type": "error", "message": "Missing ticker or date (티커 또는 날짜 누락)"})
+                return
+            session = session_store.create(request_data.get("user", "default"))
+            session.task = asyncio.create_task(run_session(session, request_data))
+            cursor = 0
+
+        await channel.send({"type": "session", "session_id": session.id})
+        await session.follow(cursor, channel.send, channel.drain, chunk=max(1, channel.max_pending // 2))
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        # Usually the client went away mid-stream; the session keeps running
+        print(f"Analysis socket closed: {e}")
+    finally:
+        if channel is not None:
+            await channel.close()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # already closed by the client
 
 def calculate_accuracy(ticker: str, date_str: str, decision: str) -> dict:
     """
-    Calculate the 5-day return following the analysis date.
+    Calculate the 1/5/20-day returns following the analysis date.
+    Prices come from the shared local price store; finished dates are memoized.
     """
     try:
-        target_date = datetime.strptime(date_str, "%Y-%m-%d")
-        
-        # If target date is today or future, cannot calculate accuracy
-        if target_date.date() >= datetime.now().date():
-            return {"calculable": False, "message": "Future date/Today (미래/오늘 날짜)"}
-
-        # Fetch data: target_date to target_date + 7 days (to cover weekends)
-        end_date = target_date + timedelta(days=10)
-        data = yf.download(ticker, start=target_date, end=end_date, progress=False)
-        
-        if data.empty:
-             return {"calculable": False, "message": "No Data (데이터 없음)"}
-
-        # Get close price on the analysis date (or next trading day)
-        # yfinance includes start date.
-        if len(data) < 2:
-             return {"calculable": False, "message": "Insufficient data (데이터 부족)"}
-        
-        start_price = data['Close'].iloc[0] # This can be a Series if MultiIndex, ensure scalar
-        if hasattr(start_price, 'item'): start_price = start_price.item()
-
-        # Look for price 5 trading days later, or last available
-        days_later_idx = 5 if len(data) > 5 else len(data) - 1
-        end_price = data['Close'].iloc[days_later_idx]
-        if hasattr(end_price, 'item'): end_price = end_price.item()
-        
-        period_return = ((end_price - start_price) / start_price) * 100
-        
-        # Simple accuracy check: 
-        # Buy -> Return > 0 = Good
-        # Sell -> Return < 0 = Good (assuming short or avoiding loss)
-        # Hold -> Return near 0? (Tricky, keeping it simple)
-        
-        is_accurate = False
-        decision_lower = decision.lower()
-        if "buy" in decision_lower and period_return > 0:
-            is_accurate = True
-        elif "sell" in decision_lower and period_return < 0:
-            is_accurate = True
-        elif "hold" in decision_lower and abs(period_return) < 2.0: # Arbitrary threshold
-             is_accurate = True
-             
-        return {
-            "calculable": True,
-            "start_price": f"{start_price:.2f}",
-            "end_price": f"{end_price:.2f}",
-            "return_pct": f"{period_return:.2f}%",
-            "is_accurate": is_accurate,
-            "explanation": f"Price moved {start_price:.2f} -> {end_price:.2f} over {days_later_idx} days (주가 변동)"
-        }
-
+        return forward_return_evaluator.evaluate(ticker, date_str, decision)
     except Exception as e:
         return {"calculable": False, "message": f"Error: {str(e)}"}
 